@@ -1,4 +1,6 @@
 """This requires the MLCube 2.0 that's located somewhere in one of dev branches."""
+import atexit
+import copy
 import logging
 import os
 import shutil
@@ -10,10 +12,14 @@ import click
 import coloredlogs
 from omegaconf import OmegaConf
 
+from mlcube.cache import ConfigCache
 from mlcube.cli import MLCubeCommand, MultiValueOption, Options, UsageExamples, parse_cli_args
 from mlcube.errors import ExecutionError, IllegalParameterValueError, MLCubeError
 from mlcube.parser import CliParser
+from mlcube.profiler import Profiler
+from mlcube.scheduler import TaskGraph, TaskScheduler
 from mlcube.shell import Shell
+from mlcube.sweep import Sweep
 from mlcube.system_settings import SystemSettings
 
 logger = logging.getLogger(__name__)
@@ -59,6 +65,14 @@ def cli(log_level: t.Optional[str]):
 @Options.workspace
 @Options.resolve
 @Options.parameter
+@click.option(
+    "--cache-stats",
+    "--cache_stats",
+    "cache_stats",
+    is_flag=True,
+    help="Print statistics (hits, misses, number of entries) of the effective configuration cache and exit. The cache "
+    "is enabled by setting the `MLCUBE_CONFIG_CACHE` environment variable to `1`.",
+)
 @Options.help
 @click.pass_context
 def show_config(
@@ -68,6 +82,7 @@ def show_config(
     workspace: str,
     resolve: bool,
     p: t.Tuple[str],
+    cache_stats: bool = False,
 ) -> None:
     """Show effective MLCube configuration.
 
@@ -83,7 +98,11 @@ def show_config(
         workspace: Workspace path to use. If not specified, default workspace inside MLCube directory is used.
         resolve: if True, compute values in MLCube configuration.
         p: Additional configuration parameters.
+        cache_stats: If True, print statistics of the effective configuration cache.
     """
+    if cache_stats:
+        print(OmegaConf.to_yaml(ConfigCache().stats()))
+        return
     if mlcube is None:
         mlcube = os.getcwd()
     _, mlcube_config = parse_cli_args(
@@ -175,6 +194,8 @@ def configure(mlcube: t.Optional[str], platform: str, p: t.Tuple[str]) -> None:
 @Options.memory
 @Options.cpu
 @Options.mount
+@Options.parallel
+@Options.profile
 @Options.parameter
 @Options.help
 @click.pass_context
@@ -190,6 +211,8 @@ def run(
     memory: str,
     cpu: str,
     mount: str,
+    parallel: int,
+    profile: t.Optional[str],
     p: t.Tuple[str],
 ) -> None:
     """Run MLCube task(s).
@@ -208,12 +231,14 @@ def run(
         cpu: CPU options defined during MLCube container execution.
         mount: Mount (global) options defined for all input parameters in all tasks to be executed. They override any
             mount options defined for individual parameters.
+        parallel: Maximal number of tasks to run concurrently.
+        profile: If not None, save timing profile to this file (Chrome trace event format).
         p: Additional MLCube configuration parameters (these parameters are those parameters that normally start with
             `-P` prefix). Here, due to original implementation, we need to `unparse` by adding `-P` prefix.
     """
     logger.info(
         "run input_arg mlcube=%s, platform=%s, task=%s, workspace=%s, network=%s, security=%s, gpus=%s, "
-        "memory=%s, mount=%s, cpu=%s, p=%s",
+        "memory=%s, mount=%s, cpu=%s, parallel=%s, profile=%s, p=%s",
         mlcube,
         platform,
         task,
@@ -224,8 +249,13 @@ def run(
         memory,
         cpu,
         mount,
+        parallel,
+        profile,
         str(p),
     )
+    if profile:
+        # Save the profile on any exit (including failed tasks that terminate this process with `sys.exit`).
+        atexit.register(Profiler.save, profile)
     runner_cls, mlcube_config = parse_cli_args(
         unparsed_args=ctx.args + ["-P" + param for param in p],
         parsed_args={
@@ -269,12 +299,23 @@ def run(
         )
         exit(1)
 
+    if parallel > 1 and len(tasks) > 1:
+        # Each task gets its own copy of MLCube configuration since runners may update it (e.g., parameter types).
+        graph = TaskGraph(mlcube_config, tasks)
+        task_configs = {name: copy.deepcopy(mlcube_config) for name in graph.tasks}
+        results = TaskScheduler(graph, num_workers=parallel).run(
+            lambda _task: runner_cls(task_configs[_task], task=_task).run()
+        )
+        print(TaskScheduler.format_results(results))
+        exit_code = TaskScheduler.exit_code(results)
+        if exit_code != 0:
+            print(f"run failed to run MLCube with error code {exit_code}.")
+            sys.exit(exit_code)
+        return
+
     try:
-        # TODO: Sergey - Can we have one instance for all tasks?
-        for task in tasks:
-            logger.info("run task = %s", task)
-            runner = runner_cls(mlcube_config, task=task)
-            runner.run()
+        logger.info("run tasks = %s", tasks)
+        runner_cls(mlcube_config, task=None).run_tasks(tasks)
     except MLCubeError as err:
         exit_code = err.context.get("code", 1) if isinstance(err, ExecutionError) else 1
         print(f"run failed to run MLCube with error code {exit_code}.")
@@ -283,6 +324,84 @@ def run(
         sys.exit(exit_code)
 
 
+@cli.command(
+    name="sweep",
+    cls=MLCubeCommand,
+    add_help_option=False,
+    epilog=UsageExamples.sweep,
+    context_settings={
+        "ignore_unknown_options": True,
+        "allow_extra_args": True,
+        "max_content_width": _TERMINAL_WIDTH,
+    },
+)
+@Options.mlcube
+@Options.platform
+@Options.task
+@Options.workspace
+@Options.params
+@Options.jobs
+@Options.parameter
+@Options.help
+@click.pass_context
+def sweep(
+    ctx: click.core.Context,
+    mlcube: str,
+    platform: str,
+    task: str,
+    workspace: t.Optional[str],
+    params: str,
+    jobs: int,
+    p: t.Tuple[str],
+) -> None:
+    """Run MLCube task with different task parameters.
+
+    \f
+    Args:
+        ctx: Click context for unknown options
+        mlcube: Path to MLCube root directory or mlcube.yaml file.
+        platform: Platform to use to run this MLCube (docker, singularity, gcp, k8s etc).
+        task: Task name to run.
+        workspace: Directory where job workspaces are created (one subdirectory per job). If not specified,
+            `${MLCUBE_ROOT}/sweeps/${task}` is used.
+        params: Path to a sweep file that defines task parameters for every job.
+        jobs: Maximal number of jobs to run concurrently.
+        p: Additional MLCube configuration parameters (these parameters are those parameters that normally start with
+            `-P` prefix). Here, due to original implementation, we need to `unparse` by adding `-P` prefix.
+    """
+    logger.info(
+        "sweep input_arg mlcube=%s, platform=%s, task=%s, workspace=%s, params=%s, jobs=%s, p=%s",
+        mlcube,
+        platform,
+        task,
+        workspace,
+        params,
+        jobs,
+        str(p),
+    )
+    tasks: t.List[str] = CliParser.parse_list_arg(task, default=None)
+    if len(tasks) != 1:
+        logger.error("Exactly one task name is required (--task=TASK_NAME), actual value = %s.", task)
+        exit(1)
+
+    # Base configuration is created and resolved only once for all jobs.
+    runner_cls, mlcube_config = parse_cli_args(
+        unparsed_args=ctx.args + ["-P" + param for param in p],
+        parsed_args={"mlcube": mlcube, "platform": platform},
+        resolve=True,
+    )
+    if workspace is None:
+        workspace = os.path.join(mlcube_config.runtime.root, "sweeps", tasks[0])
+    param_sweep = Sweep(mlcube_config, tasks[0], Sweep.load_jobs(params), workspace)
+
+    results = param_sweep.run(runner_cls, num_workers=jobs)
+    print(param_sweep.format_results(results))
+    exit_code = TaskScheduler.exit_code(results)
+    if exit_code != 0:
+        print(f"sweep failed to run MLCube with error code {exit_code}.")
+        sys.exit(exit_code)
+
+
 @cli.command(
     name="describe",
     cls=MLCubeCommand,
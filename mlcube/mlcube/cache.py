@@ -0,0 +1,271 @@
+"""Utilities to cache data across MLCube invocations.
+
+- `Cache`: Helper functions to work with MLCube cache directory.
+- `ConfigCache`: Content-addressed cache of effective (resolved) MLCube configurations.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import tempfile
+import typing as t
+from pathlib import Path
+
+from omegaconf import DictConfig, OmegaConf
+
+__all__ = ["Cache", "ConfigCache"]
+
+logger = logging.getLogger(__name__)
+
+
+class Cache(object):
+    """Helper functions to work with MLCube cache directory.
+
+    The default location of the cache directory is `${HOME}/.mlcube/cache`. It can be overridden with the
+    `MLCUBE_CACHE_DIR` environment variable. Cached data must never be required for correctness - any file in this
+    directory can be removed at any time.
+    """
+
+    @staticmethod
+    def root() -> Path:
+        """Return full path to MLCube cache directory."""
+        return Path(os.environ.get("MLCUBE_CACHE_DIR", Path.home() / ".mlcube" / "cache")).expanduser().resolve()
+
+    @staticmethod
+    def path(*parts: str) -> Path:
+        """Return path to a file or directory inside MLCube cache directory."""
+        return Cache.root().joinpath(*parts)
+
+    @staticmethod
+    def digest(*parts: t.Any) -> str:
+        """Return sha256 hex digest of the given parts.
+
+        Args:
+            parts: Bytes, strings or JSON-serializable objects. Dictionary keys are sorted before hashing.
+        """
+        sha256 = hashlib.sha256()
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = (part if isinstance(part, str) else json.dumps(part, sort_keys=True, default=str)).encode()
+            sha256.update(hashlib.sha256(part).digest())
+        return sha256.hexdigest()
+
+    @staticmethod
+    def file_digest(path: t.Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+        """Return sha256 hex digest of file content.
+
+        Args:
+            path: Path to a file.
+            chunk_size: Size of chunks (in bytes) to read file content with.
+        """
+        sha256 = hashlib.sha256()
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        with open(path, "rb", buffering=0) as file:
+            for num_bytes in iter(lambda: file.readinto(buffer), 0):
+                sha256.update(view[:num_bytes])
+        return sha256.hexdigest()
+
+    @staticmethod
+    def cached_file_digest(path: t.Union[str, Path]) -> str:
+        """Return sha256 hex digest of file content reusing previously computed digests of unchanged files.
+
+        Digests are stored in MLCube cache directory and are keyed on the file path, inode, size and modification time,
+        so that large files (e.g., container images) are re-read only when they change.
+
+        Args:
+            path: Path to a file.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        state = [path.as_posix(), stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        digest_file = Cache.path("digests", Cache.digest(path.as_posix()) + ".json")
+        cached: t.Optional[t.Dict] = Cache.read_json(digest_file)
+        if isinstance(cached, dict) and cached.get("state", None) == state:
+            return cached["sha256"]
+        digest = Cache.file_digest(path, chunk_size=8 * 1024 * 1024)
+        Cache.write_json(digest_file, {"state": state, "sha256": digest})
+        return digest
+
+    @staticmethod
+    def read_json(path: Path) -> t.Optional[t.Any]:
+        """Load JSON file returning None if it does not exist or is not a valid JSON file."""
+        try:
+            with open(path, "rt") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            logger.warning("Cache.read_json failed to read cached data (path=%s, error=%s).", path, str(err))
+            return None
+
+    @staticmethod
+    def write_json(path: Path, data: t.Any) -> bool:
+        """Atomically serialize data to a JSON file.
+
+        Data is written to a temporary file first that then replaces the target file, so concurrent readers never see
+        partially written files. Errors are logged and ignored.
+
+        Returns:
+            True if data has been written.
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wt") as file:
+                    json.dump(data, file)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return True
+        except OSError as err:
+            logger.warning("Cache.write_json failed to write cached data (path=%s, error=%s).", path, str(err))
+            return False
+
+
+class ConfigCache(object):
+    """Content-addressed cache of effective (resolved) MLCube configurations.
+
+    The cache is disabled by default. It is enabled by setting the `MLCUBE_CONFIG_CACHE` environment variable to one of
+    `1`, `true`, `yes` or `on`. The cache key is computed using the content of MLCube configuration file, runner
+    configuration from system settings, MLCube and task parameters from a command line, workspace, runner package
+    version and values of environment variables referenced with `${oc.env:NAME}` interpolations. Resolved
+    configurations are stored as JSON files in `${MLCUBE_CACHE_DIR}/config`.
+
+    Args:
+        path: Cache directory. If None, the default location inside MLCube cache directory is used.
+    """
+
+    _ENV_INTERPOLATION = re.compile(r"oc\.env:\s*([A-Za-z_][A-Za-z0-9_]*)")
+    """Regular expression to find names of environment variables referenced in configuration files."""
+
+    _STATS_FILE = ".stats"
+    """Name of a file with cache statistics (hit and miss counters) in the cache directory."""
+
+    @staticmethod
+    def enabled() -> bool:
+        """Return true if caching of effective MLCube configurations is enabled."""
+        return os.environ.get("MLCUBE_CONFIG_CACHE", "").strip().lower() in ("1", "true", "yes", "on")
+
+    def __init__(self, path: t.Optional[t.Union[str, Path]] = None) -> None:
+        self.path: Path = Path(path) if path is not None else Cache.path("config")
+
+    def key(
+        self,
+        mlcube_config_file: str,
+        mlcube_cli_args: DictConfig,
+        task_cli_args: t.Dict,
+        runner_config: DictConfig,
+        workspace: t.Optional[str],
+        runner_cls: t.Optional[t.Type] = None,
+    ) -> str:
+        """Compute cache key for the given inputs of `MLCubeConfig.create_mlcube_config`.
+
+        Returns:
+            Hex digest that uniquely identifies effective MLCube configuration.
+        """
+        with open(mlcube_config_file, "rb") as file:
+            mlcube_config_bytes = file.read()
+
+        mlcube_cli_args = OmegaConf.to_container(mlcube_cli_args, resolve=False)
+        runner_config = OmegaConf.to_container(runner_config, resolve=False)
+        runner_info: t.Optional[t.Dict] = None
+        if runner_cls is not None:
+            runner_info = {
+                "cls": f"{runner_cls.__module__}.{runner_cls.__qualname__}",
+                "version": ConfigCache._package_version(runner_cls.__module__.split(".")[0]),
+                "mtime": ConfigCache._source_mtime(runner_cls),
+                "default": OmegaConf.to_container(runner_cls.CONFIG.DEFAULT, resolve=False),
+            }
+
+        # Effective configuration may depend on environment variables.
+        env_names = set(
+            ConfigCache._ENV_INTERPOLATION.findall(
+                mlcube_config_bytes.decode(errors="ignore") + json.dumps([mlcube_cli_args, runner_config, runner_info])
+            )
+        )
+        env = {name: os.environ.get(name, None) for name in sorted(env_names)}
+
+        return Cache.digest(
+            os.path.abspath(mlcube_config_file),
+            mlcube_config_bytes,
+            mlcube_cli_args,
+            task_cli_args,
+            runner_config,
+            workspace,
+            runner_info,
+            ConfigCache._package_version("mlcube"),
+            env,
+        )
+
+    def get(self, key: str) -> t.Optional[DictConfig]:
+        """Return cached MLCube configuration or None if not found."""
+        data = Cache.read_json(self.path / f"{key}.json")
+        self._count("hits" if data is not None else "misses")
+        if data is None:
+            logger.debug("ConfigCache.get cache miss (key=%s).", key)
+            return None
+        logger.debug("ConfigCache.get cache hit (key=%s).", key)
+        return OmegaConf.create(data)
+
+    def put(self, key: str, mlcube_config: DictConfig) -> None:
+        """Store resolved MLCube configuration in this cache."""
+        data = OmegaConf.to_container(mlcube_config, resolve=True)
+        if "${" in json.dumps(data):
+            # Loading this configuration back would trigger (possibly incorrect) interpolation.
+            logger.debug("ConfigCache.put configuration contains interpolation tokens, not caching (key=%s).", key)
+            return
+        Cache.write_json(self.path / f"{key}.json", data)
+
+    def stats(self) -> t.Dict:
+        """Return cache statistics (number of hits, misses and cached configurations)."""
+        entries = list(self.path.glob("*.json")) if self.path.is_dir() else []
+        return {
+            "enabled": ConfigCache.enabled(),
+            "path": self.path.as_posix(),
+            "hits": self._counter("hits"),
+            "misses": self._counter("misses"),
+            "entries": len(entries),
+            "size_bytes": sum(entry.stat().st_size for entry in entries),
+        }
+
+    def _count(self, counter: str) -> None:
+        """Increment counter.
+
+        Counters are stored in a small JSON file in the cache directory. Concurrent MLCube processes update this file
+        without locking, so some updates may be lost. This is acceptable for statistics.
+        """
+        stats = Cache.read_json(self.path / ConfigCache._STATS_FILE)
+        if not isinstance(stats, dict):
+            stats = {}
+        stats[counter] = self._counter(counter, stats) + 1
+        Cache.write_json(self.path / ConfigCache._STATS_FILE, stats)
+
+    def _counter(self, counter: str, stats: t.Optional[t.Dict] = None) -> int:
+        """Return counter value."""
+        if stats is None:
+            stats = Cache.read_json(self.path / ConfigCache._STATS_FILE)
+        value = stats.get(counter, 0) if isinstance(stats, dict) else 0
+        return value if isinstance(value, int) else 0
+
+    @staticmethod
+    def _source_mtime(cls: t.Type) -> t.Optional[int]:
+        """Return modification time of a source file of this class (useful for runners installed in dev mode)."""
+        try:
+            return os.stat(inspect.getfile(cls)).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def _package_version(package: str) -> t.Optional[str]:
+        """Return version of installed python package or None if it can't be determined."""
+        try:
+            from importlib.metadata import version
+
+            return version(package)
+        except Exception:
+            return None
@@ -18,6 +18,7 @@ from omegaconf import DictConfig
 from mlcube.config import MLCubeConfig, MountType
 from mlcube.parser import CliParser, MLCubeDirectory
 from mlcube.platform import Platform
+from mlcube.profiler import Profiler
 from mlcube.runner import Runner
 from mlcube.system_settings import SystemSettings
 from mlcube.validate import Validate
@@ -33,6 +34,7 @@ __all__ = [
 ]
 
 
+@Profiler.profile()
 def parse_cli_args(
     unparsed_args: t.List[str], parsed_args: t.Dict, resolve: bool
 ) -> t.Tuple[t.Optional[t.Type[Runner]], DictConfig]:
@@ -451,6 +453,47 @@ class Options:
         default=None,
         help="CPU options defined during MLCube container execution.",
     )
+    parallel = click.option(
+        "--parallel",
+        required=False,
+        type=click.IntRange(min=1),
+        default=1,
+        metavar="N",
+        help="Maximal number of MLCube [tasks]({task}) to run concurrently. When greater than one, MLCube derives "
+        "dependencies between requested tasks from their input and output parameters (a task depends on a preceding "
+        "task when it consumes or overwrites artifacts of that task), and runs independent tasks concurrently. A "
+        "failed task only cancels tasks that depend on it. Default is 1 (tasks run sequentially).".format(
+            task=OnlineDocs.concept_url("task"),
+        ),
+    )
+    params = click.option(
+        "--params",
+        required=True,
+        type=click.Path(exists=True, dir_okay=False),
+        metavar="FILE",
+        help="Sweep file (YAML) that defines [task]({task}) parameters for every job. It is either a list of "
+        "dictionaries (one dictionary per job), or a dictionary with the `grid` key that maps parameter names to lists "
+        "of values (jobs are all combinations of these values). Parameter values override default values of task "
+        "input and output parameters.".format(task=OnlineDocs.concept_url("task")),
+    )
+    jobs = click.option(
+        "--jobs",
+        required=False,
+        type=click.IntRange(min=1),
+        default=1,
+        metavar="N",
+        help="Maximal number of sweep jobs to run concurrently. Default is 1 (jobs run sequentially).",
+    )
+    profile = click.option(
+        "--profile",
+        required=False,
+        type=click.Path(dir_okay=False, writable=True),
+        default=None,
+        metavar="FILE",
+        help="Save timing profile (configuration resolution, workspace synchronization, runner configure and run "
+        "phases, external commands) to this file in Chrome trace event format. The profile can be viewed with "
+        "chrome://tracing or https://ui.perfetto.dev.",
+    )
     mount = click.option(
         "--mount",
         required=False,
@@ -498,11 +541,29 @@ class UsageExamples:
             (
                 "Run MNIST MLCube project",
                 _mnist(["mlcube run --mlcube=mnist --platform=docker --task=download,train"]),
-            )
+            ),
+            (
+                "Run independent MLCube tasks concurrently",
+                ["mlcube run --mlcube=. --platform=docker --task=preprocess_a,preprocess_b,train --parallel=2"],
+            ),
+            (
+                "Save timing profile in Chrome trace event format",
+                ["mlcube run --mlcube=. --platform=docker --task=train --profile=profile.json"],
+            ),
         ]
     )
     """Usage examples for `mlcube run` command."""
 
+    sweep = HelpEpilog(
+        [
+            (
+                "Run the `train` task for every combination of parameters in sweep.yaml, four jobs at a time",
+                ["mlcube sweep --mlcube=. --platform=docker --task=train --params=sweep.yaml --jobs=4"],
+            ),
+        ]
+    )
+    """Usage examples for `mlcube sweep` command."""
+
     describe = HelpEpilog([("Run MNIST MLCube project", _mnist(["mlcube describe --mlcube=mnist"]))])
     """Usage examples for `mlcube describe` command."""
 
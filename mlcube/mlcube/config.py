@@ -10,6 +10,8 @@ import typing as t
 
 from omegaconf import DictConfig, OmegaConf
 
+from mlcube.cache import ConfigCache
+from mlcube.profiler import Profiler
 from mlcube.runner import Runner
 
 logger = logging.getLogger(__name__)
@@ -98,6 +100,7 @@ class MLCubeConfig(object):
         return os.path.abspath(os.path.expanduser(value))
 
     @staticmethod
+    @Profiler.profile()
     def create_mlcube_config(
         mlcube_config_file: str,
         mlcube_cli_args: t.Optional[DictConfig] = None,
@@ -123,6 +126,9 @@ class MLCubeConfig(object):
                 is specified in system settings (see `runner_config` above). If not None, we'll use it to get parameters
                 not present in system settings (e.g., outdated version)and to validate to overall configuration.
                 TODO: This class should also be used to do runner-specific parsing of input parameters.
+
+        When `MLCUBE_CONFIG_CACHE` environment variable is set, resolved configurations are cached (see
+        `mlcube.cache.ConfigCache`), and this method returns a cached configuration if all inputs match.
         """
         logger.debug(
             "MLCubeConfig.create_mlcube_config input_arg mlcube_config_file=%s, mlcube_cli_args=%s, task_cli_args=%s, "
@@ -140,6 +146,16 @@ class MLCubeConfig(object):
         if runner_config is None:
             runner_config = OmegaConf.create({})
 
+        cache: t.Optional[ConfigCache] = ConfigCache() if resolve and ConfigCache.enabled() else None
+        cache_key: t.Optional[str] = None
+        if cache is not None:
+            cache_key = cache.key(
+                mlcube_config_file, mlcube_cli_args, task_cli_args, runner_config, workspace, runner_cls
+            )
+            cached_mlcube_config: t.Optional[DictConfig] = cache.get(cache_key)
+            if cached_mlcube_config is not None:
+                return cached_mlcube_config
+
         # Load MLCube configuration and maybe override parameters from command line (like -Pdocker.build_strategy=...).
         actual_workspace = (
             "${runtime.root}/workspace"
@@ -206,6 +222,8 @@ class MLCubeConfig(object):
 
         if resolve:
             OmegaConf.resolve(mlcube_config)
+            if cache is not None:
+                cache.put(cache_key, mlcube_config)
         return mlcube_config
 
     @staticmethod
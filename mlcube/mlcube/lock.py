@@ -0,0 +1,204 @@
+"""Cross-process coordination of expensive operations (e.g., building container images).
+
+- `FileLock`: Lock based on exclusive creation of a lock file with stale lock detection.
+
+When many MLCube processes need the same image at the same time, only one of them must build it, while others wait and
+then reuse the result (single flight):
+    ```python
+    with FileLock.for_key("docker", docker, image):
+        if not image_exists():
+            build_image()
+    ```
+"""
+import contextlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+from mlcube.cache import Cache
+from mlcube.errors import ExecutionError
+
+__all__ = ["FileLock"]
+
+logger = logging.getLogger(__name__)
+
+
+class FileLock(object):
+    """Lock based on exclusive creation (`O_CREAT | O_EXCL`) of a lock file.
+
+    The lock file contains process ID, host name and creation time of its owner. While the lock is held, a background
+    thread updates modification time of the lock file (heartbeat). A lock is considered stale, and is removed by
+    waiting processes, when its owner runs on this host and does not exist anymore, or when its heartbeat stops for
+    `stale_after` seconds (owners on other hosts sharing the same file system).
+
+    Lock files are created, removed and broken only while holding an exclusive OS-level lock (`flock`) on a guard file
+    next to the lock file (`${path}.guard`). This makes checking and breaking a stale lock atomic: a waiting process
+    can never remove a lock file that another process has just created.
+
+    Args:
+        path: Path to a lock file.
+        timeout: Maximal number of seconds to wait for the lock. If None, wait forever.
+        poll_interval: Number of seconds between attempts to acquire the lock.
+        heartbeat_interval: Number of seconds between heartbeats of the lock owner.
+        stale_after: Number of seconds without heartbeats after which the lock is considered stale.
+    """
+
+    def __init__(
+        self,
+        path: t.Union[str, Path],
+        timeout: t.Optional[float] = None,
+        poll_interval: float = 0.5,
+        heartbeat_interval: float = 10.0,
+        stale_after: float = 60.0,
+    ) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.waited = False
+        """True if the last `acquire` call had to wait for another owner to release the lock."""
+
+        self._inode: t.Optional[int] = None
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat: t.Optional[threading.Thread] = None
+
+    @staticmethod
+    def for_key(*key: str, **kwargs) -> "FileLock":
+        """Return lock for the given key (e.g., image identity) located in MLCube cache directory."""
+        return FileLock(Cache.path("locks", Cache.digest(*key) + ".lock"), **kwargs)
+
+    def acquire(self) -> None:
+        """Acquire the lock, waiting while other processes own it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        start_time, self.waited = time.time(), False
+        while True:
+            with self._guard():
+                acquired = self._create() or (self._break_if_stale() and self._create())
+            if acquired:
+                self._start_heartbeat()
+                logger.debug("FileLock.acquire acquired lock (path=%s, waited=%r).", self.path, self.waited)
+                return
+            if self.timeout is not None and time.time() - start_time >= self.timeout:
+                raise ExecutionError(
+                    f"Timed out waiting for lock ({self.path}).", timeout=self.timeout, owner=self._read_owner()
+                )
+            if not self.waited:
+                logger.info("FileLock.acquire waiting for lock (path=%s, owner=%s).", self.path, self._read_owner())
+                self.waited = True
+            time.sleep(self.poll_interval)
+
+    def release(self) -> None:
+        """Release the lock (lock file is removed only if it still belongs to this owner)."""
+        self._stop_heartbeat.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        with self._guard():
+            try:
+                if os.stat(self.path).st_ino == self._inode:
+                    os.unlink(self.path)
+            except FileNotFoundError:
+                logger.warning("FileLock.release lock file does not exist (path=%s).", self.path)
+        self._inode = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    @contextlib.contextmanager
+    def _guard(self) -> t.Iterator[None]:
+        """Hold an exclusive OS-level lock on the guard file while lock file is created, removed or broken."""
+        fd = os.open(f"{self.path}.guard", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            yield
+        finally:
+            os.close(fd)  # Closing the file releases the lock.
+
+    def _create(self) -> bool:
+        """Create lock file with owner info (the caller must hold the guard).
+
+        Returns:
+            True if lock file has been created, i.e., the lock has been acquired.
+        """
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "wt") as file:
+            json.dump({"pid": os.getpid(), "host": socket.gethostname(), "created": time.time()}, file)
+        self._inode = os.stat(self.path).st_ino
+        return True
+
+    def _start_heartbeat(self) -> None:
+        self._stop_heartbeat.clear()
+
+        def _heartbeat() -> None:
+            while not self._stop_heartbeat.wait(self.heartbeat_interval):
+                try:
+                    os.utime(self.path)
+                except OSError as err:
+                    logger.warning("FileLock.heartbeat failed to update lock (path=%s): %s", self.path, str(err))
+
+        self._heartbeat = threading.Thread(target=_heartbeat, name="FileLock.heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _read_owner(self) -> t.Optional[t.Dict]:
+        try:
+            with open(self.path, "rt") as file:
+                owner = json.load(file)
+            return owner if isinstance(owner, dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def _is_stale(self, owner: t.Optional[t.Dict], mtime: float) -> bool:
+        if owner is not None and owner.get("host", None) == socket.gethostname():
+            try:
+                os.kill(int(owner["pid"]), 0)
+            except ProcessLookupError:
+                return True
+            except (PermissionError, KeyError, ValueError, TypeError):
+                ...
+        return time.time() - mtime > self.stale_after
+
+    def _break_if_stale(self) -> bool:
+        """Remove lock file if it is stale (the caller must hold the guard, so the lock file can't change meanwhile).
+
+        Returns:
+            True if the lock file has been removed (or does not exist anymore).
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        owner = self._read_owner()
+        if owner is None and time.time() - stat.st_mtime < self.poll_interval + 1.0:
+            return False  # Lock file with unreadable owner info (e.g., partially written by a crashed owner).
+        if not self._is_stale(owner, stat.st_mtime):
+            return False
+        os.unlink(self.path)
+        logger.warning("FileLock.break_if_stale removed stale lock (path=%s, owner=%s).", self.path, owner)
+        return True
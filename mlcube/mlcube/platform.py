@@ -8,8 +8,9 @@ import pkgutil
 import typing as t
 from types import ModuleType
 
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 
+from mlcube.cache import Cache
 from mlcube.runner import Runner
 
 logger = logging.getLogger(__name__)
@@ -45,42 +46,129 @@ class Platform(object):
                 runner_cls: PYTHON_RUNNER_CLASS
                 ```
 
-        Installed runners are found by inspecting Python packages. MLCube system settings file is not used.
+        Installed runners are found by inspecting Python packages. MLCube system settings file is not used. This
+        method imports all installed runners. Use `Platform.discover_runners` to find installed runners without
+        importing them.
         """
         installed_runners = {}
-        for _, pkg_name, _ in pkgutil.iter_modules():
-            if not pkg_name.startswith("mlcube_"):
-                continue
-            module_info: t.Optional[t.Dict] = None
+        for runner_name, runner_info in Platform.discover_runners().items():
             try:
-                module = importlib.import_module(pkg_name)
-                module_info = Platform.get_package_info(module)
-                runner_cls: t.Type[Runner] = module.get_runner_class()
-                if not issubclass(runner_cls, Runner):
-                    raise TypeError(
-                        f"Invalid runner type (expected: {Runner}, actual: {runner_cls})."
-                    )
-                runner_name = runner_cls.CONFIG.DEFAULT.runner
                 installed_runners[runner_name] = {
-                    "config": {"pkg": pkg_name},
-                    "runner_cls": runner_cls,
+                    "config": {"pkg": runner_info["pkg"]},
+                    "runner_cls": Platform.get_runner(OmegaConf.create({"pkg": runner_info["pkg"]})),
                 }
-                logger.info(
-                    "Platform.get_installed_runners found installed MLCube runner (platform=%s, pkg=%s, info=%s)",
-                    runner_name,
-                    pkg_name,
-                    module_info,
-                )
-            except (ImportError, AttributeError, TypeError) as e:
+            except (ImportError, AttributeError, TypeError, RuntimeError) as e:
                 logger.warning(
-                    "Platform.get_installed_runners package (pkg_name=%s, info=%s) is not a valid MLCube runner. "
-                    'Error="%s".',
-                    pkg_name,
-                    module_info,
+                    "Platform.get_installed_runners package (pkg_name=%s) is not a valid MLCube runner. Error=\"%s\".",
+                    runner_info["pkg"],
                     str(e),
                 )
         return installed_runners
 
+    @staticmethod
+    def discover_runners() -> t.Dict[str, t.Dict]:
+        """Find all installed Python-based MLCube runners without importing them (when possible).
+
+        Runners are discovered in two steps:
+            1. Runners that advertise themselves with `mlcube.runners` entry points. Entry point name is the runner
+               name, and entry point value is the runner's `get_runner_class` function (`PACKAGE:get_runner_class`).
+               Only package metadata is read, no runner modules are imported.
+            2. Other Python packages which names start with `mlcube_`. Runner names for these packages are retrieved
+               from the registry file (`runners.json` in MLCube cache directory, see `mlcube.cache.Cache`) that is
+               keyed on package names, locations and versions. Packages are imported only when this registry is out of
+               date (e.g., new runners have been installed).
+
+        Returns:
+            Dictionary mapping runner names to dictionaries with `pkg` (python package name) and `version` (package
+                version, can be None) fields.
+        """
+        runners: t.Dict[str, t.Dict] = dict(Platform._get_entry_point_runners())
+        known_packages = set(runner_info["pkg"] for runner_info in runners.values())
+        packages: t.Dict[str, t.Dict] = {
+            pkg_name: pkg_info for pkg_name, pkg_info in Platform._get_runner_packages().items()
+            if pkg_name not in known_packages
+        }
+        if not packages:
+            return runners
+
+        registry_file = Cache.path("runners.json")
+        registry_key = Cache.digest(packages)
+        registry: t.Optional[t.Dict] = Cache.read_json(registry_file)
+        if isinstance(registry, dict) and registry.get("key", None) == registry_key:
+            logger.debug("Platform.discover_runners using runner registry (%s).", registry_file)
+            package_runners: t.Dict[str, t.Dict] = registry["runners"]
+        else:
+            logger.debug("Platform.discover_runners runner registry is out of date (%s).", registry_file)
+            package_runners = {}
+            for pkg_name, pkg_info in packages.items():
+                try:
+                    runner_cls: t.Type[Runner] = Platform.get_runner(OmegaConf.create({"pkg": pkg_name}))
+                    if not issubclass(runner_cls, Runner):
+                        raise TypeError(f"Invalid runner type (expected: {Runner}, actual: {runner_cls}).")
+                    package_runners[runner_cls.CONFIG.DEFAULT.runner] = {
+                        "pkg": pkg_name, "version": pkg_info["version"]
+                    }
+                except (ImportError, AttributeError, TypeError, RuntimeError) as e:
+                    logger.warning(
+                        "Platform.discover_runners package (pkg_name=%s, info=%s) is not a valid MLCube runner. "
+                        'Error="%s".',
+                        pkg_name,
+                        pkg_info,
+                        str(e),
+                    )
+            Cache.write_json(registry_file, {"key": registry_key, "runners": package_runners})
+
+        for runner_name, runner_info in package_runners.items():
+            runners.setdefault(runner_name, runner_info)
+        for runner_name, runner_info in runners.items():
+            logger.info(
+                "Platform.discover_runners found installed MLCube runner (platform=%s, pkg=%s, version=%s)",
+                runner_name,
+                runner_info["pkg"],
+                runner_info["version"],
+            )
+        return runners
+
+    @staticmethod
+    def _get_entry_point_runners() -> t.Dict[str, t.Dict]:
+        """Return runners advertised with `mlcube.runners` entry points."""
+        try:
+            from importlib.metadata import entry_points
+
+            eps = entry_points()
+            eps = eps.select(group="mlcube.runners") if hasattr(eps, "select") else eps.get("mlcube.runners", [])
+        except Exception as e:
+            logger.warning("Platform._get_entry_point_runners failed to read entry points: %s", str(e))
+            return {}
+
+        runners: t.Dict[str, t.Dict] = {}
+        for ep in eps:
+            dist = getattr(ep, "dist", None)
+            runners.setdefault(
+                ep.name, {"pkg": ep.value.split(":")[0].strip(), "version": getattr(dist, "version", None)}
+            )
+        return runners
+
+    @staticmethod
+    def _get_runner_packages() -> t.Dict[str, t.Dict]:
+        """Return python packages that may be MLCube runners (their names start with `mlcube_`).
+
+        Packages are not imported.
+        """
+        packages: t.Dict[str, t.Dict] = {}
+        for module_finder, pkg_name, _ in pkgutil.iter_modules():
+            if not pkg_name.startswith("mlcube_") or pkg_name in packages:
+                continue
+            version: t.Optional[str] = None
+            try:
+                from importlib.metadata import version as get_version
+
+                version = get_version(pkg_name)
+            except Exception:
+                pass
+            packages[pkg_name] = {"location": getattr(module_finder, "path", None), "version": version}
+        return packages
+
     @staticmethod
     def get_runner(runner_config: t.Optional[DictConfig]) -> t.Type[Runner]:
         """Return runner class.
@@ -0,0 +1,113 @@
+"""Lightweight profiler to find out where time goes when MLCube runs.
+
+- `Profiler`: Record timing spans (e.g., config resolution, workspace sync, runner configure/run) and export them.
+
+Spans are recorded with `Profiler.span` (context manager) or `Profiler.profile` (function decorator). Nested spans form
+a timing tree per thread. Recording a span costs two clock reads and one list append, so spans are always recorded,
+and users decide whether to export them (`mlcube run --profile=trace.json`). The export format is the Chrome trace
+event format that can be loaded in `chrome://tracing` or https://ui.perfetto.dev.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import typing as t
+
+__all__ = ["Profiler"]
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler(object):
+    """Record timing spans and export them in Chrome trace format."""
+
+    MAX_EVENTS = 100000
+    """Maximal number of spans to keep (protects long-running processes from unbounded memory growth)."""
+
+    _lock = threading.Lock()
+    _events: t.List[t.Dict] = []
+    _origin_ns: int = time.perf_counter_ns()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def span(name: str, **kwargs) -> t.Iterator[None]:
+        """Record execution time of a code block.
+
+        Args:
+            name: Span name, e.g., `Shell.sync_workspace`.
+            kwargs: Optional span arguments (e.g., task name) to include in a trace.
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            Profiler.add(name, start_ns, time.perf_counter_ns(), **kwargs)
+
+    @staticmethod
+    def profile(name: t.Optional[str] = None) -> t.Callable:
+        """Return decorator to record execution time of a function.
+
+        Args:
+            name: Span name. If None, function's qualified name is used (e.g., `DockerRun.run`).
+        """
+
+        def _decorator(fn: t.Callable) -> t.Callable:
+            _name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def _wrapper(*args, **kwargs) -> t.Any:
+                with Profiler.span(_name):
+                    return fn(*args, **kwargs)
+
+            return _wrapper
+
+        return _decorator
+
+    @staticmethod
+    def add(name: str, start_ns: int, end_ns: int, **kwargs) -> None:
+        """Add completed span (start and end times are values of `time.perf_counter_ns`)."""
+        event = {
+            "name": name,
+            "ts": (start_ns - Profiler._origin_ns) / 1000.0,
+            "dur": (end_ns - start_ns) / 1000.0,
+            "tid": threading.get_ident(),
+        }
+        if kwargs:
+            event["args"] = {key: str(value) for key, value in kwargs.items()}
+        with Profiler._lock:
+            if len(Profiler._events) < Profiler.MAX_EVENTS:
+                Profiler._events.append(event)
+
+    @staticmethod
+    def events() -> t.List[t.Dict]:
+        """Return a copy of recorded spans sorted by start time."""
+        with Profiler._lock:
+            return sorted((dict(event) for event in Profiler._events), key=lambda event: event["ts"])
+
+    @staticmethod
+    def reset() -> None:
+        """Remove all recorded spans."""
+        with Profiler._lock:
+            Profiler._events.clear()
+
+    @staticmethod
+    def to_chrome_trace() -> t.Dict:
+        """Return recorded spans in Chrome trace event format (complete `X` events, times in microseconds)."""
+        pid = os.getpid()
+        trace_events = [dict(event, ph="X", cat="mlcube", pid=pid) for event in Profiler.events()]
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    @staticmethod
+    def save(path: str) -> None:
+        """Save recorded spans to a file in Chrome trace event format."""
+        path = os.path.abspath(os.path.expanduser(path))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wt") as file:
+                json.dump(Profiler.to_chrome_trace(), file)
+            logger.info("Profiler.save profile has been saved to %s.", path)
+        except OSError as err:
+            logger.warning("Profiler.save failed to save profile to %s: %s", path, str(err))
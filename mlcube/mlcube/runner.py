@@ -10,6 +10,10 @@ from omegaconf import DictConfig, OmegaConf
 
 from mlcube.errors import ConfigurationError, MLCubeError
 
+if t.TYPE_CHECKING:
+    from mlcube.scheduler import TaskResult
+    from mlcube.sweep import Sweep
+
 __all__ = ["RunnerConfig", "Runner"]
 
 
@@ -94,6 +98,33 @@ class Runner(object):
         """Run one MLCube task."""
         ...
 
+    def run_tasks(self, tasks: t.List[str]) -> None:
+        """Run MLCube tasks sequentially in the given order.
+
+        The default implementation runs each task with a new runner instance. Runners that have a high per-task
+        overhead (e.g., remote runners) can override this method to run all tasks at once.
+
+        Args:
+            tasks: Names of tasks to run.
+        """
+        for task in tasks:
+            logger.info("%s.run_tasks task = %s", self.__class__.__name__, task)
+            self.__class__(self.mlcube, task=task).run()
+
+    def run_sweep(self, sweep: "Sweep", num_workers: int = 1) -> t.List["TaskResult"]:
+        """Run all jobs of a parameter sweep.
+
+        The default implementation runs every job with a new runner instance (see `Sweep.run_jobs`). Runners that can
+        submit many jobs at once (e.g., to a cluster) can override this method.
+
+        Args:
+            sweep: Parameter sweep. This runner has been created with its base MLCube configuration and task.
+            num_workers: Maximal number of jobs to run concurrently.
+        Returns:
+            Results for all jobs (`TaskResult.task` is a job name).
+        """
+        return sweep.run_jobs(self.__class__, num_workers=num_workers)
+
     def inspect(self, force: bool = False) -> t.Dict:
         """Return low-level information about MLCube objects.
 
@@ -0,0 +1,231 @@
+"""Utilities to run multiple MLCube tasks concurrently.
+
+- `TaskStatus`: Execution status of an MLCube task.
+- `TaskResult`: Result of executing one MLCube task.
+- `TaskGraph`: Dependency graph of MLCube tasks derived from their input and output parameters.
+- `TaskScheduler`: Run MLCube tasks on a pool of workers respecting dependencies between tasks.
+"""
+import logging
+import os
+import time
+import typing as t
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from omegaconf import DictConfig
+
+from mlcube.errors import ExecutionError
+from mlcube.shell import Shell
+
+__all__ = ["TaskStatus", "TaskResult", "TaskGraph", "TaskScheduler"]
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStatus(object):
+    """Execution status of an MLCube task."""
+
+    SUCCEEDED = "succeeded"
+    """Task has been executed, and it has completed successfully."""
+
+    FAILED = "failed"
+    """Task has been executed, and it has failed."""
+
+    SKIPPED = "skipped"
+    """Task has not been executed because one of the tasks it depends on has failed or has been skipped."""
+
+
+@dataclass
+class TaskResult:
+    """Result of executing one MLCube task."""
+
+    task: str
+    """Task name."""
+
+    status: str
+    """Task status (one of `TaskStatus` values)."""
+
+    exit_code: int = 0
+    """Exit code. It is non-zero for failed and skipped tasks."""
+
+    duration: float = 0.0
+    """Task execution time in seconds."""
+
+    error: t.Optional[str] = None
+    """Error message for failed tasks, or the reason why a task has been skipped."""
+
+
+class TaskGraph(object):
+    """Dependency graph of MLCube tasks.
+
+    Dependencies are derived from task parameters. A task depends on some other task that precedes it in the list of
+    requested tasks when (1) it consumes (inputs) or overwrites (outputs) artifacts produced (outputs) by that other
+    task, or (2) it overwrites (outputs) artifacts consumed (inputs) by that other task. Two artifacts match when their
+    host paths are the same, or when one of these paths is inside the other one. Dependencies never point forward,
+    so the graph is always acyclic, and a sequential execution in the order of requested tasks is always valid.
+
+    Args:
+        mlcube: MLCube configuration. If None, tasks do not depend on each other (names do not need to be MLCube tasks).
+        tasks: Requested tasks in the order users provided them on a command line.
+    """
+
+    def __init__(self, mlcube: t.Optional[DictConfig], tasks: t.List[str]) -> None:
+        self.tasks: t.List[str] = []
+        for task in tasks:
+            if task in self.tasks:
+                logger.warning("TaskGraph.__init__ task (%s) has been requested more than once.", task)
+                continue
+            self.tasks.append(task)
+
+        self.dependencies: t.Dict[str, t.Set[str]] = {task: set() for task in self.tasks}
+        """Mapping from task name to names of tasks it depends on."""
+
+        if mlcube is None:
+            # All tasks are independent (e.g., jobs of a parameter sweep).
+            return
+        artifacts = {task: TaskGraph.get_artifacts(mlcube, task) for task in self.tasks}
+        for idx, task in enumerate(self.tasks):
+            inputs, outputs = artifacts[task]
+            for prev_task in self.tasks[:idx]:
+                prev_inputs, prev_outputs = artifacts[prev_task]
+                if TaskGraph.overlap(inputs | outputs, prev_outputs) or TaskGraph.overlap(outputs, prev_inputs):
+                    self.dependencies[task].add(prev_task)
+            logger.debug("TaskGraph.__init__ task=%s depends on %s.", task, sorted(self.dependencies[task]))
+
+    @staticmethod
+    def get_artifacts(mlcube: DictConfig, task: str) -> t.Tuple[t.Set[str], t.Set[str]]:
+        """Return host paths of input and output artifacts of this task.
+
+        Args:
+            mlcube: MLCube configuration.
+            task: Task name.
+        Returns:
+            A tuple containing two sets - normalized host paths of input and output artifacts.
+        """
+
+        def _host_paths(_params: t.Optional[DictConfig]) -> t.Set[str]:
+            _paths: t.Set[str] = set()
+            for _param_def in (_params or {}).values():
+                _default = _param_def.get("default", None) if isinstance(_param_def, (DictConfig, dict)) else None
+                if isinstance(_default, str) and _default:
+                    _paths.add(os.path.normpath(Shell.get_host_path(mlcube.runtime.workspace, _default)))
+            return _paths
+
+        parameters = mlcube.tasks[task].get("parameters", None) or {}
+        return _host_paths(parameters.get("inputs", None)), _host_paths(parameters.get("outputs", None))
+
+    @staticmethod
+    def overlap(paths: t.Iterable[str], other_paths: t.Iterable[str]) -> bool:
+        """Return true if any path in `paths` is the same, contains or is contained in any path in `other_paths`."""
+        for path in paths:
+            for other_path in other_paths:
+                if path == other_path or path.startswith(other_path + os.sep) or other_path.startswith(path + os.sep):
+                    return True
+        return False
+
+    def dependents(self, task: str) -> t.List[str]:
+        """Return tasks that directly depend on this task."""
+        return [name for name in self.tasks if task in self.dependencies[name]]
+
+
+class TaskScheduler(object):
+    """Run MLCube tasks on a pool of workers respecting dependencies between tasks.
+
+    A task is submitted for execution as soon as all tasks it depends on have succeeded. When a task fails, all tasks
+    that (directly or indirectly) depend on it are skipped. Independent tasks continue to run.
+
+    Args:
+        graph: Task dependency graph.
+        num_workers: Maximal number of tasks to run concurrently.
+    """
+
+    def __init__(self, graph: TaskGraph, num_workers: int = 1) -> None:
+        self.graph = graph
+        self.num_workers = max(1, num_workers)
+
+    def run(self, fn: t.Callable[[str], None]) -> t.List[TaskResult]:
+        """Run all tasks.
+
+        Args:
+            fn: Function that runs one task. It accepts task name and raises an exception if the task fails.
+        Returns:
+            Results for all tasks in the order they are defined in the task graph.
+        """
+        results: t.Dict[str, TaskResult] = {}
+        running: t.Dict[Future, str] = {}
+
+        def _run_task(_task: str) -> TaskResult:
+            _start = time.perf_counter()
+            try:
+                logger.info("TaskScheduler.run task = %s", _task)
+                fn(_task)
+                return TaskResult(_task, TaskStatus.SUCCEEDED, duration=time.perf_counter() - _start)
+            except Exception as err:
+                _exit_code = err.context.get("code", 1) if isinstance(err, ExecutionError) else 1
+                logger.error("TaskScheduler.run task (%s) failed (exit_code=%s): %s", _task, _exit_code, str(err))
+                if isinstance(err, ExecutionError):
+                    logger.error(err.describe())
+                return TaskResult(
+                    _task, TaskStatus.FAILED, exit_code=_exit_code or 1, duration=time.perf_counter() - _start,
+                    error=str(err)
+                )
+
+        def _schedule(_executor: ThreadPoolExecutor) -> None:
+            for _task in self.graph.tasks:
+                if _task in results or _task in running.values():
+                    continue
+                _dependencies = self.graph.dependencies[_task]
+                _failed = [_dep for _dep in _dependencies
+                           if _dep in results and results[_dep].status != TaskStatus.SUCCEEDED]
+                if _failed:
+                    logger.warning("TaskScheduler.run skipping task (%s), failed dependencies: %s.", _task, _failed)
+                    results[_task] = TaskResult(
+                        _task, TaskStatus.SKIPPED, exit_code=1, error=f"Dependencies failed or skipped: {_failed}."
+                    )
+                elif all(_dep in results for _dep in _dependencies):
+                    running[_executor.submit(_run_task, _task)] = _task
+
+        with ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="mlcube-task") as executor:
+            _schedule(executor)
+            while running:
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    results[task] = future.result()
+                # Skipping a task may unblock (skip) other tasks, so schedule until nothing changes.
+                num_results = -1
+                while num_results != len(results):
+                    num_results = len(results)
+                    _schedule(executor)
+
+        return [results[task] for task in self.graph.tasks]
+
+    @staticmethod
+    def exit_code(results: t.List[TaskResult]) -> int:
+        """Return exit code for a set of task results: zero if all succeeded, else exit code of the first failure."""
+        for result in results:
+            if result.status == TaskStatus.FAILED:
+                return result.exit_code
+        return 0 if all(result.status == TaskStatus.SUCCEEDED for result in results) else 1
+
+    @staticmethod
+    def format_results(results: t.List[TaskResult], details: t.Optional[t.Dict[str, str]] = None) -> str:
+        """Return human-readable summary for a set of task results.
+
+        Args:
+            results: Task results.
+            details: Optional mapping from task names to additional information (e.g., task parameters) to print in the
+                last column.
+        """
+        width = max([len(result.task) for result in results] + [4])
+        lines = [f"{'TASK'.ljust(width)}  {'STATUS'.ljust(9)}  {'EXIT CODE'.ljust(9)}  {'DURATION'.ljust(9)}"]
+        if details is not None:
+            lines[0] += "  DETAILS"
+        for result in results:
+            lines.append(
+                f"{result.task.ljust(width)}  {result.status.ljust(9)}  {str(result.exit_code).ljust(9)}  "
+                f"{f'{result.duration:.2f}s'.ljust(9)}"
+            )
+            if details is not None:
+                lines[-1] += f"  {details.get(result.task, '')}"
+        return "\n".join(line.rstrip() for line in lines)
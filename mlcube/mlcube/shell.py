@@ -5,17 +5,22 @@
 import copy
 import logging
 import os
-import shutil
+import shlex
+import signal
 import subprocess
 import sys
+import threading
+import time
 import typing as t
-from distutils import dir_util
+from collections import deque
 from pathlib import Path
 
 from omegaconf import DictConfig
 
 from mlcube.config import IOType, MountType, ParameterType
 from mlcube.errors import ConfigurationError, ExecutionError
+from mlcube.profiler import Profiler
+from mlcube.sync import Sync
 
 __all__ = ["Shell"]
 
@@ -61,36 +66,105 @@ class Shell(object):
         return exit_code, exit_status
 
     @staticmethod
-    def run(cmd: t.Union[str, t.List], on_error: str = "raise") -> int:
+    def run(
+        cmd: t.Union[str, t.List],
+        on_error: str = "raise",
+        timeout: t.Optional[float] = None,
+        on_output: t.Optional[t.Callable[[str], None]] = None,
+        tail: int = 0,
+        shell: bool = True,
+    ) -> int:
         """Run the `cmd` command in an external process.
 
         Args:
-            cmd: Command to execute, e.g. Shell.run(['ls', -lh']). If type is iterable, this method will join into
-                one string using whitespace as a separator.
-            on_error: Action to perform if `os.system` returns a non-zero status. Options - ignore (do nothing, return
+            cmd: Command to execute, e.g. Shell.run(['ls', -lh']). If type is iterable and `shell` is true, this method
+                will join into one string using whitespace as a separator.
+            on_error: Action to perform if a command returns a non-zero status. Options - ignore (do nothing, return
                 exit code), 'raise' (raise a RuntimeError exception), 'die' (exit the process).
+            timeout: If not None, maximal execution time in seconds. Commands that time out are killed, and their exit
+                code is 124 (same as for `timeout` shell command).
+            on_output: If not None, command output (stdout and stderr) is captured, and this function is called for
+                every output line. If None, and `tail` is zero, command inherits stdout and stderr of this process.
+            tail: Number of last output lines to capture. These lines are added to the exception context
+                (`ExecutionError.context['output']`) when command fails. Output is still printed to stdout unless
+                `on_output` is provided.
+            shell: If true, run command with a shell (shell syntax such as redirects and pipes is supported). If false,
+                `cmd` is an argv list (strings are split with `shlex.split`) and is executed directly without a shell.
         Returns:
-            Exit status. On Windows, the exit status is the output of `os.system`. On Linux, the output is either
-                process exit status if that processes exited, or -1 in other cases (e.g., process was killed).
+            Exit code. It is the process exit code if that process exited, or a negative signal number if the process
+                was killed by a signal.
         """
-        logger.debug("Shell.run input_arg: cmd=%s, on_error=%s)", cmd, on_error)
-        if isinstance(cmd, t.List):
-            cmd = " ".join(c for c in (c.strip() for c in cmd) if c)
-            logger.debug('Shell.run list->str: cmd="%s")', cmd)
+        logger.debug("Shell.run input_arg: cmd=%s, on_error=%s, timeout=%s)", cmd, on_error, timeout)
+        if shell:
+            if isinstance(cmd, t.List):
+                cmd = " ".join(c for c in (c.strip() for c in cmd) if c)
+                logger.debug('Shell.run list->str: cmd="%s")', cmd)
+        elif isinstance(cmd, str):
+            cmd = shlex.split(cmd)
 
         if on_error not in ("raise", "die", "ignore"):
             raise ValueError(
                 f"Unrecognized 'on_error' action ({on_error}). Valid options are ('raise', 'die', 'ignore')."
             )
 
-        status: int = os.system(cmd)
-        exit_code, exit_status = Shell.parse_exec_status(status)
-        if exit_status == "na":
-            logger.warning(
-                "Shell.run command (cmd=%s) did not exit properly (status=%d).",
+        capture = on_output is not None or tail > 0
+        output: t.Deque[str] = deque(maxlen=max(tail, 0))
+
+        def _consume(_stream: t.IO[str]) -> None:
+            for _line in _stream:
+                if tail > 0:
+                    output.append(_line.rstrip("\n"))
+                if on_output is not None:
+                    on_output(_line)
+                else:
+                    sys.stdout.write(_line)
+                    sys.stdout.flush()
+
+        status: t.Optional[int] = None
+        exit_status = "exited"
+        start_ns = time.perf_counter_ns()
+        try:
+            process = subprocess.Popen(
                 cmd,
-                status,
+                shell=shell,
+                stdout=subprocess.PIPE if capture else None,
+                stderr=subprocess.STDOUT if capture else None,
+                text=True if capture else None,
+                errors="replace" if capture else None,
+                # Own process group so that the whole process tree (e.g., shell and its children) can be killed.
+                start_new_session=timeout is not None and os.name != "nt",
             )
+        except OSError as err:
+            # Command not found or not executable - same exit codes as shells use.
+            exit_code = 127 if isinstance(err, FileNotFoundError) else 126
+            exit_status = "not_started"
+            output.append(str(err))
+        else:
+            reader: t.Optional[threading.Thread] = None
+            if capture:
+                reader = threading.Thread(target=_consume, args=(process.stdout,), daemon=True)
+                reader.start()
+            try:
+                status = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning("Shell.run command (cmd=%s) timed out after %s seconds, killing.", cmd, timeout)
+                Shell._kill(process)
+                process.wait()
+                exit_status = "timeout"
+            except BaseException:
+                Shell._kill(process)
+                process.wait()
+                raise
+            if reader is not None:
+                reader.join()
+                process.stdout.close()
+            if exit_status == "timeout":
+                exit_code = 124
+            elif status < 0:
+                exit_code, exit_status = status, "signalled"
+            else:
+                exit_code = status
+        Profiler.add("Shell.run", start_ns, time.perf_counter_ns(), cmd=cmd, exit_code=exit_code)
 
         msg = (
             f"Shell.run command='{cmd}' status={status} exit_status={exit_status} exit_code={exit_code} "
@@ -101,16 +175,25 @@ class Shell(object):
             if on_error == "die":
                 sys.exit(exit_code)
             if on_error == "raise":
-                raise ExecutionError(
-                    "Failed to execute shell command.",
-                    status=exit_status,
-                    code=exit_code,
-                    cmd=cmd,
-                )
+                context = {"status": exit_status, "code": exit_code, "cmd": cmd}
+                if output:
+                    context["output"] = "\n".join(output)
+                raise ExecutionError("Failed to execute shell command.", **context)
         else:
             logger.info(msg)
         return exit_code
 
+    @staticmethod
+    def _kill(process: subprocess.Popen) -> None:
+        """Kill the process (and its process group if the process is a process group leader)."""
+        try:
+            if os.name != "nt" and os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
     @staticmethod
     def run_and_capture_output(cmd: t.List[str]) -> t.Tuple[int, str]:
         """Run command and return the exit code and command output.
@@ -150,13 +233,16 @@ class Shell(object):
         Returns:
             True if image exists, else false.
         """
-        docker = docker or "docker"
-        cmd = f"{docker} inspect --type=image {image} > {Shell.null()}"
-        return Shell.run(cmd, on_error="ignore") == 0
+        cmd = shlex.split(docker or "docker") + ["inspect", "--type=image", image]
+        return Shell.run(cmd, on_error="ignore", on_output=lambda _line: None, shell=False) == 0
 
     @staticmethod
     def ssh(
-        connection_str: str, command: t.Optional[str], on_error: str = "raise"
+        connection_str: str,
+        command: t.Optional[str],
+        on_error: str = "raise",
+        ssh_options: str = "",
+        on_output: t.Optional[t.Callable[[str], None]] = None,
     ) -> int:
         """Execute a command on a remote host via SSH.
 
@@ -164,24 +250,42 @@ class Shell(object):
             connection_str: SSH connection string.
             command: Command to execute.
             on_error: Action to perform if an error occurs.
+            ssh_options: Additional ssh options, e.g., options to share connections (`-o ControlMaster=auto ...`).
+            on_output: If not None, function to call for every line of command output (see `Shell.run`).
         """
         if not command:
             return 0
+        ssh_options = f"{ssh_options} " if ssh_options else ""
         return Shell.run(
-            f"ssh -o StrictHostKeyChecking=no {connection_str} '{command}'",
+            f"ssh -o StrictHostKeyChecking=no {ssh_options}{connection_str} '{command}'",
             on_error=on_error,
+            on_output=on_output,
         )
 
     @staticmethod
-    def rsync_dirs(source: str, dest: str, on_error: str = "raise") -> int:
+    def rsync_dirs(
+        source: str,
+        dest: str,
+        on_error: str = "raise",
+        ssh_options: str = "",
+        rsync_args: str = "",
+        on_output: t.Optional[t.Callable[[str], None]] = None,
+    ) -> int:
         """Synchronize directories.
 
         Args:
             source: Source directory.
             dest: Destination directory.
             on_error: Action to perform if an error occurs.
+            ssh_options: Additional options for ssh that rsync uses as its remote shell.
+            rsync_args: Additional rsync options, e.g., `--archive --compress --partial --exclude=/workspace/`.
+            on_output: If not None, function to call for every line of rsync output (e.g., with `--itemize-changes`).
         """
-        return Shell.run(f"rsync -e 'ssh' '{source}' '{dest}'", on_error=on_error)
+        remote_shell = f"ssh {ssh_options}" if ssh_options else "ssh"
+        rsync_args = f"{rsync_args} " if rsync_args else ""
+        return Shell.run(
+            f"rsync -e '{remote_shell}' {rsync_args}'{source}' '{dest}'", on_error=on_error, on_output=on_output
+        )
 
     @staticmethod
     def get_host_path(workspace_path: str, path_from_config: str) -> str:
@@ -203,6 +307,7 @@ class Shell(object):
         return host_path.as_posix()
 
     @staticmethod
+    @Profiler.profile()
     def generate_mounts_and_args(
         mlcube: DictConfig,
         task: str,
@@ -379,6 +484,7 @@ class Shell(object):
         return " ".join(f"{parent_arg}{k}{sep}{v}" for k, v in args.items())
 
     @staticmethod
+    @Profiler.profile()
     def sync_workspace(target_mlcube: DictConfig, task: str) -> None:
         """Synchronize MLCube workspaces.
 
@@ -387,6 +493,9 @@ class Shell(object):
                 configuration where MLCube is supposed to be executed. If workspaces are different, source_mlcube will
                 refer to the MLCube configuration with default (internal) workspace.
             task: Task name to be executed.
+
+        Input artifacts are synchronized incrementally (see `mlcube.sync.Sync`): only changed files are transferred,
+        and files created or modified by users in the target workspace are never overwritten.
         """
 
         def _storage_not_supported(_uri: str) -> str:
@@ -413,9 +522,12 @@ class Shell(object):
             _kind: str,
             _workspace: str,
             _artifact: str,
-            _must_exist: bool,
+            _must_exist: t.Optional[bool],
         ) -> bool:
-            """Return true if this artifact needs to be synced."""
+            """Return true if this artifact needs to be synced.
+
+            If `_must_exist` is None, artifact existence is not checked.
+            """
             if not _is_inside_workspace(_workspace, _artifact):
                 logger.debug(
                     "[sync_workspace] task = %s, parameter = %s, artifact is not inside %s workspace "
@@ -438,7 +550,7 @@ class Shell(object):
                     _artifact,
                 )
                 return False
-            if not _must_exist and os.path.exists(_artifact):
+            if _must_exist is False and os.path.exists(_artifact):
                 logger.debug(
                     "[sync_workspace] task = %s, parameter = %s, artifact exists in %s workspace "
                     "(workspace = %s, uri = %s)",
@@ -508,6 +620,7 @@ class Shell(object):
         source_mlcube.runtime.workspace = source_workspace
         source_mlcube.workspace = source_workspace
 
+        sync = Sync.from_config(target_mlcube)
         inputs: t.Mapping[str, DictConfig] = target_mlcube.tasks[task].parameters.inputs
         for input_name, input_def in inputs.items():
             # TODO: add support for storage protocol. Idea is to be able to retrieve actual storage specs from
@@ -529,24 +642,19 @@ class Shell(object):
                 input_def.default
             )
             if not _is_ok(
-                input_name, "target", target_workspace, target_uri, _must_exist=False
+                input_name, "target", target_workspace, target_uri, _must_exist=None
             ):
                 continue
 
             if _is_task_output(target_uri, input_name):
                 continue
 
-            if os.path.isfile(source_uri):
-                os.makedirs(os.path.dirname(target_uri), exist_ok=True)
-                shutil.copy(source_uri, target_uri)
-            elif os.path.isdir(source_uri):
-                dir_util.copy_tree(source_uri, target_uri)
-            else:
-                raise RuntimeError(f"Unknown artifact type ({source_uri}).")
+            stats = sync.sync(source_uri, target_uri)
             logger.debug(
-                "[sync_workspace] task = %s, parameter = %s, source (%s) copied to target (%s).",
+                "[sync_workspace] task = %s, parameter = %s, source (%s) synced to target (%s), stats = %s.",
                 task,
                 input_name,
                 source_uri,
                 target_uri,
+                stats,
             )
@@ -0,0 +1,153 @@
+"""Run one MLCube task many times with different task parameters (parameter sweeps).
+
+- `Sweep`: Create per-job MLCube configurations from a resolved base configuration and run them concurrently.
+
+A sweep file is a YAML file that defines task parameters for every job. It is either a list of dictionaries (one
+dictionary per job), or a dictionary with the `grid` key that defines a list of values for each parameter (jobs are all
+combinations of these values):
+    ```yaml
+    # Explicit list of jobs.
+    - {data_dir: shards/00, model_dir: models/00}
+    - {data_dir: shards/01, model_dir: models/01}
+    ```
+    ```yaml
+    # Grid (cartesian product) of parameter values.
+    grid:
+      data_dir: [shards/00, shards/01]
+      parameters_file: [lr_0.01.yaml, lr_0.001.yaml]
+    ```
+Parameter names are names of task input and output parameters, and values override their default values in the same
+way as task parameters provided on a command line (`mlcube run --task=train data_dir=shards/00`).
+"""
+import copy
+import itertools
+import logging
+import os
+import typing as t
+
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from mlcube.config import MLCubeConfig
+from mlcube.errors import ConfigurationError
+from mlcube.runner import Runner
+from mlcube.scheduler import TaskGraph, TaskResult, TaskScheduler
+
+__all__ = ["Sweep"]
+
+logger = logging.getLogger(__name__)
+
+
+class Sweep(object):
+    """Run one MLCube task with different task parameters.
+
+    The base MLCube configuration is resolved once. Each job gets a copy of this configuration with task parameters
+    overridden by job parameters (see `MLCubeConfig.check_parameters`), and with its own workspace
+    (`${workspace_root}/${job_name}`). Input artifacts that jobs do not override are synchronized into job workspaces
+    by runners that support custom workspaces (see `Shell.sync_workspace`).
+
+    Args:
+        mlcube: Resolved base MLCube configuration.
+        task: Name of the task to run.
+        jobs: List of task parameters for each job.
+        workspace_root: Directory where job workspaces are created.
+    """
+
+    def __init__(self, mlcube: DictConfig, task: str, jobs: t.List[t.Dict[str, str]], workspace_root: str) -> None:
+        if task not in mlcube.get("tasks", {}):
+            raise ConfigurationError(f"Task does not exist: {task}")
+        parameters = mlcube.tasks[task].get("parameters", None) or {}
+        known_params = set(parameters.get("inputs", None) or {}) | set(parameters.get("outputs", None) or {})
+        for idx, job in enumerate(jobs):
+            unknown_params = sorted(set(job.keys()) - known_params)
+            if unknown_params:
+                raise ConfigurationError(
+                    f"Sweep job #{idx} defines unknown parameters of task '{task}' (unknown={unknown_params}, "
+                    f"known={sorted(known_params)})."
+                )
+
+        self.mlcube = mlcube
+        self.task = task
+        self.jobs = jobs
+        self.workspace_root = os.path.abspath(workspace_root)
+        width = len(str(max(len(jobs) - 1, 0)))
+        self.job_names: t.List[str] = [f"{task}_{idx:0{width}d}" for idx in range(len(jobs))]
+
+    @staticmethod
+    def load_jobs(path: str) -> t.List[t.Dict[str, str]]:
+        """Load task parameters for every job from a sweep file.
+
+        Args:
+            path: Path to a sweep file.
+        Returns:
+            List of task parameters, one dictionary per job. Values are strings.
+        """
+        spec = OmegaConf.load(path)
+        if isinstance(spec, DictConfig) and "grid" in spec:
+            grid: DictConfig = spec.grid
+            names = list(grid.keys())
+            values = [list(grid[name]) if isinstance(grid[name], ListConfig) else [grid[name]] for name in names]
+            jobs = [dict(zip(names, combination)) for combination in itertools.product(*values)]
+        elif isinstance(spec, ListConfig) and all(isinstance(job, DictConfig) for job in spec):
+            jobs = [OmegaConf.to_container(job) for job in spec]
+        else:
+            raise ConfigurationError(
+                f"Invalid sweep file ({path}). Expecting either a list of dictionaries (task parameters for each job), "
+                "or a dictionary with the `grid` key."
+            )
+        if not jobs:
+            raise ConfigurationError(f"Sweep file ({path}) does not define any jobs.")
+        return [{str(name): str(value) for name, value in job.items()} for job in jobs]
+
+    def job_workspace(self, idx: int) -> str:
+        """Return workspace directory of a job."""
+        return os.path.join(self.workspace_root, self.job_names[idx])
+
+    def job_config(self, idx: int) -> DictConfig:
+        """Return effective MLCube configuration for a job.
+
+        Args:
+            idx: Job index.
+        """
+        mlcube: DictConfig = copy.deepcopy(self.mlcube)
+        mlcube.runtime.workspace = mlcube.workspace = self.job_workspace(idx)
+        parameters: DictConfig = mlcube.tasks[self.task].parameters
+        MLCubeConfig.check_parameters(parameters.inputs, self.jobs[idx])
+        MLCubeConfig.check_parameters(parameters.outputs, self.jobs[idx])
+        return mlcube
+
+    def run(self, runner_cls: t.Type[Runner], num_workers: int = 1) -> t.List[TaskResult]:
+        """Run all jobs.
+
+        Runners decide how jobs are executed (see `Runner.run_sweep`). By default, each job runs with its own runner
+        instance (see `run_jobs`).
+
+        Args:
+            runner_cls: MLCube runner class.
+            num_workers: Maximal number of jobs to run concurrently.
+        Returns:
+            Results for all jobs (`TaskResult.task` is a job name).
+        """
+        return runner_cls(self.mlcube, task=self.task).run_sweep(self, num_workers=num_workers)
+
+    def run_jobs(self, runner_cls: t.Type[Runner], num_workers: int = 1) -> t.List[TaskResult]:
+        """Run all jobs, each job with its own runner instance.
+
+        Args:
+            runner_cls: MLCube runner class.
+            num_workers: Maximal number of jobs to run concurrently.
+        Returns:
+            Results for all jobs (`TaskResult.task` is a job name).
+        """
+        configs = {name: self.job_config(idx) for idx, name in enumerate(self.job_names)}
+        graph = TaskGraph(None, self.job_names)
+        return TaskScheduler(graph, num_workers=num_workers).run(
+            lambda _job: runner_cls(configs[_job], task=self.task).run()
+        )
+
+    def format_results(self, results: t.List[TaskResult]) -> str:
+        """Return human-readable summary of job results including job parameters."""
+        details = {
+            name: " ".join(f"{key}={value}" for key, value in job.items())
+            for name, job in zip(self.job_names, self.jobs)
+        }
+        return TaskScheduler.format_results(results, details)
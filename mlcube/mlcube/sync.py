@@ -0,0 +1,263 @@
+"""Incremental synchronization of MLCube artifacts (files and directories).
+
+- `LinkMode`: How files are transferred from source to target locations.
+- `SyncStats`: Statistics of one synchronization run.
+- `Sync`: Synchronize artifacts using per-artifact manifests to transfer only changed files.
+"""
+import logging
+import os
+import shutil
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from omegaconf import DictConfig
+
+from mlcube.cache import Cache
+from mlcube.errors import ConfigurationError
+
+__all__ = ["LinkMode", "SyncStats", "Sync"]
+
+logger = logging.getLogger(__name__)
+
+_FICLONE = 0x40049409
+"""Linux ioctl request code to clone (reflink) file content (see `man ioctl_ficlone`)."""
+
+
+class LinkMode(object):
+    """How files are transferred from source to target locations."""
+
+    COPY = "copy"
+    """Copy file content."""
+
+    HARDLINK = "hardlink"
+    """Create hard links (source and target files share content, so modifying one modifies the other)."""
+
+    REFLINK = "reflink"
+    """Create copy-on-write clones (btrfs, xfs and others), fall back to copy when not supported."""
+
+    AUTO = "auto"
+    """Same as `reflink` - use copy-on-write clones when possible, copy otherwise."""
+
+    @staticmethod
+    def is_valid(mode: str) -> bool:
+        """Return true if string `mode` contains valid link mode."""
+        return mode in (LinkMode.COPY, LinkMode.HARDLINK, LinkMode.REFLINK, LinkMode.AUTO)
+
+
+@dataclass
+class SyncStats:
+    """Statistics of one synchronization run."""
+
+    copied: int = 0
+    """Number of files which content has been copied (or cloned)."""
+
+    linked: int = 0
+    """Number of files that have been hard linked."""
+
+    unchanged: int = 0
+    """Number of files that have not changed since previous synchronization."""
+
+    skipped: int = 0
+    """Number of files that have not been synchronized because they are not managed by MLCube (e.g., modified by
+    users)."""
+
+    bytes: int = 0
+    """Number of bytes transferred (copied, cloned or linked)."""
+
+
+class Sync(object):
+    """Synchronize artifacts using per-artifact manifests to transfer only changed files.
+
+    A manifest is created for each target artifact. It contains source and target states (size and modification
+    time, and, optionally, sha256 digest) of every file that has been transferred. On the next synchronization, a file
+    is transferred again only when its source has changed, and its target has not been modified since. Targets that
+    exist but have not been created by this class (no manifest), and files that have been modified in the target
+    location, are owned by users and are never overwritten. Manifests are stored in MLCube cache directory (see
+    `mlcube.cache.Cache`). If a manifest is removed, existing target artifact is considered to be owned by users.
+
+    The behavior is configured with the `sync` section in MLCube configuration (`-Psync.link=hardlink`):
+        ```yaml
+        sync:
+          link: copy        # One of `LinkMode` values.
+          checksum: false   # Compare sha256 of files with changed size or modification time before transferring them.
+          workers: 8        # Number of threads to transfer files in parallel.
+        ```
+
+    Args:
+        link: How to transfer files (one of `LinkMode` values).
+        checksum: If true, compute and store sha256 of transferred files, and do not transfer files which content has
+            not changed even though their size or modification time has changed.
+        num_workers: Number of threads to transfer files in parallel.
+    """
+
+    def __init__(self, link: str = LinkMode.COPY, checksum: bool = False, num_workers: int = 8) -> None:
+        if not LinkMode.is_valid(link):
+            raise ConfigurationError(f"Invalid sync link mode (link={link}).")
+        self.link = link
+        self.checksum = checksum
+        self.num_workers = max(1, num_workers)
+
+    @staticmethod
+    def from_config(mlcube: DictConfig) -> "Sync":
+        """Create an instance using `sync` section in MLCube configuration (section is optional)."""
+        sync_config: DictConfig = mlcube.get("sync", None) or {}
+        return Sync(
+            link=sync_config.get("link", LinkMode.COPY),
+            checksum=bool(sync_config.get("checksum", False)),
+            num_workers=int(sync_config.get("workers", 8)),
+        )
+
+    @staticmethod
+    def manifest_file(target: t.Union[str, Path]) -> Path:
+        """Return path to a manifest file for this target artifact."""
+        return Cache.path("sync", Cache.digest(os.path.abspath(target)) + ".json")
+
+    @staticmethod
+    def file_state(path: t.Union[str, Path]) -> t.Optional[t.Dict]:
+        """Return file state (size and modification time in nanoseconds) or None if file does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def sync(self, source: t.Union[str, Path], target: t.Union[str, Path]) -> SyncStats:
+        """Synchronize source artifact (file or directory) with target artifact.
+
+        Args:
+            source: Path to existing source file or directory.
+            target: Path to target file or directory.
+        Returns:
+            Synchronization statistics.
+        """
+        source, target = os.path.abspath(source), os.path.abspath(target)
+        if not os.path.isfile(source) and not os.path.isdir(source):
+            raise RuntimeError(f"Unknown artifact type ({source}).")
+
+        stats = SyncStats()
+        manifest_file = self.manifest_file(target)
+        manifest: t.Optional[t.Dict] = None
+        if os.path.exists(target):
+            manifest = Cache.read_json(manifest_file)
+            if not isinstance(manifest, dict) or manifest.get("source", None) != source:
+                logger.debug(
+                    "Sync.sync target exists and is not managed by MLCube, skipping (source=%s, target=%s).",
+                    source,
+                    target,
+                )
+                stats.skipped += 1
+                return stats
+        files: t.Dict[str, t.Dict] = manifest["files"] if manifest is not None else {}
+
+        # Find files to transfer.
+        transfers: t.List[t.Tuple[str, str, str]] = []
+        for rel_path, source_file, target_file in Sync._list_files(source, target):
+            record: t.Optional[t.Dict] = files.get(rel_path, None)
+            target_state = Sync.file_state(target_file)
+            if target_state is not None and (record is None or target_state != record["target"]):
+                # This file has been created or modified by users.
+                stats.skipped += 1
+                continue
+            if target_state is not None and Sync.file_state(source_file) == record["source"]:
+                stats.unchanged += 1
+                continue
+            if target_state is not None and self.checksum and record.get("sha256", None):
+                if Cache.file_digest(source_file) == record["sha256"]:
+                    files[rel_path] = dict(record, source=Sync.file_state(source_file))
+                    stats.unchanged += 1
+                    continue
+            transfers.append((rel_path, source_file, target_file))
+
+        # Transfer files.
+        def _transfer(_transfer_spec: t.Tuple[str, str, str]) -> t.Tuple[str, str, t.Dict]:
+            _rel_path, _source_file, _target_file = _transfer_spec
+            _source_state = Sync.file_state(_source_file)
+            _link = self._transfer(_source_file, _target_file)
+            _record = {"source": _source_state, "target": Sync.file_state(_target_file)}
+            if self.checksum:
+                _record["sha256"] = Cache.file_digest(_target_file)
+            return _rel_path, _link, _record
+
+        if len(transfers) > 1 and self.num_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="mlcube-sync") as executor:
+                results = list(executor.map(_transfer, transfers))
+        else:
+            results = [_transfer(transfer) for transfer in transfers]
+
+        for rel_path, link, record in results:
+            files[rel_path] = record
+            stats.bytes += record["source"]["size"]
+            if link == LinkMode.HARDLINK:
+                stats.linked += 1
+            else:
+                stats.copied += 1
+
+        Cache.write_json(manifest_file, {"source": source, "target": target, "files": files})
+        logger.debug("Sync.sync source=%s, target=%s, stats=%s", source, target, stats)
+        return stats
+
+    @staticmethod
+    def _list_files(source: str, target: str) -> t.Iterator[t.Tuple[str, str, str]]:
+        """Iterate over all files in source artifact.
+
+        Empty directories are created in the target location.
+
+        Returns:
+            Iterator over tuples containing relative path, source and target file paths.
+        """
+        if os.path.isfile(source):
+            yield ".", source, target
+            return
+        for dir_path, _, file_names in os.walk(source, followlinks=True):
+            rel_dir = os.path.relpath(dir_path, source)
+            os.makedirs(os.path.join(target, rel_dir), exist_ok=True)
+            for file_name in file_names:
+                rel_path = os.path.normpath(os.path.join(rel_dir, file_name))
+                yield rel_path, os.path.join(dir_path, file_name), os.path.join(target, rel_path)
+
+    def _transfer(self, source_file: str, target_file: str) -> str:
+        """Transfer one file replacing target file atomically.
+
+        Returns:
+            How the file has been transferred (`LinkMode.HARDLINK`, `LinkMode.REFLINK` or `LinkMode.COPY`).
+        """
+        os.makedirs(os.path.dirname(target_file), exist_ok=True)
+        tmp_file = f"{target_file}.mlcube-sync-{os.getpid()}.tmp"
+        try:
+            link = LinkMode.COPY
+            if self.link == LinkMode.HARDLINK:
+                try:
+                    os.link(source_file, tmp_file)
+                    link = LinkMode.HARDLINK
+                except OSError as err:
+                    logger.debug("Sync._transfer can't create hard link (%s), copying: %s", source_file, str(err))
+            elif self.link in (LinkMode.REFLINK, LinkMode.AUTO) and Sync._reflink(source_file, tmp_file):
+                link = LinkMode.REFLINK
+            if link == LinkMode.COPY:
+                shutil.copy2(source_file, tmp_file)
+            os.replace(tmp_file, target_file)
+        finally:
+            if os.path.lexists(tmp_file):
+                os.unlink(tmp_file)
+        return link
+
+    @staticmethod
+    def _reflink(source_file: str, target_file: str) -> bool:
+        """Clone file content using copy-on-write reflink (Linux only).
+
+        Returns:
+            True if file has been cloned.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        try:
+            with open(source_file, "rb") as src, open(target_file, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            shutil.copystat(source_file, target_file)
+            return True
+        except OSError:
+            return False
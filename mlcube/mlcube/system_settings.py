@@ -39,6 +39,7 @@ from pathlib import Path
 
 from mlcube.errors import MLCubeError
 from mlcube.platform import Platform
+from mlcube.profiler import Profiler
 from mlcube.runner import Runner
 
 from omegaconf import (DictConfig, OmegaConf)
@@ -108,17 +109,28 @@ class SystemSettings(object):
         OmegaConf.save(self.settings, self.path, resolve=resolve)
         return self
 
+    @Profiler.profile()
     def update_installed_runners(self) -> 'SystemSettings':
-        """Check if new MLCube runners have been installed and update systems settings file."""
-        installed_runners: t.Dict = Platform.get_installed_runners()
+        """Check if new MLCube runners have been installed and update systems settings file.
+
+        Runners are discovered without importing them (see `Platform.discover_runners`). A runner is imported only
+        when its default platform is missing in system settings.
+        """
+        installed_runners: t.Dict = Platform.discover_runners()
         updated: bool = False
-        for platform_name, platform_spec in installed_runners.items():
+        for platform_name, runner_info in installed_runners.items():
             if platform_name not in self.settings.runners:
                 updated = True
-                self.settings.runners[platform_name] = platform_spec['config']
+                self.settings.runners[platform_name] = {'pkg': runner_info['pkg']}
             if platform_name not in self.settings.platforms:
+                try:
+                    runner_cls: t.Type[Runner] = Platform.get_runner(self.settings.runners[platform_name])
+                except (ImportError, AttributeError, RuntimeError) as e:
+                    logger.warning("SystemSettings.update_installed_runners can't load runner (platform=%s): %s",
+                                   platform_name, str(e))
+                    continue
                 updated = True
-                self.settings.platforms[platform_name] = platform_spec['runner_cls'].CONFIG.DEFAULT
+                self.settings.platforms[platform_name] = runner_cls.CONFIG.DEFAULT
         if updated:
             self.save()
         return self
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube.cache import Cache, ConfigCache
+from mlcube.config import MLCubeConfig
+
+from omegaconf import DictConfig, OmegaConf
+
+
+_MLCUBE_CONFIG = """
+name: mnist
+docker:
+  image: mlcommons/mnist:0.0.1
+  build_args: {HOST_USER: "${oc.env:MLCUBE_TEST_CACHE_USER,nobody}"}
+tasks:
+  download:
+    parameters:
+      outputs:
+        data_dir: data/
+"""
+
+
+class TestConfigCache(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.mlcube_file = self.root / "mlcube.yaml"
+        self.mlcube_file.write_text(_MLCUBE_CONFIG)
+        self.env = patch.dict(
+            os.environ, {"MLCUBE_CACHE_DIR": str(self.root / "cache"), "MLCUBE_CONFIG_CACHE": "1"}
+        )
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def _create(self, **kwargs) -> DictConfig:
+        return MLCubeConfig.create_mlcube_config(self.mlcube_file.as_posix(), **kwargs)
+
+    def test_enabled(self) -> None:
+        self.assertTrue(ConfigCache.enabled())
+        with patch.dict(os.environ, {"MLCUBE_CONFIG_CACHE": "0"}):
+            self.assertFalse(ConfigCache.enabled())
+
+    def test_digest(self) -> None:
+        self.assertEqual(Cache.digest({"a": 1, "b": 2}), Cache.digest({"b": 2, "a": 1}))
+        self.assertNotEqual(Cache.digest("a", "bc"), Cache.digest("ab", "c"))
+
+    def test_cached_file_digest(self) -> None:
+        image = self.root / "image.sif"
+        image.write_bytes(b"0" * (3 * 1024 * 1024 + 1))
+        expected = hashlib.sha256(image.read_bytes()).hexdigest()
+        self.assertEqual(Cache.file_digest(image, chunk_size=1024 * 1024), expected)
+
+        with patch.object(Cache, "file_digest", wraps=Cache.file_digest) as file_digest:
+            self.assertEqual(Cache.cached_file_digest(image), expected)
+            self.assertEqual(Cache.cached_file_digest(str(image)), expected)
+            self.assertEqual(file_digest.call_count, 1)
+
+            stat = image.stat()
+            image.write_bytes(b"1" * stat.st_size)
+            os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertEqual(Cache.cached_file_digest(image), hashlib.sha256(image.read_bytes()).hexdigest())
+            self.assertEqual(file_digest.call_count, 2)
+
+    def test_hit_and_miss(self) -> None:
+        mlcube = self._create()
+        self.assertEqual(ConfigCache().stats()["misses"], 1)
+        self.assertEqual(ConfigCache().stats()["entries"], 1)
+
+        cached_mlcube = self._create()
+        self.assertEqual(ConfigCache().stats()["hits"], 1)
+        self.assertEqual(OmegaConf.to_container(cached_mlcube), OmegaConf.to_container(mlcube))
+
+        # Different command line parameters must produce a different configuration.
+        mlcube = self._create(mlcube_cli_args=OmegaConf.create({"docker": {"image": "mlcommons/mnist:0.0.2"}}))
+        self.assertEqual(mlcube.docker.image, "mlcommons/mnist:0.0.2")
+        self.assertEqual(ConfigCache().stats()["misses"], 2)
+
+    def test_stats_file(self) -> None:
+        cache = ConfigCache()
+        for _ in range(100):
+            cache.get("0123abcd")
+        self.assertEqual(cache.stats()["misses"], 100)
+        self.assertEqual(cache.stats()["entries"], 0)
+        # Counters are stored in one small file that does not grow with the number of lookups.
+        self.assertEqual(Cache.read_json(cache.path / ".stats"), {"misses": 100})
+        self.assertListEqual([path.name for path in cache.path.iterdir()], [".stats"])
+
+        # Corrupted statistics are reset.
+        (cache.path / ".stats").write_text("[1, 2")
+        cache.get("0123abcd")
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (0, 1))
+
+    def test_invalidation(self) -> None:
+        self.assertEqual(self._create().docker.build_args.HOST_USER, "nobody")
+
+        # Environment variables referenced in MLCube configuration file are part of the cache key.
+        with patch.dict(os.environ, {"MLCUBE_TEST_CACHE_USER": "mlcube"}):
+            self.assertEqual(self._create().docker.build_args.HOST_USER, "mlcube")
+
+        # So is the content of MLCube configuration file.
+        self.mlcube_file.write_text(_MLCUBE_CONFIG.replace("0.0.1", "0.0.3"))
+        self.assertEqual(self._create().docker.image, "mlcommons/mnist:0.0.3")
+        self.assertEqual(ConfigCache().stats()["hits"], 0)
+
+    def test_disabled(self) -> None:
+        with patch.dict(os.environ, {"MLCUBE_CONFIG_CACHE": ""}):
+            self._create()
+            self._create()
+        stats = ConfigCache().stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (0, 0, 0))
+
+    def test_unresolved_configs_are_not_cached(self) -> None:
+        self._create(resolve=False)
+        self.assertEqual(ConfigCache().stats()["entries"], 0)
@@ -4,7 +4,7 @@ from unittest import TestCase
 from click import BaseCommand, Option
 from click.testing import CliRunner, Result
 
-from mlcube.__main__ import cli, config, configure, create, describe, run, show_config
+from mlcube.__main__ import cli, config, configure, create, describe, run, show_config, sweep
 from mlcube.cli import Options, markdown2text
 
 
@@ -30,7 +30,7 @@ class TestCli(TestCase):
             )
             decorators.append(name)
 
-        expected_options_count: int = 14
+        expected_options_count: int = 18
         self.assertEqual(
             expected_options_count,
             len(decorators),
@@ -40,7 +40,7 @@ class TestCli(TestCase):
 
     def test_help(self) -> None:
         """python -m unittest  mlcube.tests.test_cli"""
-        cli_funcs = [cli, show_config, configure, run, describe, config, create]
+        cli_funcs = [cli, show_config, configure, run, sweep, describe, config, create]
         for cli_func in cli_funcs:
             self.assertIsInstance(cli_func, BaseCommand)
             result: Result = CliRunner().invoke(cli_func, [f"--help"])
@@ -0,0 +1,134 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube.errors import ExecutionError
+from mlcube.lock import FileLock
+
+
+class TestFileLock(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": self.temp_dir.name})
+        self.env.start()
+        self.path = Path(self.temp_dir.name) / "image.lock"
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def _write_lock(self, pid: int, host: str, age: float = 0.0) -> None:
+        self.path.write_text(json.dumps({"pid": pid, "host": host, "created": time.time() - age}))
+        os.utime(self.path, (time.time() - age, time.time() - age))
+
+    def test_for_key(self) -> None:
+        path = FileLock.for_key("docker", "mlcommons/mnist").path
+        self.assertEqual(path, FileLock.for_key("docker", "mlcommons/mnist").path)
+        self.assertNotEqual(path, FileLock.for_key("docker", "ubuntu").path)
+        self.assertEqual(path.parent, Path(self.temp_dir.name).resolve() / "locks")
+
+    def test_single_flight(self) -> None:
+        builds: t.List[int] = []
+
+        def _configure(idx: int) -> None:
+            with FileLock(self.path, poll_interval=0.01):
+                if not builds:
+                    time.sleep(0.1)
+                    builds.append(idx)
+
+        threads = [threading.Thread(target=_configure, args=(idx,)) for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+        self.assertFalse(self.path.exists())
+
+    def test_other_process(self) -> None:
+        script = (
+            "import sys, time; from mlcube.lock import FileLock\n"
+            "with FileLock(sys.argv[1]):\n    print('locked', flush=True); time.sleep(1.0)\n"
+        )
+        proc = subprocess.Popen([sys.executable, "-c", script, str(self.path)], stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(proc.stdout.readline().strip(), "locked")
+            with self.assertRaises(ExecutionError):
+                FileLock(self.path, timeout=0.2, poll_interval=0.05).acquire()
+
+            lock = FileLock(self.path, poll_interval=0.05)
+            with lock:
+                self.assertTrue(lock.waited)
+        finally:
+            proc.wait()
+
+    def test_stale_locks(self) -> None:
+        # Owner process on this host does not exist.
+        proc = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        self._write_lock(int(proc.stdout), socket.gethostname())
+        with FileLock(self.path, timeout=1.0) as lock:
+            self.assertFalse(lock.waited)
+
+        # Owner process on other host stopped its heartbeat.
+        self._write_lock(1, "some-other-host", age=120.0)
+        with FileLock(self.path, timeout=1.0, stale_after=60.0) as lock:
+            self.assertFalse(lock.waited)
+
+        # Owner process on other host is alive.
+        self._write_lock(1, "some-other-host")
+        with self.assertRaises(ExecutionError):
+            FileLock(self.path, timeout=0.2, poll_interval=0.05).acquire()
+
+    def test_break_stale_lock_atomically(self) -> None:
+        # Owner process does not exist, so all waiting processes consider the lock stale.
+        proc = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        self._write_lock(int(proc.stdout), socket.gethostname())
+        deciding, proceed = threading.Event(), threading.Event()
+        counter_lock, holders = threading.Lock(), {"now": 0, "max": 0, "total": 0}
+
+        class _SlowLock(FileLock):
+            def _is_stale(self, owner: t.Optional[t.Dict], mtime: float) -> bool:
+                deciding.set()
+                proceed.wait()
+                return super()._is_stale(owner, mtime)
+
+        def _hold(_lock: FileLock) -> None:
+            with _lock:
+                with counter_lock:
+                    holders["now"] += 1
+                    holders["max"], holders["total"] = max(holders["max"], holders["now"]), holders["total"] + 1
+                time.sleep(0.05)
+                with counter_lock:
+                    holders["now"] -= 1
+
+        threads = [threading.Thread(target=_hold, args=(_SlowLock(self.path, poll_interval=0.01),))]
+        threads[0].start()
+        try:
+            self.assertTrue(deciding.wait(5.0))
+            # While one waiter decides whether the lock is stale, others can neither break nor acquire it.
+            for _ in range(2):
+                threads.append(threading.Thread(target=_hold, args=(FileLock(self.path, poll_interval=0.01),)))
+            for thread in threads[1:]:
+                thread.start()
+            time.sleep(0.2)
+            self.assertEqual(json.loads(self.path.read_text())["pid"], int(proc.stdout))
+            self.assertEqual(holders["total"], 0)
+        finally:
+            proceed.set()
+            for thread in threads:
+                thread.join()
+        self.assertDictEqual(holders, {"now": 0, "max": 1, "total": 3})
+
+    def test_heartbeat(self) -> None:
+        with FileLock(self.path, heartbeat_interval=0.05):
+            mtime = self.path.stat().st_mtime_ns
+            time.sleep(0.3)
+            self.assertGreater(self.path.stat().st_mtime_ns, mtime)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import typing as t
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube.platform import Platform
+from mlcube.runner import Runner, RunnerConfig
+from mlcube.system_settings import SystemSettings
+
+from omegaconf import DictConfig, OmegaConf
+
+
+class _TestRunner(Runner):
+    class Config(RunnerConfig):
+        DEFAULT = OmegaConf.create({"runner": "test"})
+
+        @staticmethod
+        def merge(mlcube: DictConfig) -> None:
+            pass
+
+        @staticmethod
+        def validate(mlcube: DictConfig) -> None:
+            pass
+
+    CONFIG = Config
+
+
+class TestPlatform(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(
+            os.environ,
+            {
+                "MLCUBE_CACHE_DIR": os.path.join(self.temp_dir.name, "cache"),
+                "MLCUBE_SYSTEM_SETTINGS": os.path.join(self.temp_dir.name, "mlcube.yaml"),
+            },
+        )
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    @patch.object(Platform, "_get_entry_point_runners", return_value={})
+    @patch.object(Platform, "_get_runner_packages")
+    @patch.object(Platform, "get_runner", return_value=_TestRunner)
+    def test_registry(self, get_runner: t.Any, get_runner_packages: t.Any, _: t.Any) -> None:
+        get_runner_packages.return_value = {"mlcube_test": {"location": "/site-packages", "version": "1.0"}}
+        expected = {"test": {"pkg": "mlcube_test", "version": "1.0"}}
+
+        self.assertDictEqual(Platform.discover_runners(), expected)
+        self.assertEqual(get_runner.call_count, 1)
+
+        # Registry is up-to-date, no runners are imported.
+        self.assertDictEqual(Platform.discover_runners(), expected)
+        self.assertEqual(get_runner.call_count, 1)
+
+        # New version of the runner package has been installed.
+        get_runner_packages.return_value["mlcube_test"]["version"] = "1.1"
+        self.assertEqual(Platform.discover_runners()["test"]["version"], "1.1")
+        self.assertEqual(get_runner.call_count, 2)
+
+    @patch.object(Platform, "_get_entry_point_runners")
+    @patch.object(Platform, "_get_runner_packages")
+    @patch.object(Platform, "get_runner", return_value=_TestRunner)
+    def test_entry_points(self, get_runner: t.Any, get_runner_packages: t.Any, get_entry_point_runners: t.Any) -> None:
+        get_entry_point_runners.return_value = {"test": {"pkg": "mlcube_test", "version": "1.0"}}
+        get_runner_packages.return_value = {"mlcube_test": {"location": "/site-packages", "version": "1.0"}}
+        self.assertDictEqual(Platform.discover_runners(), {"test": {"pkg": "mlcube_test", "version": "1.0"}})
+        get_runner.assert_not_called()
+
+    @patch.object(Platform, "discover_runners", return_value={"test": {"pkg": "mlcube_test", "version": "1.0"}})
+    @patch.object(Platform, "get_runner", return_value=_TestRunner)
+    def test_update_installed_runners(self, get_runner: t.Any, _: t.Any) -> None:
+        settings = SystemSettings().update_installed_runners()
+        self.assertEqual(settings.runners.test.pkg, "mlcube_test")
+        self.assertEqual(settings.platforms.test.runner, "test")
+        self.assertEqual(get_runner.call_count, 1)
+
+        # Default platform exists, so the runner is not imported.
+        SystemSettings().update_installed_runners()
+        self.assertEqual(get_runner.call_count, 1)
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from mlcube.profiler import Profiler
+
+
+class TestProfiler(TestCase):
+    def setUp(self) -> None:
+        Profiler.reset()
+
+    def tearDown(self) -> None:
+        Profiler.reset()
+
+    def test_spans(self) -> None:
+        @Profiler.profile()
+        def _configure() -> str:
+            with Profiler.span("pull", image="ubuntu:18.04"):
+                return "done"
+
+        self.assertEqual(_configure(), "done")
+        events = Profiler.events()
+        self.assertListEqual([e["name"] for e in events], [_configure.__qualname__, "pull"])
+        parent, child = events
+        self.assertDictEqual(child["args"], {"image": "ubuntu:18.04"})
+        self.assertLessEqual(parent["ts"], child["ts"])
+        self.assertGreaterEqual(parent["ts"] + parent["dur"], child["ts"] + child["dur"])
+
+    def test_span_is_recorded_on_error(self) -> None:
+        with self.assertRaises(ValueError):
+            with Profiler.span("fail"):
+                raise ValueError("error")
+        self.assertEqual(len(Profiler.events()), 1)
+
+    def test_threads(self) -> None:
+        def _run() -> None:
+            with Profiler.span("task"):
+                barrier.wait()
+
+        barrier = threading.Barrier(2, timeout=5)
+        threads = [threading.Thread(target=_run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        thread_ids = set(e["tid"] for e in Profiler.events())
+        self.assertEqual(len(thread_ids), 2)
+
+    def test_chrome_trace(self) -> None:
+        with Profiler.span("run", task="train"):
+            pass
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.json")
+            Profiler.save(path)
+            with open(path) as file:
+                trace = json.load(file)
+        self.assertEqual(len(trace["traceEvents"]), 1)
+        event = trace["traceEvents"][0]
+        self.assertEqual((event["name"], event["ph"], event["pid"]), ("run", "X", os.getpid()))
+        for key in ("ts", "dur", "tid", "cat"):
+            self.assertIn(key, event)
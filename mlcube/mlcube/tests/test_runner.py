@@ -0,0 +1,20 @@
+import typing as t
+from unittest import TestCase
+
+from omegaconf import OmegaConf
+
+from mlcube.runner import Runner
+
+
+class _Runner(Runner):
+    tasks: t.List[t.Optional[str]] = []
+
+    def run(self) -> None:
+        _Runner.tasks.append(self.task)
+
+
+class TestRunner(TestCase):
+    def test_run_tasks(self) -> None:
+        mlcube = OmegaConf.create({"runner": {}, "tasks": {"download": {}, "train": {}}})
+        _Runner(mlcube, task=None).run_tasks(["download", "train"])
+        self.assertListEqual(_Runner.tasks, ["download", "train"])
@@ -0,0 +1,103 @@
+import threading
+import time
+import typing as t
+from unittest import TestCase
+
+from omegaconf import DictConfig, OmegaConf
+
+from mlcube.errors import ExecutionError
+from mlcube.scheduler import TaskGraph, TaskResult, TaskScheduler, TaskStatus
+
+
+def _task(inputs: t.Dict, outputs: t.Dict) -> t.Dict:
+    return {"parameters": {"inputs": inputs, "outputs": outputs}}
+
+
+_mlcube_config: DictConfig = OmegaConf.create(
+    {
+        "runtime": {"workspace": "/mlcube/workspace"},
+        "tasks": {
+            "download": _task({}, {"data_dir": {"type": "directory", "default": "data"}}),
+            "shard_a": _task(
+                {"data_dir": {"type": "directory", "default": "data/a"}},
+                {"output_dir": {"type": "directory", "default": "shards/a"}},
+            ),
+            "shard_b": _task(
+                {"data_dir": {"type": "directory", "default": "data/b"}},
+                {"output_dir": {"type": "directory", "default": "shards/b"}},
+            ),
+            "train": _task(
+                {"shards_dir": {"type": "directory", "default": "shards"}},
+                {"model_dir": {"type": "directory", "default": "model"}},
+            ),
+            "report": _task({}, {"report": {"type": "file", "default": "/reports/report.txt"}}),
+        },
+    }
+)
+
+
+class TestTaskGraph(TestCase):
+    def test_dependencies(self) -> None:
+        graph = TaskGraph(_mlcube_config, ["download", "shard_a", "shard_b", "train", "report"])
+        self.assertListEqual(graph.tasks, ["download", "shard_a", "shard_b", "train", "report"])
+        self.assertSetEqual(graph.dependencies["download"], set())
+        self.assertSetEqual(graph.dependencies["shard_a"], {"download"})
+        self.assertSetEqual(graph.dependencies["shard_b"], {"download"})
+        self.assertSetEqual(graph.dependencies["train"], {"shard_a", "shard_b"})
+        self.assertSetEqual(graph.dependencies["report"], set())
+        self.assertListEqual(graph.dependents("download"), ["shard_a", "shard_b"])
+
+    def test_dependencies_never_point_forward(self) -> None:
+        graph = TaskGraph(_mlcube_config, ["train", "shard_a", "download"])
+        self.assertSetEqual(graph.dependencies["train"], set())
+        self.assertSetEqual(graph.dependencies["shard_a"], {"train"})
+        self.assertSetEqual(graph.dependencies["download"], {"shard_a"})
+
+    def test_duplicate_tasks(self) -> None:
+        graph = TaskGraph(_mlcube_config, ["download", "download"])
+        self.assertListEqual(graph.tasks, ["download"])
+
+
+class TestTaskScheduler(TestCase):
+    def test_independent_tasks_run_concurrently(self) -> None:
+        graph = TaskGraph(_mlcube_config, ["download", "shard_a", "shard_b", "train"])
+        barrier = threading.Barrier(2, timeout=5)
+        order: t.List[str] = []
+
+        def _run(_task: str) -> None:
+            if _task in ("shard_a", "shard_b"):
+                # Both shards must be running at the same time for this barrier to pass.
+                barrier.wait()
+            order.append(_task)
+
+        results = TaskScheduler(graph, num_workers=4).run(_run)
+        self.assertListEqual([r.status for r in results], [TaskStatus.SUCCEEDED] * 4)
+        self.assertEqual(order[0], "download")
+        self.assertEqual(order[-1], "train")
+        self.assertEqual(TaskScheduler.exit_code(results), 0)
+
+    def test_failure_cancels_only_dependents(self) -> None:
+        graph = TaskGraph(_mlcube_config, ["download", "shard_a", "shard_b", "train", "report"])
+        executed: t.List[str] = []
+
+        def _run(_task: str) -> None:
+            executed.append(_task)
+            if _task == "shard_a":
+                time.sleep(0.05)
+                raise ExecutionError("Failed to run task.", code=3)
+
+        results = {r.task: r for r in TaskScheduler(graph, num_workers=2).run(_run)}
+        self.assertEqual(results["shard_a"].status, TaskStatus.FAILED)
+        self.assertEqual(results["shard_a"].exit_code, 3)
+        self.assertEqual(results["shard_b"].status, TaskStatus.SUCCEEDED)
+        self.assertEqual(results["train"].status, TaskStatus.SKIPPED)
+        self.assertEqual(results["report"].status, TaskStatus.SUCCEEDED)
+        self.assertNotIn("train", executed)
+        self.assertEqual(TaskScheduler.exit_code(list(results.values())), 3)
+
+    def test_format_results(self) -> None:
+        summary = TaskScheduler.format_results(
+            [TaskResult("download", TaskStatus.SUCCEEDED, duration=1.5), TaskResult("train", TaskStatus.SKIPPED, 1)]
+        )
+        self.assertIn("download", summary)
+        self.assertIn(TaskStatus.SKIPPED, summary)
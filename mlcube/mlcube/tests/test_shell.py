@@ -31,6 +31,25 @@ class TestShell(TestCase):
         with self.assertRaises(ExecutionError):
             _ = Shell.run('python -c "print(message)"', on_error="raise")
 
+    def test_run_04(self) -> None:
+        # Output is streamed line by line, and the last lines are reported on errors.
+        lines: t.List[str] = []
+        cmd = ["python", "-c", "import sys; print('line 1'); print('line 2'); sys.exit(3)"]
+        with self.assertRaises(ExecutionError) as ctx:
+            _ = Shell.run(cmd, on_output=lines.append, tail=1, shell=False)
+        self.assertListEqual(lines, ["line 1\n", "line 2\n"])
+        self.assertEqual(ctx.exception.context["code"], 3)
+        self.assertEqual(ctx.exception.context["output"], "line 2")
+
+    def test_run_05(self) -> None:
+        exit_code = Shell.run(
+            ["python", "-c", "import time; time.sleep(10)"], on_error="ignore", timeout=0.5, shell=False
+        )
+        self.assertEqual(exit_code, 124)
+
+        exit_code = Shell.run(["8389dfb48c6f4a1aaa16bdda76c1fb11"], on_error="ignore", shell=False)
+        self.assertEqual(exit_code, 127)
+
     def test_run_and_capture_output(self) -> None:
         exit_code, version_str = Shell.run_and_capture_output(["python", "--version"])
         self.assertEqual(
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import typing as t
+from unittest import TestCase
+
+from omegaconf import DictConfig, OmegaConf
+
+from mlcube.errors import ConfigurationError, ExecutionError
+from mlcube.runner import Runner
+from mlcube.scheduler import TaskResult, TaskStatus
+from mlcube.sweep import Sweep
+
+_mlcube_config: DictConfig = OmegaConf.create(
+    {
+        "runtime": {"root": "/mlcube", "workspace": "/mlcube/workspace"},
+        "workspace": "/mlcube/workspace",
+        "runner": {},
+        "tasks": {
+            "train": {
+                "parameters": {
+                    "inputs": {"data_dir": {"type": "directory", "default": "data"}},
+                    "outputs": {"model_dir": {"type": "directory", "default": "model"}},
+                }
+            }
+        },
+    }
+)
+
+
+class _TestRunner(Runner):
+    """Runner that records data directories and fails for one of them."""
+
+    data_dirs: t.List[str] = []
+
+    def run(self) -> None:
+        data_dir = self.mlcube.tasks[self.task].parameters.inputs.data_dir.default
+        _TestRunner.data_dirs.append(data_dir)
+        if data_dir == "shards/01":
+            raise ExecutionError("Failed to run task.", code=2)
+
+
+class _BatchRunner(Runner):
+    """Runner that runs all sweep jobs at once."""
+
+    def run_sweep(self, sweep: Sweep, num_workers: int = 1) -> t.List[TaskResult]:
+        return [TaskResult(name, TaskStatus.SUCCEEDED) for name in sweep.job_names]
+
+
+class TestSweep(TestCase):
+    def _load(self, content: str) -> t.List[t.Dict[str, str]]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "sweep.yaml")
+            with open(path, "wt") as file:
+                file.write(content)
+            return Sweep.load_jobs(path)
+
+    def test_load_jobs(self) -> None:
+        self.assertListEqual(
+            self._load("- {data_dir: shards/00}\n- {data_dir: shards/01, model_dir: 1}\n"),
+            [{"data_dir": "shards/00"}, {"data_dir": "shards/01", "model_dir": "1"}],
+        )
+        self.assertListEqual(
+            self._load("grid:\n  data_dir: [a, b]\n  model_dir: [c, d]\n"),
+            [
+                {"data_dir": "a", "model_dir": "c"},
+                {"data_dir": "a", "model_dir": "d"},
+                {"data_dir": "b", "model_dir": "c"},
+                {"data_dir": "b", "model_dir": "d"},
+            ],
+        )
+        with self.assertRaises(ConfigurationError):
+            self._load("data_dir: a\n")
+
+    def test_job_config(self) -> None:
+        sweep = Sweep(_mlcube_config, "train", [{"data_dir": "shards/00"}, {"model_dir": "/models/01"}], "/sweeps")
+        self.assertListEqual(sweep.job_names, ["train_0", "train_1"])
+
+        job: DictConfig = sweep.job_config(1)
+        self.assertEqual(job.runtime.workspace, os.path.abspath("/sweeps/train_1"))
+        self.assertEqual(job.tasks.train.parameters.inputs.data_dir.default, "data")
+        self.assertEqual(job.tasks.train.parameters.outputs.model_dir.default, "/models/01")
+        # Base configuration is not modified.
+        self.assertEqual(_mlcube_config.tasks.train.parameters.outputs.model_dir.default, "model")
+
+        with self.assertRaises(ConfigurationError):
+            Sweep(_mlcube_config, "train", [{"learning_rate": "0.01"}], "/sweeps")
+
+    def test_run(self) -> None:
+        jobs = [{"data_dir": f"shards/{idx:02d}"} for idx in range(3)]
+        sweep = Sweep(_mlcube_config, "train", jobs, "/sweeps")
+        _TestRunner.data_dirs = []
+        results = sweep.run(_TestRunner, num_workers=2)
+
+        self.assertListEqual(sorted(_TestRunner.data_dirs), ["shards/00", "shards/01", "shards/02"])
+        self.assertListEqual(
+            [r.status for r in results], [TaskStatus.SUCCEEDED, TaskStatus.FAILED, TaskStatus.SUCCEEDED]
+        )
+        self.assertIn("data_dir=shards/01", sweep.format_results(results))
+
+    def test_run_sweep(self) -> None:
+        sweep = Sweep(_mlcube_config, "train", [{"data_dir": "shards/00"}, {"data_dir": "shards/01"}], "/sweeps")
+        results = sweep.run(_BatchRunner, num_workers=1)
+        self.assertListEqual([r.task for r in results], ["train_0", "train_1"])
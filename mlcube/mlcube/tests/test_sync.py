@@ -0,0 +1,102 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube.shell import Shell
+from mlcube.sync import LinkMode, Sync
+
+from omegaconf import OmegaConf
+
+
+class TestSync(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": str(self.root / "cache")})
+        self.env.start()
+
+        self.source = self.root / "source"
+        for rel_path, content in (("a.txt", "a"), ("sub/b.txt", "bb"), ("sub/deep/c.txt", "ccc")):
+            (self.source / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (self.source / rel_path).write_text(content)
+        (self.source / "empty").mkdir()
+        self.target = self.root / "target"
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def _touch(path: Path, content: str) -> None:
+        stat = path.stat()
+        path.write_text(content)
+        # Make sure modification time changes even on file systems with coarse timestamps.
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_link_mode(self) -> None:
+        for mode in ("copy", "hardlink", "reflink", "auto"):
+            self.assertTrue(LinkMode.is_valid(mode))
+        self.assertFalse(LinkMode.is_valid("symlink"))
+
+    def test_incremental_sync(self) -> None:
+        sync = Sync(num_workers=2)
+        stats = sync.sync(self.source, self.target)
+        self.assertEqual((stats.copied, stats.unchanged, stats.skipped), (3, 0, 0))
+        self.assertEqual((self.target / "sub/deep/c.txt").read_text(), "ccc")
+        self.assertTrue((self.target / "empty").is_dir())
+
+        stats = sync.sync(self.source, self.target)
+        self.assertEqual((stats.copied, stats.unchanged, stats.skipped), (0, 3, 0))
+
+        # Only changed and new files are transferred.
+        self._touch(self.source / "sub/b.txt", "new bb")
+        (self.source / "d.txt").write_text("d")
+        stats = sync.sync(self.source, self.target)
+        self.assertEqual((stats.copied, stats.unchanged, stats.skipped), (2, 2, 0))
+        self.assertEqual((self.target / "sub/b.txt").read_text(), "new bb")
+
+        # Files modified by users are never overwritten.
+        self._touch(self.target / "a.txt", "user data")
+        self._touch(self.source / "a.txt", "new a")
+        stats = sync.sync(self.source, self.target)
+        self.assertEqual((stats.copied, stats.skipped), (0, 1))
+        self.assertEqual((self.target / "a.txt").read_text(), "user data")
+
+    def test_targets_not_managed_by_mlcube(self) -> None:
+        self.target.mkdir()
+        stats = Sync().sync(self.source, self.target)
+        self.assertEqual((stats.copied, stats.skipped), (0, 1))
+        self.assertFalse((self.target / "a.txt").exists())
+
+    def test_checksum(self) -> None:
+        sync = Sync(checksum=True)
+        sync.sync(self.source / "a.txt", self.target)
+        self._touch(self.source / "a.txt", "a")
+        stats = sync.sync(self.source / "a.txt", self.target)
+        self.assertEqual((stats.copied, stats.unchanged), (0, 1))
+
+    def test_hardlink(self) -> None:
+        stats = Sync(link=LinkMode.HARDLINK).sync(self.source, self.target)
+        self.assertEqual(stats.linked, 3)
+        self.assertTrue(os.path.samefile(self.source / "a.txt", self.target / "a.txt"))
+
+    def test_sync_workspace(self) -> None:
+        mlcube = OmegaConf.create({
+            "runtime": {"root": str(self.root), "workspace": str(self.root / "custom_workspace")},
+            "sync": {"link": "auto"},
+            "tasks": {
+                "train": {"parameters": {"inputs": {"data": {"type": "directory", "default": "data"}}, "outputs": {}}}
+            },
+        })
+        os.rename(self.source, self.root / "workspace")
+        (self.root / "workspace" / "data").mkdir()
+        (self.root / "workspace" / "data" / "x.txt").write_text("x")
+
+        Shell.sync_workspace(mlcube, "train")
+        self.assertEqual((self.root / "custom_workspace" / "data" / "x.txt").read_text(), "x")
+
+        self._touch(self.root / "workspace" / "data" / "x.txt", "new x")
+        Shell.sync_workspace(mlcube, "train")
+        self.assertEqual((self.root / "custom_workspace" / "data" / "x.txt").read_text(), "new x")
@@ -1,24 +1,31 @@
+import atexit
 import json
 import logging
 import os
 import shlex
+import threading
 import typing as t
 from pathlib import Path
 
 from omegaconf import DictConfig, OmegaConf
 
+from mlcube.cache import Cache
 from mlcube.errors import (
     ConfigurationError,
     ExecutionError,
     IllegalParameterValueError,
     MLCubeError,
 )
+from mlcube.lock import FileLock
 from mlcube.parser import CliParser, DeviceSpecs
+from mlcube.profiler import Profiler
 from mlcube.runner import Runner, RunnerConfig
 from mlcube.shell import Shell
 from mlcube.validate import Validate
 
-__all__ = ["Config", "DockerRun"]
+from mlcube_docker.fingerprint import BuildFingerprint
+
+__all__ = ["Config", "ImageCache", "ContainerPool", "DockerRun"]
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +74,23 @@ class Config(RunnerConfig):
                     "build_strategy", build_strategy, "['pull', 'auto', 'always']"
                 )
 
+    class ImageCacheMode(object):
+        """How results of docker image lookups (`docker inspect`) are cached (see `ImageCache`)."""
+
+        NONE = "none"
+        """Do not cache, query docker every time."""
+
+        PROCESS = "process"
+        """Cache results in memory of the current MLCube process (default)."""
+
+        DISK = "disk"
+        """Cache results in memory and on disk, so that they can be reused by other MLCube processes."""
+
+        @staticmethod
+        def validate(image_cache: t.Text) -> None:
+            if image_cache not in ("none", "process", "disk"):
+                raise IllegalParameterValueError("image_cache", image_cache, "['none', 'process', 'disk']")
+
     DEFAULT = OmegaConf.create(
         {
             "runner": "docker",
@@ -85,6 +109,10 @@ class Config(RunnerConfig):
             #   'always': build even if image found
             # TODO: The above variable may be confusing. Is `configure_strategy` better? Docker uses `--pull`
             #       switch as build arg to force pulling the base image.
+            "image_cache": "process",  # How to cache docker image lookups: 'none', 'process' or 'disk'.
+            "build_fingerprint": True,  # Skip `docker build` when build context, build file and build args have not
+            # changed since the image was built (see `mlcube_docker.fingerprint.BuildFingerprint`).
+            "reuse_container": False,  # Run tasks in one long-running container per (image, mounts) via `docker exec`.
             "--network": None,  # Networking options defined during MLCube container execution.
             "--security-opt": None,  # Security options for Docker.
             "--gpus": None,  # GPU usage options defined during MLCube container execution.
@@ -116,6 +144,7 @@ class Config(RunnerConfig):
             ["image", "docker", "build_strategy"], str, blanks=False
         )
         Config.BuildStrategy.validate(mlcube.runner.build_strategy)
+        Config.ImageCacheMode.validate(mlcube.runner.image_cache)
 
         if isinstance(mlcube.runner.build_args, DictConfig):
             mlcube.runner.build_args = Shell.to_cli_args(
@@ -127,6 +156,184 @@ class Config(RunnerConfig):
             )
 
 
+class ImageCache(object):
+    """Cache of docker image lookups (image IDs) keyed on docker executable and image name.
+
+    Checking if an image exists (`docker inspect`) is a round trip to a docker daemon. When MLCube runs multiple tasks
+    with the same image, only the first lookup queries docker. Only existing images are cached. Cached entries are
+    invalidated when images are pulled or built (`DockerRun.configure`). With `disk` mode, image IDs are also stored in
+    MLCube cache directory (see `mlcube.cache.Cache`) and are shared across MLCube processes. Images that have been
+    removed outside MLCube (e.g., `docker rmi`) may then be reported as existing, in which case MLCube task fails,
+    and users need to either run `mlcube configure` or remove the cache file.
+    """
+
+    _lock = threading.Lock()
+    _images: t.Dict[t.Tuple[str, str], str] = {}
+    """Per-process cache: mapping from (docker, image) to image ID."""
+
+    @staticmethod
+    def cache_file() -> Path:
+        """Return path to the on-disk cache file."""
+        return Cache.path("docker", "images.json")
+
+    @staticmethod
+    @Profiler.profile()
+    def get_image_id(docker: t.Text, image: t.Text, mode: t.Text = Config.ImageCacheMode.PROCESS) -> t.Optional[str]:
+        """Return image ID (without `sha256:` prefix) or None if image does not exist.
+
+        Args:
+            docker: Docker executable (docker/sudo docker/podman/nvidia-docker/...).
+            image: Name of a docker image.
+            mode: Cache mode (one of `Config.ImageCacheMode` values).
+        """
+        key = (docker, image)
+        if mode != Config.ImageCacheMode.NONE:
+            with ImageCache._lock:
+                image_id: t.Optional[str] = ImageCache._images.get(key, None)
+            if image_id is None and mode == Config.ImageCacheMode.DISK:
+                image_id = (Cache.read_json(ImageCache.cache_file()) or {}).get(ImageCache._disk_key(key), None)
+            if image_id is not None:
+                logger.debug("ImageCache.get_image_id cache hit (docker=%s, image=%s, id=%s).", docker, image, image_id)
+                with ImageCache._lock:
+                    ImageCache._images[key] = image_id
+                return image_id
+
+        exit_code, output = Shell.run_and_capture_output(
+            shlex.split(docker) + ["inspect", "--type=image", "--format={{.Id}}", image]
+        )
+        if exit_code != 0 or not output:
+            return None
+        image_id = output.splitlines()[-1].strip()
+        if image_id.startswith("sha256:"):
+            image_id = image_id[7:]
+
+        if mode != Config.ImageCacheMode.NONE:
+            with ImageCache._lock:
+                ImageCache._images[key] = image_id
+            if mode == Config.ImageCacheMode.DISK:
+                ImageCache._update_disk_cache(key, image_id)
+        return image_id
+
+    @staticmethod
+    def invalidate(docker: t.Text, image: t.Text) -> None:
+        """Remove cached entry for this image (it has been built or pulled)."""
+        key = (docker, image)
+        with ImageCache._lock:
+            ImageCache._images.pop(key, None)
+        if ImageCache.cache_file().exists():
+            ImageCache._update_disk_cache(key, None)
+
+    @staticmethod
+    def _disk_key(key: t.Tuple[str, str]) -> str:
+        return f"{key[0]} {key[1]}"
+
+    @staticmethod
+    def _update_disk_cache(key: t.Tuple[str, str], image_id: t.Optional[str]) -> None:
+        """Add (image_id is not None) or remove (image_id is None) the on-disk cache entry."""
+        images: t.Dict = Cache.read_json(ImageCache.cache_file()) or {}
+        if image_id is None:
+            if images.pop(ImageCache._disk_key(key), None) is None:
+                return
+        else:
+            images[ImageCache._disk_key(key)] = image_id
+        Cache.write_json(ImageCache.cache_file(), images)
+
+
+class ContainerPool(object):
+    """Long-running containers that run MLCube tasks with `docker exec` (`reuse_container: true`).
+
+    One container is started per unique combination of docker executable, image, run arguments, environment variables
+    and volumes. When the image changes (e.g., it has been rebuilt or pulled), its container is replaced with a new one
+    started from the new image. The container runs an idle shell loop (so images must provide `sh`), and tasks are
+    executed in it with `docker exec`. This saves container creation and volume setup costs for every task except the
+    first one. All containers started by the current MLCube process are removed when this process exits.
+    """
+
+    _lock = threading.Lock()
+    _containers: t.Dict[t.Tuple[str, ...], t.Tuple[str, str]] = {}
+    """Mapping from container key to image ID and container ID."""
+
+    _entrypoints: t.Dict[str, t.List[str]] = {}
+    """Mapping from container ID to entrypoint of its image."""
+
+    _IDLE_COMMAND = ["-c", "trap 'exit 0' TERM INT; while true; do sleep 3600 & wait $!; done"]
+    """Arguments of the `sh` entrypoint of a long-running container."""
+
+    @staticmethod
+    def get_container(docker: t.Text, image: t.Text, image_id: t.Text, run_args: t.Text, env_args: t.Text,
+                      volumes: t.Text) -> str:
+        """Return ID of a running container for these parameters starting a new one if needed.
+
+        Args:
+            docker: Docker executable (docker/sudo docker/podman/nvidia-docker/...).
+            image: Name of a docker image.
+            image_id: Current ID of this image (see `ImageCache.get_image_id`). Containers of other images are removed.
+            run_args: Docker run arguments (without entrypoint).
+            env_args: Environment variables (`-e NAME=VALUE ...`).
+            volumes: Volumes (`--volume=HOST:CONTAINER ...`).
+        Returns:
+            Container ID.
+        """
+        key = (docker, image, run_args.strip(), env_args.strip(), volumes.strip())
+        with ContainerPool._lock:
+            container_image_id, container_id = ContainerPool._containers.get(key, (None, None))
+            if container_id is not None and container_image_id == image_id:
+                logger.debug("ContainerPool.get_container reusing container (id=%s, image=%s).", container_id, image)
+                return container_id
+            if container_id is not None:
+                logger.info(
+                    "ContainerPool.get_container image has changed, removing container (id=%s, image=%s, old_id=%s, "
+                    "new_id=%s).", container_id, image, container_image_id, image_id
+                )
+                del ContainerPool._containers[key]
+                ContainerPool._entrypoints.pop(container_id, None)
+                Shell.run_and_capture_output(shlex.split(docker) + ["rm", "--force", container_id])
+
+            cmd: t.List[str] = shlex.split(docker) + ["run", "--detach", "--rm", "--entrypoint=sh"]
+            cmd += shlex.split(" ".join((run_args, env_args, volumes))) + [image] + ContainerPool._IDLE_COMMAND
+            exit_code, output = Shell.run_and_capture_output(cmd)
+            if exit_code != 0:
+                raise ExecutionError(
+                    "Failed to start long-running container.", code=exit_code, cmd=" ".join(cmd), output=output
+                )
+            container_id = output.splitlines()[-1].strip()
+            if not ContainerPool._containers:
+                atexit.register(ContainerPool.shutdown)
+            ContainerPool._containers[key] = (image_id, container_id)
+            logger.info("ContainerPool.get_container started container (id=%s, image=%s).", container_id, image)
+            return container_id
+
+    @staticmethod
+    def get_entrypoint(docker: t.Text, image: t.Text, container_id: str) -> t.List[str]:
+        """Return entrypoint of the image of a long-running container (can be empty).
+
+        The image is inspected once per container, and the result is reused by all tasks running in this container.
+        """
+        with ContainerPool._lock:
+            entrypoint: t.Optional[t.List[str]] = ContainerPool._entrypoints.get(container_id, None)
+        if entrypoint is None:
+            exit_code, output = Shell.run_and_capture_output(
+                shlex.split(docker) + ["inspect", "--type=image", "--format={{json .Config.Entrypoint}}", image]
+            )
+            if exit_code != 0:
+                raise ExecutionError("Failed to inspect docker image.", code=exit_code, image=image, output=output)
+            entrypoint = json.loads(output) or []
+            with ContainerPool._lock:
+                ContainerPool._entrypoints[container_id] = entrypoint
+        return entrypoint
+
+    @staticmethod
+    def shutdown() -> None:
+        """Remove all containers started by this process."""
+        with ContainerPool._lock:
+            containers = list(ContainerPool._containers.items())
+            ContainerPool._containers.clear()
+            ContainerPool._entrypoints.clear()
+        for (docker, _, _, _, _), (_, container_id) in containers:
+            logger.info("ContainerPool.shutdown removing container (id=%s).", container_id)
+            Shell.run_and_capture_output(shlex.split(docker) + ["rm", "--force", container_id])
+
+
 class DockerRun(Runner):
     """Docker runner."""
 
@@ -137,8 +344,20 @@ class DockerRun(Runner):
     ) -> None:
         super().__init__(mlcube, task)
 
+    @Profiler.profile()
     def configure(self) -> None:
-        """Build Docker image on a current host."""
+        """Build Docker image on a current host.
+
+        MLCube processes that configure the same image at the same time do it one at a time (see `FileLock`).
+        """
+        with self._build_lock():
+            self._configure()
+
+    def _build_lock(self) -> FileLock:
+        """Return cross-process lock for building or pulling this docker image."""
+        return FileLock.for_key("docker", self.mlcube.runner.docker, self.mlcube.runner.image)
+
+    def _configure(self) -> None:
         image: t.Text = self.mlcube.runner.image
         context: t.Text = os.path.abspath(
             os.path.join(self.mlcube.runtime.root, self.mlcube.runner.build_context)
@@ -147,6 +366,7 @@ class DockerRun(Runner):
             os.path.join(context, self.mlcube.runner.build_file)
         )
         docker: t.Text = self.mlcube.runner.docker
+        ImageCache.invalidate(docker, image)
 
         # Build strategies: `pull`, `auto` and `always`.
         build_strategy: t.Text = self.mlcube.runner.build_strategy
@@ -167,7 +387,7 @@ class DockerRun(Runner):
                     build_strategy,
                 )
             try:
-                Shell.run([docker, "pull", image])
+                Shell.run(shlex.split(docker) + ["pull", image], shell=False)
             except ExecutionError as err:
                 description = f"Error occurred while pulling docker image (docker={docker}, image={image})."
                 if build_recipe_exists:
@@ -187,10 +407,25 @@ class DockerRun(Runner):
                 build_recipe_exists,
             )
             build_args: t.Text = self.mlcube.runner.build_args
+            image_cache: t.Text = self.mlcube.runner.image_cache
+            fingerprint: t.Optional[t.Text] = None
+            if self._use_build_fingerprint(build_args):
+                fingerprint = BuildFingerprint.compute(context, recipe, build_args)
+                image_id = ImageCache.get_image_id(docker, image, image_cache)
+                if image_id is not None and fingerprint == BuildFingerprint.get_image_fingerprint(
+                    docker, image, image_id
+                ):
+                    logger.info(
+                        "DockerRun.configure skipping build, inputs have not changed (image=%s, fingerprint=%s).",
+                        image,
+                        fingerprint,
+                    )
+                    BuildFingerprint.save(docker, image, fingerprint, image_id)
+                    return
+                build_args = f"{build_args or ''} --label {BuildFingerprint.LABEL}={fingerprint}".strip()
             try:
-                Shell.run(
-                    [docker, "build", build_args, "-t", image, "-f", recipe, context]
-                )
+                cmd: t.List[str] = shlex.split(docker) + ["build"] + shlex.split(build_args or "")
+                Shell.run(cmd + ["-t", image, "-f", recipe, context], shell=False)
             except ExecutionError as err:
                 raise ExecutionError.mlcube_configure_error(
                     self.__class__.__name__,
@@ -198,7 +433,22 @@ class DockerRun(Runner):
                     f"image={image}, recipe={recipe}, context={context}).",
                     **err.context,
                 )
+            ImageCache.invalidate(docker, image)
+            if fingerprint is not None:
+                BuildFingerprint.save(docker, image, fingerprint, ImageCache.get_image_id(docker, image, image_cache))
+
+    def _use_build_fingerprint(self, build_args: t.Optional[t.Text]) -> bool:
+        """Return true if docker builds can be skipped when build inputs have not changed.
 
+        Fingerprints are not used when disabled by users, or when build arguments request a fresh build (`--no-cache`,
+        `--pull`), since in these cases results of a build depend on more than the build context.
+        """
+        if not self.mlcube.runner.get("build_fingerprint", True):
+            return False
+        args = shlex.split(build_args or "")
+        return not any(arg in ("--no-cache", "--pull") or arg.startswith(("--no-cache=", "--pull=")) for arg in args)
+
+    @Profiler.profile()
     def run(self) -> None:
         """Run a cube."""
         docker: t.Text = self.mlcube.runner.docker
@@ -207,14 +457,21 @@ class DockerRun(Runner):
         build_strategy: t.Text = self.mlcube.runner.build_strategy
         if (
             build_strategy == Config.BuildStrategy.ALWAYS
-            or not Shell.docker_image_exists(docker, image)
+            or ImageCache.get_image_id(docker, image, self.mlcube.runner.image_cache) is None
         ):
-            logger.warning(
-                "Docker image (%s) does not exist or build strategy is 'always'. "
-                "Will run 'configure' phase.",
-                image,
-            )
-            self.configure()
+            with self._build_lock() as lock:
+                # Another MLCube process may have built or pulled this image while this one was waiting for the lock.
+                if (
+                    build_strategy == Config.BuildStrategy.ALWAYS
+                    or not lock.waited
+                    or ImageCache.get_image_id(docker, image, self.mlcube.runner.image_cache) is None
+                ):
+                    logger.warning(
+                        "Docker image (%s) does not exist or build strategy is 'always'. "
+                        "Will run 'configure' phase.",
+                        image,
+                    )
+                    self._configure()
         # Deal with user-provided workspace
         try:
             Shell.sync_workspace(self.mlcube, self.task)
@@ -276,6 +533,10 @@ class DockerRun(Runner):
                 "Setting GPUs flag to --gpus=%s. CUDA_VISIBLE_DEVICES will not be set.", docker_specs.gpus
             )
 
+        if self.mlcube.runner.reuse_container:
+            self._run_in_container(docker, image, run_args, env_args, volumes, task_args)
+            return
+
         if "entrypoint" in self.mlcube.tasks[self.task]:
             logger.info(
                 "Using custom task entrypoint: task=%s, entrypoint='%s'",
@@ -314,44 +575,26 @@ class DockerRun(Runner):
             # first positional arguments.
             _ = task_args.pop(0)
 
+        # Arguments are passed to docker as is (no shell), so task parameters may contain whitespaces and shell
+        # special characters.
+        cmd: t.List[str] = shlex.split(docker) + ["run"] + shlex.split(" ".join((run_args, env_args, volumes)))
+        cmd.append(image)
         try:
             if ("entrypoint" in self.mlcube.tasks[self.task]) and (
                 len(shlex.split(self.mlcube.tasks[self.task].entrypoint)) > 1
             ):
                 # entrypoint with multiple arguments e.g. "python something.py" or "sh something.sh"
-                args_for_new_entrypoint = " ".join(
-                    shlex.split(self.mlcube.tasks[self.task].entrypoint)[1:]
-                )
-                Shell.run(
-                    [
-                        docker,
-                        "run",
-                        run_args,
-                        env_args,
-                        volumes,
-                        image,
-                        args_for_new_entrypoint,
-                        " ".join(task_args),
-                    ]
-                )
+                cmd.extend(shlex.split(self.mlcube.tasks[self.task].entrypoint)[1:])
+                cmd.extend(task_args)
             elif ("entrypoint" in self.mlcube.tasks[self.task]) and (
                 len(shlex.split(self.mlcube.tasks[self.task].entrypoint)) == 1
             ):
                 #  new entrypoint executable specified with no optional parameters (e.g. entrypoint: "/bin/bash")
-                Shell.run([docker, "run", run_args, env_args, volumes, image])
+                pass
             else:
                 #  no new entrypoints specified, "entrypoint: " blank
-                Shell.run(
-                    [
-                        docker,
-                        "run",
-                        run_args,
-                        env_args,
-                        volumes,
-                        image,
-                        " ".join(task_args),
-                    ]
-                )
+                cmd.extend(task_args)
+            Shell.run(cmd, shell=False)
 
         except ExecutionError as err:
             raise ExecutionError.mlcube_run_error(
@@ -361,33 +604,48 @@ class DockerRun(Runner):
                 **err.context,
             )
 
+    def _run_in_container(
+        self, docker: t.Text, image: t.Text, run_args: t.Text, env_args: t.Text, volumes: t.Text, task_args: t.List[str]
+    ) -> None:
+        """Run task in a long-running container with `docker exec` (see `ContainerPool`).
+
+        The command is the same one that `docker run` would run: image entrypoint followed by task arguments, or custom
+        task entrypoint (optionally) followed by task arguments without task name.
+        """
+        entrypoint: t.Optional[str] = self.mlcube.tasks[self.task].get("entrypoint", None)
+        try:
+            image_id: t.Optional[str] = ImageCache.get_image_id(docker, image, self.mlcube.runner.image_cache)
+            if image_id is None:
+                raise ExecutionError("Docker image does not exist.", image=image)
+            container_id = ContainerPool.get_container(docker, image, image_id, run_args, env_args, volumes)
+            if entrypoint is not None:
+                cmd = shlex.split(entrypoint)
+                if len(cmd) > 1:
+                    cmd.extend(task_args[1:])
+            else:
+                cmd = ContainerPool.get_entrypoint(docker, image, container_id) + task_args
+            Shell.run(shlex.split(docker) + ["exec", container_id] + cmd, shell=False)
+        except ExecutionError as err:
+            raise ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                f"Error occurred while running MLCube task in a long-running container (docker={docker}, "
+                f"run_args={run_args}, env_args={env_args}, volumes={volumes}, image={image}, task_args={task_args}).",
+                **err.context,
+            )
+
     def inspect(self, force: bool = False) -> t.Dict:
         docker: str = self.mlcube.runner.docker
         image: str = self.mlcube.runner.image
-        if not Shell.docker_image_exists(docker, image):
+        image_cache: str = self.mlcube.runner.image_cache
+        image_id: t.Optional[str] = ImageCache.get_image_id(docker, image, image_cache)
+        if image_id is None:
             if not force:
                 raise MLCubeError(
                     "MLCube does not exist. Either configure MLCube (e.g., `mlcube configure ...`) or set `force` "
                     "argument to True (e.g., `mlcube inspect --force ...`)."
                 )
             self.configure()
-
-        docker_inspect_cmd = [docker, "inspect", image]
-        exit_code, output = Shell.run_and_capture_output(docker_inspect_cmd)
-        if exit_code != 0:
-            raise MLCubeError(output)
-
-        image_info: t.List[t.Dict] = json.loads(output)
-        if (
-            not isinstance(image_info, list)
-            or len(image_info) != 1
-            or not isinstance(image_info[0], dict)
-        ):
-            raise MLCubeError(
-                f"Unexpected output from `{' '.join(docker_inspect_cmd)}`. Expected a list of dicts of length 1."
-            )
-
-        image_id: str = image_info[0].get("Id", None)
-        if image_id and image_id.startswith("sha256:"):
-            image_id = image_id[7:]
+            image_id = ImageCache.get_image_id(docker, image, image_cache)
+            if image_id is None:
+                raise MLCubeError(f"Docker image ({image}) does not exist after configuring MLCube (docker={docker}).")
         return {"hash": image_id}
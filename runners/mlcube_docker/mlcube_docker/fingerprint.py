@@ -0,0 +1,189 @@
+"""Fingerprints of docker build inputs used to skip unnecessary `docker build` calls.
+
+- `DockerIgnore`: Match paths against `.dockerignore` patterns.
+- `BuildFingerprint`: Compute and store fingerprints of docker builds (build context, build file and build arguments).
+"""
+import logging
+import os
+import re
+import shlex
+import typing as t
+from pathlib import Path
+
+from mlcube.cache import Cache
+from mlcube.shell import Shell
+
+__all__ = ["DockerIgnore", "BuildFingerprint"]
+
+logger = logging.getLogger(__name__)
+
+
+class DockerIgnore(object):
+    """Match paths against `.dockerignore` patterns.
+
+    Supported syntax follows docker: `*`, `?`, `[...]`, `**` (any number of directories), `!` (exceptions, the last
+    matching pattern wins) and comments (`#`). A path is excluded when a pattern matches the path itself or any of its
+    parent directories.
+
+    Args:
+        patterns: List of patterns (lines of `.dockerignore` file).
+    """
+
+    def __init__(self, patterns: t.List[str]) -> None:
+        self.rules: t.List[t.Tuple[t.Pattern, bool]] = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negate = pattern.startswith("!")
+            if negate:
+                pattern = pattern[1:].strip()
+            pattern = os.path.normpath(pattern.lstrip("/")).replace(os.sep, "/")
+            if pattern == ".":
+                continue
+            self.rules.append((re.compile(DockerIgnore._to_regex(pattern)), negate))
+
+    @staticmethod
+    def from_context(context: str) -> "DockerIgnore":
+        """Load `.dockerignore` from the build context directory (no patterns if it does not exist)."""
+        try:
+            with open(os.path.join(context, ".dockerignore"), "rt") as file:
+                return DockerIgnore(file.read().splitlines())
+        except FileNotFoundError:
+            return DockerIgnore([])
+
+    @staticmethod
+    def _to_regex(pattern: str) -> str:
+        regex, idx = "", 0
+        while idx < len(pattern):
+            char = pattern[idx]
+            if pattern.startswith("**/", idx):
+                regex, idx = regex + "(?:.*/)?", idx + 3
+                continue
+            if pattern.startswith("**", idx):
+                regex, idx = regex + ".*", idx + 2
+                continue
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "[":
+                end = pattern.find("]", idx + 1)
+                if end < 0:
+                    regex += re.escape(char)
+                else:
+                    regex += "[" + pattern[idx + 1:end].replace("\\", "\\\\") + "]"
+                    idx = end
+            else:
+                regex += re.escape(char)
+            idx += 1
+        return f"^{regex}$"
+
+    def is_excluded(self, rel_path: str) -> bool:
+        """Return true if this path (relative to build context, `/` separated) is excluded from build context."""
+        parts = rel_path.split("/")
+        candidates = ["/".join(parts[:idx]) for idx in range(1, len(parts) + 1)]
+        excluded = False
+        for regex, negate in self.rules:
+            if any(regex.match(candidate) for candidate in candidates):
+                excluded = not negate
+        return excluded
+
+
+class BuildFingerprint(object):
+    """Compute and store fingerprints of docker builds.
+
+    A fingerprint is a digest of build context files (paths, permissions and content, respecting `.dockerignore`),
+    build file content and build arguments. Fingerprints are stored as image labels (`LABEL`) and in a local index
+    (MLCube cache directory) along with image IDs. When the fingerprint of current build inputs matches the fingerprint
+    of an existing image, `docker build` does not need to run. Content digests of files are memoized by file size,
+    modification time and inode, so unchanged files are not re-read.
+    """
+
+    LABEL = "org.mlcommons.mlcube.build.fingerprint"
+    """Docker image label to store build fingerprint."""
+
+    @staticmethod
+    def compute(context: str, recipe: str, build_args: str) -> str:
+        """Compute fingerprint of docker build inputs.
+
+        Args:
+            context: Build context directory.
+            recipe: Build file (Dockerfile).
+            build_args: Docker build arguments.
+        Returns:
+            Fingerprint (hex digest).
+        """
+        context = os.path.abspath(context)
+        docker_ignore = DockerIgnore.from_context(context)
+        memo_file = Cache.path("docker", "contexts", Cache.digest(context) + ".json")
+        memo: t.Dict[str, t.List] = Cache.read_json(memo_file) or {}
+        new_memo: t.Dict[str, t.List] = {}
+
+        files: t.List[t.Tuple[str, bool, str]] = []
+        for dir_path, dir_names, file_names in os.walk(context):
+            rel_dir = os.path.relpath(dir_path, context).replace(os.sep, "/")
+            rel_dir = "" if rel_dir == "." else rel_dir + "/"
+            # Prune excluded directories unless exceptions may re-include their content.
+            if not any(negate for _, negate in docker_ignore.rules):
+                dir_names[:] = [name for name in dir_names if not docker_ignore.is_excluded(rel_dir + name)]
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                rel_path = rel_dir + file_name
+                if docker_ignore.is_excluded(rel_path):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Broken symbolic link.
+                state = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+                cached = memo.get(rel_path, None)
+                digest = cached[3] if cached is not None and cached[:3] == state else Cache.file_digest(path)
+                new_memo[rel_path] = state + [digest]
+                files.append((rel_path, bool(stat.st_mode & 0o111), digest))
+
+        if new_memo != memo:
+            Cache.write_json(memo_file, new_memo)
+        with open(recipe, "rb") as file:
+            recipe_content = file.read()
+        return Cache.digest(files, recipe_content, build_args or "")
+
+    @staticmethod
+    def index_file() -> Path:
+        """Return path to the local index file (mapping from docker and image name to fingerprint and image ID)."""
+        return Cache.path("docker", "builds.json")
+
+    @staticmethod
+    def get_image_fingerprint(docker: str, image: str, image_id: t.Optional[str]) -> t.Optional[str]:
+        """Return fingerprint of an existing image, or None if not known.
+
+        The local index is checked first (valid when the image ID has not changed), then the image label.
+
+        Args:
+            docker: Docker executable.
+            image: Image name.
+            image_id: Current ID of this image.
+        """
+        index: t.Dict = Cache.read_json(BuildFingerprint.index_file()) or {}
+        entry: t.Optional[t.Dict] = index.get(f"{docker} {image}", None)
+        if entry is not None and image_id is not None and entry.get("image_id", None) == image_id:
+            return entry.get("fingerprint", None)
+
+        label_format = "--format={{index .Config.Labels \"%s\"}}" % BuildFingerprint.LABEL
+        exit_code, output = Shell.run_and_capture_output(
+            shlex.split(docker) + ["inspect", "--type=image", label_format, image]
+        )
+        if exit_code != 0:
+            return None
+        output = output.strip()
+        return output if output and output != "<no value>" else None
+
+    @staticmethod
+    def save(docker: str, image: str, fingerprint: str, image_id: t.Optional[str]) -> None:
+        """Save image fingerprint in local index."""
+        if image_id is None:
+            return
+        index: t.Dict = Cache.read_json(BuildFingerprint.index_file()) or {}
+        index[f"{docker} {image}"] = {"fingerprint": fingerprint, "image_id": image_id}
+        Cache.write_json(BuildFingerprint.index_file(), index)
@@ -40,3 +40,8 @@ class TestConfig(TestCase):
 
         self.assertIsInstance(config.runner.build_args, str)
         self.assertIsInstance(config.runner.env_args, str)
+
+    def test_image_cache_mode(self) -> None:
+        for mode in ('none', 'process', 'disk'):
+            Config.ImageCacheMode.validate(mode)
+        self.assertRaises(IllegalParameterValueError, Config.ImageCacheMode.validate, 'memory')
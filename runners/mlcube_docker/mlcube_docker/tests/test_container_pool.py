@@ -0,0 +1,101 @@
+import typing as t
+from unittest import TestCase
+from unittest.mock import mock_open, patch
+
+from mlcube_docker.docker_run import Config, ContainerPool, DockerRun, ImageCache
+from omegaconf import DictConfig, OmegaConf
+
+from mlcube.config import MLCubeConfig
+from mlcube.shell import Shell
+
+_MLCUBE_CONFIG = """
+docker:
+  image: ubuntu:18.04
+  reuse_container: true
+tasks:
+  ls: {parameters: {inputs: {}, outputs: {}}}
+  free: {entrypoint: '/usr/bin/free -h', parameters: {inputs: {}, outputs: {}}}
+"""
+
+
+class TestContainerPool(TestCase):
+    def setUp(self) -> None:
+        ContainerPool._containers.clear()
+        ContainerPool._entrypoints.clear()
+        with patch("io.open", mock_open(read_data=_MLCUBE_CONFIG)):
+            self.mlcube: DictConfig = MLCubeConfig.create_mlcube_config(
+                "/some/path/to/mlcube.yaml", runner_config=Config.DEFAULT, runner_cls=DockerRun
+            )
+
+    def tearDown(self) -> None:
+        ContainerPool._containers.clear()
+        ContainerPool._entrypoints.clear()
+
+    @patch.object(Shell, "sync_workspace")
+    @patch.object(ImageCache, "get_image_id", return_value="0123abcd")
+    @patch.object(Shell, "run", return_value=0)
+    @patch.object(Shell, "run_and_capture_output")
+    def test_reuse_container(self, run_and_capture_output: t.Any, run: t.Any, *_: t.Any) -> None:
+        def _docker(cmd: t.List[str]) -> t.Tuple[int, str]:
+            if cmd[1] == "run":
+                return 0, "container_id"
+            if cmd[1] == "inspect":
+                return 0, '["python", "/workspace/main.py"]'
+            return 0, ""
+
+        run_and_capture_output.side_effect = _docker
+        with patch("atexit.register"):
+            DockerRun(OmegaConf.create(self.mlcube), task="ls").run()
+            DockerRun(OmegaConf.create(self.mlcube), task="free").run()
+            DockerRun(OmegaConf.create(self.mlcube), task="ls").run()
+
+        docker_run_cmds = [c.args[0] for c in run_and_capture_output.call_args_list if c.args[0][1] == "run"]
+        self.assertEqual(len(docker_run_cmds), 1)
+        self.assertIn("--detach", docker_run_cmds[0])
+        self.assertIn("--entrypoint=sh", docker_run_cmds[0])
+        # Image entrypoint is inspected once per container.
+        self.assertEqual(len([c for c in run_and_capture_output.call_args_list if c.args[0][1] == "inspect"]), 1)
+
+        self.assertListEqual(
+            [" ".join(c.args[0]) for c in run.call_args_list],
+            [
+                "docker exec container_id python /workspace/main.py ls",
+                "docker exec container_id /usr/bin/free -h",
+                "docker exec container_id python /workspace/main.py ls",
+            ],
+        )
+        # Tasks run without a shell.
+        self.assertTrue(all(c.kwargs["shell"] is False for c in run.call_args_list))
+
+        ContainerPool.shutdown()
+        run_and_capture_output.assert_called_with(["docker", "rm", "--force", "container_id"])
+
+    @patch.object(Shell, "sync_workspace")
+    @patch.object(ImageCache, "get_image_id")
+    @patch.object(Shell, "run", return_value=0)
+    @patch.object(Shell, "run_and_capture_output")
+    def test_image_changed(self, run_and_capture_output: t.Any, run: t.Any, get_image_id: t.Any, _: t.Any) -> None:
+        containers = iter(["container_1", "container_2"])
+
+        def _docker(cmd: t.List[str]) -> t.Tuple[int, str]:
+            if cmd[1] == "run":
+                return 0, next(containers)
+            if cmd[1] == "inspect":
+                return 0, '["python", "/workspace/main.py"]'
+            return 0, ""
+
+        run_and_capture_output.side_effect = _docker
+        # The image is rebuilt (e.g., `build_strategy: always`) before the third task.
+        get_image_id.side_effect = ["0123abcd"] * 4 + ["4567cdef"] * 2
+        with patch("atexit.register"):
+            for _ in range(3):
+                DockerRun(OmegaConf.create(self.mlcube), task="ls").run()
+
+        cmds = [c.args[0][1:] for c in run_and_capture_output.call_args_list if c.args[0][1] in ("run", "rm")]
+        self.assertEqual([cmd[0] for cmd in cmds], ["run", "rm", "run"])
+        self.assertListEqual(cmds[1], ["rm", "--force", "container_1"])
+        self.assertListEqual(
+            [c.args[0][2] for c in run.call_args_list], ["container_1", "container_1", "container_2"]
+        )
+        # Entrypoint of the new image is inspected again.
+        self.assertEqual(len([c for c in run_and_capture_output.call_args_list if c.args[0][1] == "inspect"]), 2)
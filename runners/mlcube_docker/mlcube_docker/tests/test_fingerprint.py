@@ -0,0 +1,127 @@
+import os
+import tempfile
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube_docker.docker_run import Config, DockerRun, ImageCache
+from mlcube_docker.fingerprint import BuildFingerprint, DockerIgnore
+from omegaconf import OmegaConf
+
+from mlcube.shell import Shell
+
+
+class TestDockerIgnore(TestCase):
+    def test_patterns(self) -> None:
+        ignore = DockerIgnore(["# comment", "*.log", "build/", "**/__pycache__", "data/*/raw", "!keep.log", ""])
+        self.assertTrue(ignore.is_excluded("app.log"))
+        self.assertFalse(ignore.is_excluded("logs/app.log"))
+        self.assertFalse(ignore.is_excluded("keep.log"))
+        self.assertTrue(ignore.is_excluded("build/lib/module.py"))
+        self.assertTrue(ignore.is_excluded("__pycache__/x.pyc"))
+        self.assertTrue(ignore.is_excluded("src/pkg/__pycache__/x.pyc"))
+        self.assertTrue(ignore.is_excluded("data/mnist/raw/train.gz"))
+        self.assertFalse(ignore.is_excluded("data/mnist/train.gz"))
+        self.assertFalse(ignore.is_excluded("main.py"))
+
+
+class TestBuildFingerprint(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": str(self.root / "cache")})
+        self.env.start()
+        ImageCache._images.clear()
+
+        self.context = self.root / "context"
+        (self.context / "src").mkdir(parents=True)
+        (self.context / "src" / "main.py").write_text("print('hello')")
+        (self.context / "Dockerfile").write_text("FROM ubuntu:18.04\nCOPY src /src\n")
+        (self.context / ".dockerignore").write_text("*.log\n")
+        self.recipe = str(self.context / "Dockerfile")
+
+    def tearDown(self) -> None:
+        ImageCache._images.clear()
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def _fingerprint(self, build_args: str = "") -> str:
+        return BuildFingerprint.compute(str(self.context), self.recipe, build_args)
+
+    def test_compute(self) -> None:
+        fingerprint = self._fingerprint()
+        self.assertEqual(fingerprint, self._fingerprint())
+
+        # Ignored files do not change fingerprints.
+        (self.context / "debug.log").write_text("log")
+        self.assertEqual(fingerprint, self._fingerprint())
+
+        # Build arguments, build files and files in build context do.
+        self.assertNotEqual(fingerprint, self._fingerprint("--build-arg VERSION=1"))
+
+        (self.context / "Dockerfile").write_text("FROM ubuntu:20.04\nCOPY src /src\n")
+        new_fingerprint = self._fingerprint()
+        self.assertNotEqual(fingerprint, new_fingerprint)
+
+        (self.context / "src" / "main.py").write_text("print('hello, world')")
+        self.assertNotEqual(new_fingerprint, self._fingerprint())
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, "<no value>"))
+    def test_index(self, inspect: t.Any) -> None:
+        self.assertIsNone(BuildFingerprint.get_image_fingerprint("docker", "mlcube/test", "0123abcd"))
+        self.assertEqual(inspect.call_count, 1)
+
+        BuildFingerprint.save("docker", "mlcube/test", "fingerprint", "0123abcd")
+        self.assertEqual(BuildFingerprint.get_image_fingerprint("docker", "mlcube/test", "0123abcd"), "fingerprint")
+        self.assertEqual(inspect.call_count, 1)
+
+        # Image has changed since the fingerprint was saved - image labels are the source of truth.
+        self.assertIsNone(BuildFingerprint.get_image_fingerprint("docker", "mlcube/test", "4567cdef"))
+        self.assertEqual(inspect.call_count, 2)
+
+    @patch.object(Shell, "run", return_value=0)
+    @patch.object(Shell, "run_and_capture_output")
+    def test_configure(self, run_and_capture_output: t.Any, run: t.Any) -> None:
+        labels: t.Dict[str, str] = {}
+
+        def _docker_build(cmd: t.List[str], **_kwargs) -> int:
+            if cmd[2] == "--label":
+                labels[BuildFingerprint.LABEL] = cmd[3].split("=", 1)[1]
+            return 0
+
+        def _docker_inspect(cmd: t.List[str]) -> t.Tuple[int, str]:
+            if not labels:
+                return 1, "Error: No such image: mlcube/test"
+            if cmd[3] == "--format={{.Id}}":
+                return 0, "sha256:0123abcd"
+            return 0, labels[BuildFingerprint.LABEL]
+
+        run.side_effect = _docker_build
+        run_and_capture_output.side_effect = _docker_inspect
+
+        mlcube = OmegaConf.merge(
+            Config.DEFAULT,
+            {"image": "mlcube/test", "build_strategy": "always", "build_context": str(self.context)},
+        )
+        mlcube = OmegaConf.create({"runtime": {"root": str(self.root)}, "runner": mlcube})
+
+        DockerRun(mlcube, task=None).configure()
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(run.call_args.args[0][2], "--label")
+        self.assertTrue(run.call_args.args[0][3].startswith(f"{BuildFingerprint.LABEL}="))
+        self.assertFalse(run.call_args.kwargs["shell"])
+
+        # Nothing has changed - no need to build.
+        DockerRun(mlcube, task=None).configure()
+        self.assertEqual(run.call_count, 1)
+
+        (self.context / "src" / "main.py").write_text("print('hello, world')")
+        DockerRun(mlcube, task=None).configure()
+        self.assertEqual(run.call_count, 2)
+
+        # Users request fresh builds.
+        mlcube.runner.build_args = "--no-cache"
+        DockerRun(mlcube, task=None).configure()
+        self.assertEqual(run.call_count, 3)
+        self.assertEqual(run.call_args.args[0][2], "--no-cache")
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import typing as t
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube_docker.docker_run import ImageCache
+
+from mlcube.shell import Shell
+
+
+class TestImageCache(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": self.temp_dir.name})
+        self.env.start()
+        ImageCache._images.clear()
+
+    def tearDown(self) -> None:
+        ImageCache._images.clear()
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, "sha256:0123abcd"))
+    def test_process_cache(self, inspect: t.Any) -> None:
+        for _ in range(3):
+            self.assertEqual(ImageCache.get_image_id("sudo docker", "ubuntu:18.04"), "0123abcd")
+        inspect.assert_called_once_with(
+            ["sudo", "docker", "inspect", "--type=image", "--format={{.Id}}", "ubuntu:18.04"]
+        )
+        self.assertFalse(ImageCache.cache_file().exists())
+
+        ImageCache.invalidate("sudo docker", "ubuntu:18.04")
+        ImageCache.get_image_id("sudo docker", "ubuntu:18.04")
+        self.assertEqual(inspect.call_count, 2)
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(1, "Error: No such image: ubuntu:18.04"))
+    def test_missing_images_are_not_cached(self, inspect: t.Any) -> None:
+        self.assertIsNone(ImageCache.get_image_id("docker", "ubuntu:18.04"))
+        self.assertIsNone(ImageCache.get_image_id("docker", "ubuntu:18.04"))
+        self.assertEqual(inspect.call_count, 2)
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, "sha256:0123abcd"))
+    def test_disk_cache(self, inspect: t.Any) -> None:
+        ImageCache.get_image_id("docker", "ubuntu:18.04", "disk")
+        ImageCache._images.clear()  # New MLCube process.
+        self.assertEqual(ImageCache.get_image_id("docker", "ubuntu:18.04", "disk"), "0123abcd")
+        self.assertEqual(inspect.call_count, 1)
+
+        ImageCache.invalidate("docker", "ubuntu:18.04")
+        ImageCache._images.clear()
+        ImageCache.get_image_id("docker", "ubuntu:18.04", "disk")
+        self.assertEqual(inspect.call_count, 2)
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, "sha256:0123abcd"))
+    def test_no_cache(self, inspect: t.Any) -> None:
+        ImageCache.get_image_id("docker", "ubuntu:18.04", "none")
+        ImageCache.get_image_id("docker", "ubuntu:18.04", "none")
+        self.assertEqual(inspect.call_count, 2)
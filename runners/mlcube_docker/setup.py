@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_docker=mlcube_docker.__main__:cli
+        [mlcube.runners]
+        docker=mlcube_docker:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',
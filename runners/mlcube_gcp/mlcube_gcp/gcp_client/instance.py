@@ -4,6 +4,8 @@ import typing as t
 class Status(object):
     RUNNING = 'RUNNING'
     STOPPING = 'STOPPING'
+    SUSPENDING = 'SUSPENDING'
+    SUSPENDED = 'SUSPENDED'
     TERMINATED = 'TERMINATED'
 
 
@@ -25,6 +27,22 @@ class Instance(object):
     def status(self) -> t.Optional[t.Text]:
         return self.instance.get('status', None)
 
+    @property
+    def labels(self) -> t.Dict[t.Text, t.Text]:
+        return self.instance.get('labels', None) or {}
+
+    @property
+    def label_fingerprint(self) -> t.Optional[t.Text]:
+        return self.instance.get('labelFingerprint', None)
+
+    @property
+    def boot_disk(self) -> t.Optional[t.Text]:
+        """ URL of the boot disk (source disk for images). """
+        for disk in self.instance.get('disks', None) or []:
+            if disk.get('boot', False):
+                return disk.get('source', None)
+        return None
+
     @property
     def public_ip(self) -> t.Optional[t.Text]:
         for interface in self.instance.get('networkInterfaces', None) or []:
@@ -1,8 +1,12 @@
+import time
+import logging
 import typing as t
 
+logger = logging.getLogger(__name__)
+
 
 class Operation(object):
-    def __int__(self, operation: t.Dict) -> None:
+    def __init__(self, operation: t.Dict) -> None:
         self.operation: t.Dict = operation
 
     @property
@@ -20,3 +24,84 @@ class Operation(object):
     @property
     def progress(self) -> t.Optional[t.Text]:
         return self.operation.get('progress', None)
+
+    @property
+    def is_global(self) -> bool:
+        """ Global operations (e.g., image insert) do not have `zone` field. """
+        return 'zone' not in self.operation and '/global/' in self.operation.get('selfLink', '')
+
+
+class OperationTracker(object):
+    """ Wait for many zone and global operations at the same time.
+
+    Operations are polled in one thread (API clients are not thread-safe), each one on its own schedule with adaptive
+    backoff: first polls are fast because many operations (e.g., start or stop) complete in a couple of seconds, and
+    the delay between polls grows for long operations (e.g., image creation). Total waiting time is about the time of
+    the slowest operation, not the sum of all of them.
+
+    Args:
+        service: GCP service (`mlcube_gcp.gcp_client.service.Service`).
+        initial_delay: Delay in seconds before the first poll of an operation.
+        max_delay: Maximal delay in seconds between polls of an operation.
+        backoff: Multiplier of the delay after every poll that finds an operation not done.
+        timeout: If not None, maximal waiting time in seconds.
+    """
+
+    def __init__(self, service: t.Any, initial_delay: float = 0.5, max_delay: float = 10.0, backoff: float = 1.5,
+                 timeout: t.Optional[float] = None) -> None:
+        self.service = service
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def poll(self, operation: Operation) -> t.Dict:
+        """ Return current state of an operation. """
+        compute = self.service.service
+        if operation.is_global:
+            return compute.globalOperations().get(project=self.service.project_id, operation=operation.name).execute()
+        return compute.zoneOperations().get(
+            project=self.service.project_id, zone=self.service.zone, operation=operation.name
+        ).execute()
+
+    def wait(self, operations: t.List[t.Union[t.Text, t.Dict, Operation]]) -> t.List[t.Dict]:
+        """ Wait for all operations to complete.
+
+        Args:
+            operations: Operations (names of zone operations, operation dictionaries returned by API calls).
+        Returns:
+            Final states of operations in the same order.
+        Raises:
+            Exception with errors of all failed operations once all operations have completed.
+        """
+        ops: t.List[Operation] = [
+            op if isinstance(op, Operation) else Operation({'name': op} if isinstance(op, str) else op)
+            for op in operations
+        ]
+        results: t.List[t.Optional[t.Dict]] = [
+            op.operation if op.operation.get('status', None) == 'DONE' else None for op in ops
+        ]
+        now = time.monotonic()
+        deadline = None if self.timeout is None else now + self.timeout
+        # Index of an operation -> (next poll time, current delay).
+        schedule: t.Dict[int, t.Tuple[float, float]] = {
+            idx: (now + self.initial_delay, self.initial_delay) for idx, result in enumerate(results) if result is None
+        }
+        while schedule:
+            idx, (poll_time, delay) = min(schedule.items(), key=lambda item: item[1][0])
+            if deadline is not None and poll_time > deadline:
+                raise Exception(f"Timed out waiting for operations: {[ops[i].name for i in sorted(schedule)]}")
+            time.sleep(max(0.0, poll_time - time.monotonic()))
+            result = self.poll(ops[idx])
+            if result.get('status', None) == 'DONE':
+                results[idx] = result
+                del schedule[idx]
+                logger.debug("OperationTracker.wait operation done (name=%s).", ops[idx].name)
+            else:
+                delay = min(delay * self.backoff, self.max_delay)
+                schedule[idx] = (time.monotonic() + delay, delay)
+
+        errors = [result['error'] for result in results if 'error' in result]
+        if errors:
+            raise Exception(errors[0] if len(errors) == 1 else errors)
+        return results
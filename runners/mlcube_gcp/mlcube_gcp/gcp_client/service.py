@@ -1,8 +1,7 @@
-import time
 import typing as t
 import googleapiclient.discovery
 from google.oauth2 import service_account
-from mlcube_gcp.gcp_client.operation import Operation
+from mlcube_gcp.gcp_client.operation import (Operation, OperationTracker)
 
 
 class Service(object):
@@ -11,9 +10,20 @@ class Service(object):
     https://stackoverflow.com/questions/51303178/launch-gcp-instance-from-my-pc-using-python
     https://stackoverflow.com/questions/49444290/googleapiclient-authentication-using-personal-account
     """
-    def __init__(self, project_id: t.Text, zone: t.Text, credentials: t.Optional[t.Text] = None) -> None:
+    def __init__(self, project_id: t.Text, zone: t.Text, credentials: t.Optional[t.Text] = None,
+                 service: t.Optional[t.Any] = None) -> None:
+        """
+        Args:
+            project_id: GCP project identifier.
+            zone: GCP zone.
+            credentials: Dictionary with `file` (service account key file) and `scopes` fields.
+            service: Compute API resource. If None, it's built with google API discovery. Tests use local fakes.
+        """
         self.project_id: t.Text = project_id
         self.zone: t.Text = zone
+        if service is not None:
+            self.service = service
+            return
         if isinstance(credentials, t.Dict) and 'file' in credentials:
             credentials = service_account.Credentials.from_service_account_file(
                 credentials.get('file'),
@@ -36,24 +46,63 @@ class Service(object):
     def start_instance(self, name: t.Text) -> t.Dict:
         return self.service.instances().start(project=self.project_id, zone=self.zone, instance=name).execute()
 
+    def resume_instance(self, name: t.Text) -> t.Dict:
+        return self.service.instances().resume(project=self.project_id, zone=self.zone, instance=name).execute()
+
     def stop_instance(self, name: t.Text) -> t.Dict:
         return self.service.instances().stop(project=self.project_id, zone=self.zone, instance=name).execute()
 
     def delete_instance(self, name: t.Text) -> t.Dict:
         return self.service.instances().delete(project=self.project_id, zone=self.zone, instance=name).execute()
 
+    def set_labels(self, name: t.Text, labels: t.Dict[t.Text, t.Text], fingerprint: t.Text) -> t.Dict:
+        """ Replace instance labels. The `fingerprint` is the current `labelFingerprint` of the instance. """
+        return self.service.instances().setLabels(
+            project=self.project_id, zone=self.zone, instance=name,
+            body={'labels': labels, 'labelFingerprint': fingerprint}
+        ).execute()
+
+    def get_image(self, name: t.Text) -> t.Optional[t.Dict]:
+        """ Return image in this project, or None if it does not exist. """
+        response = self.service.images().list(project=self.project_id, filter=f'name = "{name}"').execute()
+        for image in response.get('items', []):
+            if image.get('name', None) == name:
+                return image
+        return None
+
+    def create_image(self, name: t.Text, source_disk: t.Text, family: t.Optional[t.Text] = None) -> t.Dict:
+        """ Create image from a boot disk of an instance (instance can be running).
+
+        https://cloud.google.com/compute/docs/reference/rest/v1/images/insert
+        """
+        body: t.Dict = {'name': name, 'sourceDisk': source_disk}
+        if family:
+            body['family'] = family
+        return self.service.images().insert(project=self.project_id, body=body, forceCreate=True).execute()
+
     def create_instance(self, **kwargs) -> t.Dict:
         """
         https://cloud.google.com/compute/docs/reference/rest/v1/instances/setMachineType
         Assumed: https://cloud.google.com/compute/docs/instances/adding-removing-ssh-keys#project-wide
         https://cloud.google.com/compute/docs/reference/rest/v1/instances/insert
+
+        The `image` is either a public image family ({'project': ..., 'family': ...}), or an image in this project
+        ({'name': ...}) such as an image baked from a provisioned instance. Optional `labels` and `metadata` (e.g.,
+        `startup-script`) are dictionaries.
         """
         name = kwargs.get('name', 'gcp-f1-micro')
         machine_type = kwargs.get('machine_type', 'f1-micro')
-        image = kwargs.get('image', {'project': 'ubuntu-os-cloud', 'family': 'ubuntu-1804-lts'})
+        image = kwargs.get('image', None) or {'project': 'ubuntu-os-cloud', 'family': 'ubuntu-1804-lts'}
         disk_size_gb = kwargs.get('disk_size_gb', 20)
 
-        image_response = self.service.images().getFromFamily(project=image['project'], family=image['family']).execute()
+        if 'family' in image:
+            image_response = self.service.images().getFromFamily(
+                project=image['project'], family=image['family']
+            ).execute()
+        else:
+            image_response = self.service.images().get(
+                project=image.get('project', self.project_id), image=image['name']
+            ).execute()
         config: t.Dict = {
             'name': name,
             'machine_type': f"zones/{self.zone}/machineTypes/{machine_type}",
@@ -86,19 +135,43 @@ class Service(object):
                 ]
             }],
         }
+        if kwargs.get('labels', None):
+            config['labels'] = dict(kwargs['labels'])
+        if kwargs.get('metadata', None):
+            config['metadata'] = {'items': [{'key': key, 'value': value} for key, value in kwargs['metadata'].items()]}
         return self.service.instances().insert(project=self.project_id, zone=self.zone, body=config).execute()
 
-    def wait_for_operation(self, operation: t.Union[t.Text, t.Dict, Operation], retry_pause: float = 5):
-        if isinstance(operation, t.Dict):
-            operation = operation.get('name', None)
-        elif isinstance(operation, Operation):
-            operation = operation.name
-        while True:
-            result = self.service.zoneOperations().get(
-                project=self.project_id, zone=self.zone, operation=operation
-            ).execute()
-            if result['status'] == 'DONE':
-                if 'error' in result:
-                    raise Exception(result['error'])
-                return result
-            time.sleep(retry_pause)
+    def wait_for_operation(self, operation: t.Union[t.Text, t.Dict, Operation],
+                           retry_pause: t.Optional[float] = None) -> t.Dict:
+        """ Wait for zone operation, or global operation (dictionaries without `zone` field, e.g., image insert).
+
+        Args:
+            operation: Operation name, or operation dictionary.
+            retry_pause: If not None, fixed delay between polls. By default, adaptive backoff is used.
+        """
+        return self.wait_for_operations([operation], retry_pause)[0]
+
+    def wait_for_operations(self, operations: t.List[t.Union[t.Text, t.Dict, Operation]],
+                            retry_pause: t.Optional[float] = None) -> t.List[t.Dict]:
+        """ Wait for many operations concurrently (see `OperationTracker`). """
+        if retry_pause is not None:
+            tracker = OperationTracker(self, initial_delay=retry_pause, max_delay=retry_pause, backoff=1.0)
+        else:
+            tracker = OperationTracker(self)
+        return tracker.wait(operations)
+
+    def create_instances(self, names: t.List[t.Text], **kwargs) -> t.List[t.Dict]:
+        """ Create instances with the same parameters (see `create_instance`) and wait for all of them. """
+        return self.wait_for_operations([self.create_instance(name=name, **kwargs) for name in names])
+
+    def start_instances(self, names: t.List[t.Text]) -> t.List[t.Dict]:
+        """ Start instances and wait for all of them. """
+        return self.wait_for_operations([self.start_instance(name) for name in names])
+
+    def resume_instances(self, names: t.List[t.Text]) -> t.List[t.Dict]:
+        """ Resume suspended instances and wait for all of them. """
+        return self.wait_for_operations([self.resume_instance(name) for name in names])
+
+    def stop_instances(self, names: t.List[t.Text]) -> t.List[t.Dict]:
+        """ Stop instances and wait for all of them. """
+        return self.wait_for_operations([self.stop_instance(name) for name in names])
@@ -1,13 +1,16 @@
 import os
+import time
 import logging
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from omegaconf import (DictConfig, OmegaConf)
 from mlcube.validate import Validate
 from mlcube.shell import Shell
+from mlcube.profiler import Profiler
 from ssh_config.client import (SSHConfig, Host)
 from mlcube.runner import (RunnerConfig, Runner)
-from mlcube.errors import ExecutionError
+from mlcube.errors import (ConfigurationError, ExecutionError)
 from mlcube_gcp.gcp_client.instance import Instance as GCPInstance, Status as GCPInstanceStatus
 from mlcube_gcp.gcp_client.service import Service
 
@@ -28,7 +31,10 @@ class Config(RunnerConfig):
         'instance': {
             'name': '',
             'machine_type': '',
-            'disk_size_gb': ''
+            'disk_size_gb': '',
+            'image': '',            # Image baked from the first provisioned instance and used to boot new instances
+            'pool_size': 1,         # Number of instances (`name`, `name-1`, ...) to keep provisioned
+            'idle_stop_minutes': 0  # Instances stop themselves after this number of minutes without SSH sessions
         },
         'platform': ''
     })
@@ -44,48 +50,53 @@ class Config(RunnerConfig):
             .check_values(['project_id', 'zone'], str, blanks=False) \
             .not_none(['credentials'])
         Validate(mlcube.runner.instance, 'runner.instance')\
-            .check_unknown_keys(['name', 'machine_type', 'disk_size_gb'])\
+            .check_unknown_keys(Config.DEFAULT.instance.keys())\
             .not_none(['name', 'machine_type', 'disk_size_gb']) \
-            .check_values(['name', 'machine_type'], str, blanks=False)
+            .check_values(['name', 'machine_type'], str, blanks=False)\
+            .check_values(['pool_size', 'idle_stop_minutes'], int)
+        if mlcube.runner.instance.pool_size < 1 or mlcube.runner.instance.idle_stop_minutes < 0:
+            raise ConfigurationError(
+                "Instance pool size must be positive, and idle stop time must not be negative (pool_size="
+                f"{mlcube.runner.instance.pool_size}, idle_stop_minutes={mlcube.runner.instance.idle_stop_minutes})."
+            )
 
 
 class GCPRun(Runner):
 
     CONFIG = Config
 
+    PROVISIONED_LABEL = 'mlcube-provisioned'
+    """Label of instances with installed system packages (provisioned, or booted from a baked image)."""
+
+    IDLE_STOP_SCRIPT = (
+        "#!/bin/bash\n"
+        "# MLCube GCP runner: stop this instance after {minutes} minutes without SSH sessions.\n"
+        "systemd-run --unit=mlcube-idle-stop /bin/bash -c 'idle=0; while sleep 60; do "
+        "if pgrep -f \"sshd: [^ ]+@\" > /dev/null; then idle=0; else idle=$((idle + 1)); fi; "
+        "if [ \"$idle\" -ge {minutes} ]; then shutdown -h now; fi; done'\n"
+    )
+    """Startup script of instances with idle auto-stop."""
+
+    STATUS_POLL_SECONDS = 5.0
+    """Delay between checks of instances that are being stopped or suspended."""
+
+    STATUS_TIMEOUT_SECONDS = 600.0
+    """Maximal time to wait for instances to stop or suspend before they can be started again."""
+
     def __init__(self, mlcube: t.Union[DictConfig, t.Dict], task: t.Text) -> None:
         super().__init__(mlcube, task)
 
-    def configure(self) -> None:
-        """  """
-        gcp: DictConfig = self.mlcube.runner
-
-        # Check that SSH is configured.
-        # TODO: (Sergey) why am I doing it here (copy-past bug)?
-        ssh_config_file = os.path.join(Path.home(), '.ssh', 'mlcube')
-        try:
-            ssh_config = SSHConfig.load(ssh_config_file)
-            gcp_host: Host = ssh_config.get(gcp.instance.name)
-        except KeyError:
-            raise ExecutionError.mlcube_configure_error(
-                self.__class__.__name__,
-                f"SSH configuration file ({ssh_config_file}) does not provide connection details for GCP instance "
-                f"(name={gcp.instance.name}). Most likely this error has occurred due to implementation error - "
-                "please, contact MLCube developers."
-            )
-        # TODO: I can try to add this info on the fly assuming standard paths. Need to figure out the user name.
-        if gcp_host.get('User', None) is None or gcp_host.get('IdentityFile', None) is None:
-            raise ExecutionError.mlcube_configure_error(
-                self.__class__.__name__,
-                f"SSH configuration file ({ssh_config_file}) provides connection details for GCP instance "
-                f"(name={gcp.instance.name}), but these details do not include information about `User` "
-                "and/or `IdentifyFile`."
-            )
+    @staticmethod
+    def get_instance_names(instance: DictConfig) -> t.List[t.Text]:
+        """ Return names of instances in the pool: `name`, `name-1`, ..., `name-{pool_size - 1}`. """
+        return [instance.name] + [f"{instance.name}-{idx}" for idx in range(1, instance.pool_size)]
 
-        # Connect to GCP
+    def get_service(self) -> Service:
+        """ Connect to GCP. """
+        gcp: DictConfig = self.mlcube.runner
         logger.info("Connecting to GCP ...")
         try:
-            service = Service(project_id=gcp.gcp.project_id, zone=gcp.gcp.zone, credentials=gcp.gcp.credentials)
+            return Service(project_id=gcp.gcp.project_id, zone=gcp.gcp.zone, credentials=gcp.gcp.credentials)
         except Exception as err:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
@@ -96,58 +107,197 @@ class GCPRun(Runner):
                 gcp_info={'project_id': gcp.gcp.project_id, 'zone': gcp.gcp.zone, 'credentials': gcp.gcp.credentials}
             )
 
-        # Figure out if an instance needs to be created
+    def get_ssh_config(self, names: t.List[t.Text]) -> t.Tuple[t.Text, SSHConfig]:
+        """ Check that SSH is configured for all instances, and return SSH configuration file path and its content. """
+        ssh_config_file = os.path.join(Path.home(), '.ssh', 'mlcube')
+        ssh_config = SSHConfig.load(ssh_config_file)
+        for name in names:
+            try:
+                gcp_host: Host = ssh_config.get(name)
+            except KeyError:
+                raise ExecutionError.mlcube_configure_error(
+                    self.__class__.__name__,
+                    f"SSH configuration file ({ssh_config_file}) does not provide connection details for GCP instance "
+                    f"(name={name}). Most likely this error has occurred due to implementation error - "
+                    "please, contact MLCube developers."
+                )
+            # TODO: I can try to add this info on the fly assuming standard paths. Need to figure out the user name.
+            if gcp_host.get('User', None) is None or gcp_host.get('IdentityFile', None) is None:
+                raise ExecutionError.mlcube_configure_error(
+                    self.__class__.__name__,
+                    f"SSH configuration file ({ssh_config_file}) provides connection details for GCP instance "
+                    f"(name={name}), but these details do not include information about `User` "
+                    "and/or `IdentifyFile`."
+                )
+        return ssh_config_file, ssh_config
+
+    def start_instances(self, service: Service, names: t.List[t.Text], image: t.Optional[t.Dict] = None,
+                        create: bool = True) -> t.List[GCPInstance]:
+        """ Make sure instances exist and run, and return them.
+
+        Args:
+            service: GCP compute service.
+            names: Instance names.
+            image: If not None, baked image to create new instances from.
+            create: If True (configure phase), create missing instances. Else (run phase), missing instances are
+                errors since they must be created and provisioned with `mlcube configure` first.
+        """
+        gcp: DictConfig = self.mlcube.runner
+        error = ExecutionError.mlcube_configure_error if create else ExecutionError.mlcube_run_error
+
+        def _list_instances() -> t.Dict[t.Text, GCPInstance]:
+            return {instance['name']: GCPInstance(instance) for instance in service.list_instances()}
+
         try:
-            instance = GCPInstance(service.get_instance(gcp.instance.name))
-            if instance.name is None:
-                print("Creating GCP instance ...")
-                service.wait_for_operation(
-                    service.create_instance(name=gcp.instance.name, machine_type=gcp.instance.machine_type,
-                                            disk_size_gb=gcp.instance.disk_size_gb)
+            current = _list_instances()
+        except Exception as err:
+            raise error(
+                self.__class__.__name__, "Failed to list GCP instances. See context for more details.", error=str(err)
+            )
+        missing = [name for name in names if name not in current]
+        if missing and not create:
+            raise error(
+                self.__class__.__name__,
+                f"GCP instances do not exist (names={missing}). Run `mlcube configure` to create them."
+            )
+        try:
+            # Create missing instances concurrently.
+            if missing:
+                print(f"Creating GCP instances (names={missing}, image={image['name'] if image else None}) ...")
+                metadata = {}
+                if gcp.instance.idle_stop_minutes > 0:
+                    metadata['startup-script'] = GCPRun.IDLE_STOP_SCRIPT.format(minutes=gcp.instance.idle_stop_minutes)
+                service.create_instances(
+                    missing, machine_type=gcp.instance.machine_type, disk_size_gb=gcp.instance.disk_size_gb,
+                    image={'name': image['name']} if image else None,
+                    labels={GCPRun.PROVISIONED_LABEL: 'true'} if image else None, metadata=metadata
                 )
-                instance = GCPInstance(service.get_instance(gcp.instance.name))
+                current = _list_instances()
+
+            # Instances that are stopping (e.g., on idle) or suspending cannot be started until they are stopped.
+            deadline = time.monotonic() + GCPRun.STATUS_TIMEOUT_SECONDS
+            pending_statuses = (GCPInstanceStatus.STOPPING, GCPInstanceStatus.SUSPENDING)
+            while any(current[name].status in pending_statuses for name in names):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"GCP instances have not stopped in {GCPRun.STATUS_TIMEOUT_SECONDS} seconds (names="
+                        f"{[name for name in names if current[name].status in pending_statuses]})."
+                    )
+                time.sleep(GCPRun.STATUS_POLL_SECONDS)
+                current = _list_instances()
 
-            # Check its running status
-            if instance.status != GCPInstanceStatus.RUNNING:
-                print("Starting GCP instance ...")
-                service.wait_for_operation(service.start_instance(instance.name))
-                instance = GCPInstance(service.get_instance(gcp.instance.name))
+            # Start stopped instances, and resume suspended instances.
+            stopped = [name for name in names if current[name].status != GCPInstanceStatus.RUNNING]
+            if stopped:
+                print(f"Starting GCP instances (names={stopped}) ...")
+                suspended = [name for name in stopped if current[name].status == GCPInstanceStatus.SUSPENDED]
+                operations = [service.start_instance(name) for name in stopped if name not in suspended]
+                operations.extend(service.resume_instance(name) for name in suspended)
+                service.wait_for_operations(operations)
+                current = _list_instances()
+            instances: t.List[GCPInstance] = [current[name] for name in names]
         except Exception as err:
-            raise ExecutionError.mlcube_configure_error(
+            raise error(
                 self.__class__.__name__,
-                "Failed to create or connect to remote GCP instance. See context for more details.",
+                "Failed to create or start remote GCP instances. See context for more details.",
                 error=str(err),
                 gcp_instance_info={
-                    'name': gcp.instance.name, 'machine_type': gcp.instance.machine_type,
+                    'names': names, 'machine_type': gcp.instance.machine_type,
                     'disk_size_gb': gcp.instance.disk_size_gb
                 }
             )
 
-        # Make sure SSH mlcube is up-to-date
-        if gcp_host.get('HostName', None) != instance.public_ip:
-            print(f"Updating SSH mlcube (prev={gcp_host.get('HostName')}, new={instance.public_ip}, "
-                  f"file={ssh_config_file})")
-            ssh_config.update(instance.name, {'HostName': instance.public_ip})
-            ssh_config.write(ssh_config_file)
-            # TODO: clean '.ssh/known_hosts'.
+        # Make sure SSH mlcube is up-to-date (public IP addresses change when instances restart).
+        ssh_config_file, ssh_config = self.get_ssh_config(names)
+        for instance in instances:
+            host_name = ssh_config.get(instance.name).get('HostName', None)
+            if host_name != instance.public_ip:
+                print(f"Updating SSH mlcube (prev={host_name}, new={instance.public_ip}, file={ssh_config_file})")
+                ssh_config.update(instance.name, {'HostName': instance.public_ip})
+                ssh_config.write(ssh_config_file)
+                # TODO: clean '.ssh/known_hosts'.
+        return instances
+
+    @Profiler.profile()
+    def configure(self) -> None:
+        """ Make sure all instances in the pool exist, run and are provisioned, and configure MLCube on them.
+
+        Instances are created from the baked image (`instance.image`) when it exists. Otherwise, they are created from
+        a base OS image and system packages are installed on them, and then the image is baked from the first instance.
+        """
+        gcp: DictConfig = self.mlcube.runner
+        names = GCPRun.get_instance_names(gcp.instance)
+        self.get_ssh_config(names)
+        service = self.get_service()
+
+        image: t.Optional[t.Dict] = None
+        if gcp.instance.image:
+            image = service.get_image(gcp.instance.image)
+        instances = self.start_instances(service, names, image)
+
+        # Configure remote instances in parallel. This is specific for docker-based images now.
+        unprovisioned: t.List[GCPInstance] = []
+        for instance in instances:
+            if instance.labels.get(GCPRun.PROVISIONED_LABEL, None) == 'true':
+                logger.info("GCPRun.configure instance is provisioned (name=%s).", instance.name)
+            else:
+                unprovisioned.append(instance)
 
-        # Configure remote instance. This is specific for docker-based images now.
+        def _provision(_instance: GCPInstance) -> t.Optional[Exception]:
+            try:
+                Shell.ssh(
+                    _instance.name,
+                    'sudo snap install docker && sudo addgroup --system docker && sudo adduser ${USER} docker && '
+                    'sudo snap disable docker && sudo snap enable docker && '
+                    'sudo apt update && yes | sudo apt install python3-pip virtualenv && sudo apt clean'
+                )
+            except Exception as _err:
+                return _err
+            return None
+
+        errors: t.Dict[t.Text, t.Text] = {}
+        if unprovisioned:
+            with ThreadPoolExecutor(max_workers=len(unprovisioned), thread_name_prefix='mlcube-gcp') as executor:
+                errors = {
+                    instance.name: str(err)
+                    for instance, err in zip(unprovisioned, executor.map(_provision, unprovisioned)) if err is not None
+                }
+        # Label provisioned instances here (GCP API clients are not thread safe), and wait for all labels together.
         try:
-            Shell.ssh(
-                gcp.instance.name,
-                'sudo snap install docker && sudo addgroup --system docker && sudo adduser ${USER} docker && '
-                'sudo snap disable docker && sudo snap enable docker && '
-                'sudo apt update && yes | sudo apt install python3-pip virtualenv && sudo apt clean'
+            service.wait_for_operations([
+                service.set_labels(
+                    instance.name, {**instance.labels, GCPRun.PROVISIONED_LABEL: 'true'}, instance.label_fingerprint
+                )
+                for instance in unprovisioned if instance.name not in errors
+            ])
+        except Exception as err:
+            raise ExecutionError.mlcube_configure_error(
+                self.__class__.__name__, "Failed to label provisioned instances. See context for more details.",
+                error=str(err)
             )
-        except ExecutionError as err:
+        if errors:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
-                "Failed to install system packages on a remote instance. See context for more details.",
-                error=str(err)
+                f"Failed to install system packages on remote instances (names={list(errors.keys())}). See context "
+                "for more details.",
+                errors=errors
             )
 
-        # Remote GCP instance has been configured
-        print(instance)
+        # Bake image so that new instances do not need to be provisioned.
+        if gcp.instance.image and image is None:
+            print(f"Creating GCP image (name={gcp.instance.image}, instance={instances[0].name}) ...")
+            try:
+                service.wait_for_operation(service.create_image(gcp.instance.image, instances[0].boot_disk))
+            except Exception as err:
+                raise ExecutionError.mlcube_configure_error(
+                    self.__class__.__name__,
+                    f"Failed to create GCP image (name={gcp.instance.image}). See context for more details.",
+                    error=str(err)
+                )
+
+        # Remote GCP instances have been configured
+        for instance in instances:
+            print(instance)
 
         # Should be as simple as invoking SSH configure.
         try:
@@ -161,12 +311,22 @@ class GCPRun(Runner):
             )
 
     def run(self) -> None:
+        self.run_tasks([self.task])
+
+    @Profiler.profile()
+    def run_tasks(self, tasks: t.List[str]) -> None:
+        """Run all tasks with one `mlcube run` command of the platform this runner delegates to (e.g., SSH).
+
+        When instances stop themselves on idle (`instance.idle_stop_minutes`), they are started first.
+        """
         gcp: DictConfig = self.mlcube.runner
+        if gcp.instance.idle_stop_minutes > 0:
+            self.start_instances(self.get_service(), GCPRun.get_instance_names(gcp.instance), create=False)
         try:
-            Shell.run(f"mlcube run --mlcube={self.mlcube.root} --platform={gcp.platform} --task={self.task}")
+            Shell.run(f"mlcube run --mlcube={self.mlcube.root} --platform={gcp.platform} --task={','.join(tasks)}")
         except ExecutionError as err:
             raise ExecutionError.mlcube_run_error(
                 self.__class__.__name__,
-                f"Error occurred while running MLCube task (platform={gcp.platform}, task={self.task}).",
+                f"Error occurred while running MLCube tasks (platform={gcp.platform}, tasks={tasks}).",
                 **err.context
             )
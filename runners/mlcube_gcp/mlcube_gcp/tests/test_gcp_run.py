@@ -0,0 +1,217 @@
+import tempfile
+import threading
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from omegaconf import DictConfig, OmegaConf
+from mlcube.errors import ExecutionError
+from mlcube.shell import Shell
+from mlcube_gcp.gcp_client.service import Service
+from mlcube_gcp.gcp_run import Config, GCPRun
+
+
+class _Request(object):
+    def __init__(self, fn: t.Callable[[], t.Dict]) -> None:
+        self.fn = fn
+
+    def execute(self) -> t.Dict:
+        return self.fn()
+
+
+class FakeCompute(object):
+    """Local fake of the Compute API resource (operations complete immediately)."""
+
+    def __init__(self) -> None:
+        self.instances_db: t.Dict[str, t.Dict] = {}
+        self.images_db: t.Dict[str, t.Dict] = {}
+        self.calls: t.List[str] = []
+
+    def _operation(self, name: str, is_global: bool = False) -> t.Dict:
+        self.calls.append(name)
+        if is_global:
+            return {'name': name, 'status': 'DONE', 'selfLink': f'projects/p/global/operations/{name}'}
+        return {'name': name, 'status': 'DONE', 'zone': 'zones/z'}
+
+    def instances(self) -> 'FakeCompute':
+        return _Namespace(
+            list=lambda **kwargs: _Request(lambda: {'items': list(self.instances_db.values())}),
+            insert=lambda body, **kwargs: _Request(lambda: self._insert_instance(body)),
+            start=lambda instance, **kwargs: _Request(lambda: self._start(instance)),
+            resume=lambda instance, **kwargs: _Request(lambda: self._set_status(instance, 'RUNNING')),
+            stop=lambda instance, **kwargs: _Request(lambda: self._set_status(instance, 'TERMINATED')),
+            setLabels=lambda instance, body, **kwargs: _Request(lambda: self._set_labels(instance, body))
+        )
+
+    def images(self) -> 'FakeCompute':
+        return _Namespace(
+            list=lambda filter, **kwargs: _Request(
+                lambda: {'items': [image for image in self.images_db.values() if f'"{image["name"]}"' in filter]}
+            ),
+            get=lambda image, **kwargs: _Request(lambda: self.images_db[image]),
+            getFromFamily=lambda family, **kwargs: _Request(lambda: {'selfLink': f'images/family/{family}'}),
+            insert=lambda body, **kwargs: _Request(lambda: self._insert_image(body))
+        )
+
+    def zoneOperations(self) -> 'FakeCompute':
+        return _Namespace(get=lambda operation, **kwargs: _Request(lambda: {'name': operation, 'status': 'DONE'}))
+
+    def globalOperations(self) -> 'FakeCompute':
+        return self.zoneOperations()
+
+    def _insert_instance(self, body: t.Dict) -> t.Dict:
+        self.instances_db[body['name']] = {
+            'name': body['name'], 'status': 'RUNNING', 'labels': body.get('labels', {}), 'labelFingerprint': 'fp',
+            'metadata': body.get('metadata', {}), 'sourceImage': body['disks'][0]['initializeParams']['sourceImage'],
+            'disks': [{'boot': True, 'source': f'zones/z/disks/{body["name"]}'}],
+            'networkInterfaces': [
+                {'accessConfigs': [{'name': 'External NAT', 'natIP': f'10.0.0.{len(self.instances_db)}'}]}
+            ]
+        }
+        return self._operation(f'insert-{body["name"]}')
+
+    def _set_status(self, name: str, status: str) -> t.Dict:
+        self.instances_db[name]['status'] = status
+        return self._operation(f'{status.lower()}-{name}')
+
+    def _start(self, name: str) -> t.Dict:
+        if self.instances_db[name]['status'] not in ('RUNNING', 'TERMINATED'):
+            raise RuntimeError(f"The resource '{name}' is not ready.")
+        return self._set_status(name, 'RUNNING')
+
+    def _set_labels(self, name: str, body: t.Dict) -> t.Dict:
+        self.instances_db[name]['labels'] = body['labels']
+        return self._operation(f'labels-{name}')
+
+    def _insert_image(self, body: t.Dict) -> t.Dict:
+        self.images_db[body['name']] = {'name': body['name'], 'selfLink': f'images/{body["name"]}'}
+        return self._operation(f'image-{body["name"]}', is_global=True)
+
+
+class _Namespace(object):
+    def __init__(self, **methods: t.Callable) -> None:
+        self.__dict__.update(methods)
+
+
+class TestGCPRun(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        home = Path(self.temp_dir.name)
+        (home / '.ssh').mkdir()
+        (home / '.ssh' / 'mlcube').write_text(''.join(
+            f"Host {name}\n    HostName 0.0.0.0\n    User mlcube\n    IdentityFile ~/.ssh/gcp_rsa\n\n"
+            for name in ('mlcube-gpu', 'mlcube-gpu-1', 'mlcube-gpu-2')
+        ))
+        self.home = patch.object(Path, 'home', return_value=home)
+        self.home.start()
+
+        self.compute = FakeCompute()
+        self.service = patch(
+            'mlcube_gcp.gcp_run.Service', side_effect=lambda **kwargs: Service(**kwargs, service=self.compute)
+        )
+        self.service.start()
+
+        self.mlcube: DictConfig = OmegaConf.create({
+            'root': '/home/user/mlcubes/mnist',
+            'runner': OmegaConf.merge(Config.DEFAULT, {
+                'gcp': {'project_id': 'mlcube', 'zone': 'us-west1-b', 'credentials': {}},
+                'instance': {
+                    'name': 'mlcube-gpu', 'machine_type': 'n1-standard-4', 'disk_size_gb': 100,
+                    'image': 'mlcube-gpu-image', 'pool_size': 2, 'idle_stop_minutes': 30
+                },
+                'platform': 'ssh'
+            })
+        })
+        Config.validate(self.mlcube)
+
+    def tearDown(self) -> None:
+        self.service.stop()
+        self.home.stop()
+        self.temp_dir.cleanup()
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_warm_pool(self, run: t.Any) -> None:
+        # Cold configure: instances are created from base OS image, provisioned, and the image is baked.
+        GCPRun(self.mlcube, task=None).configure()
+        provisioning = [c.args[0] for c in run.call_args_list if 'snap install docker' in c.args[0]]
+        self.assertEqual(len(provisioning), 2)
+        self.assertIn('mlcube-gpu-image', self.compute.images_db)
+        for name in ('mlcube-gpu', 'mlcube-gpu-1'):
+            instance = self.compute.instances_db[name]
+            self.assertEqual(instance['sourceImage'], 'images/family/ubuntu-1804-lts')
+            self.assertEqual(instance['labels'], {GCPRun.PROVISIONED_LABEL: 'true'})
+            self.assertIn('-ge 30', instance['metadata']['items'][0]['value'])
+        ssh_config = (Path(self.temp_dir.name) / '.ssh' / 'mlcube').read_text()
+        self.assertIn('10.0.0.0', ssh_config)
+        self.assertIn('10.0.0.1', ssh_config)
+
+        # Larger pool: new instance boots from the baked image and is not provisioned.
+        run.reset_mock()
+        self.mlcube.runner.instance.pool_size = 3
+        GCPRun(self.mlcube, task=None).configure()
+        self.assertFalse(any('snap install docker' in c.args[0] for c in run.call_args_list))
+        self.assertEqual(self.compute.instances_db['mlcube-gpu-2']['sourceImage'], 'images/mlcube-gpu-image')
+        self.assertEqual(self.compute.calls.count('image-mlcube-gpu-image'), 1)
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_run_starts_stopped_instances(self, run: t.Any) -> None:
+        GCPRun(self.mlcube, task=None).configure()
+        self.compute.instances_db['mlcube-gpu-1']['status'] = 'TERMINATED'  # Stopped itself on idle.
+
+        run.reset_mock()
+        GCPRun(self.mlcube, task=None).run_tasks(['download', 'train'])
+        self.assertEqual(self.compute.instances_db['mlcube-gpu-1']['status'], 'RUNNING')
+        self.assertListEqual(
+            [c.args[0] for c in run.call_args_list],
+            ['mlcube run --mlcube=/home/user/mlcubes/mnist --platform=ssh --task=download,train']
+        )
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_run_waits_for_stopping_instances(self, run: t.Any) -> None:
+        GCPRun(self.mlcube, task=None).configure()
+        self.compute.instances_db['mlcube-gpu'].update(status='STOPPING')
+        self.compute.instances_db['mlcube-gpu-1'].update(status='SUSPENDING')
+
+        def _sleep(_seconds: float) -> None:
+            self.compute.instances_db['mlcube-gpu'].update(status='TERMINATED')
+            self.compute.instances_db['mlcube-gpu-1'].update(status='SUSPENDED')
+
+        with patch('mlcube_gcp.gcp_run.time.sleep', side_effect=_sleep) as sleep:
+            GCPRun(self.mlcube, task=None).run_tasks(['train'])
+        self.assertEqual(sleep.call_count, 1)
+        for name in ('mlcube-gpu', 'mlcube-gpu-1'):
+            self.assertEqual(self.compute.instances_db[name]['status'], 'RUNNING')
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_run_does_not_create_instances(self, run: t.Any) -> None:
+        GCPRun(self.mlcube, task=None).configure()
+
+        run.reset_mock()
+        self.mlcube.runner.instance.pool_size = 3
+        with self.assertRaises(ExecutionError) as ctx:
+            GCPRun(self.mlcube, task=None).run_tasks(['train'])
+        self.assertIn('failed to run MLCube', ctx.exception.message)
+        self.assertIn("names=['mlcube-gpu-2']", ctx.exception.description)
+        self.assertIn('mlcube configure', ctx.exception.description)
+        self.assertNotIn('mlcube-gpu-2', self.compute.instances_db)
+        run.assert_not_called()
+
+    def test_configure_provisions_in_parallel(self) -> None:
+        # Both instances are provisioned at the same time, and provisioning of one of them fails.
+        barrier = threading.Barrier(2, timeout=5.0)
+
+        def _run(cmd: str, **_kwargs) -> int:
+            if 'snap install docker' in cmd:
+                barrier.wait()
+                if 'mlcube-gpu-1' in cmd:
+                    raise ExecutionError("Failed to execute shell command.", code=1, cmd=cmd)
+            return 0
+
+        with patch.object(Shell, 'run', side_effect=_run):
+            with self.assertRaises(ExecutionError) as ctx:
+                GCPRun(self.mlcube, task=None).configure()
+        self.assertListEqual(list(ctx.exception.context['errors'].keys()), ['mlcube-gpu-1'])
+        self.assertEqual(self.compute.instances_db['mlcube-gpu']['labels'], {GCPRun.PROVISIONED_LABEL: 'true'})
+        self.assertEqual(self.compute.instances_db['mlcube-gpu-1']['labels'], {})
+        self.assertNotIn('mlcube-gpu-image', self.compute.images_db)
@@ -0,0 +1,79 @@
+import time
+import typing as t
+from unittest import TestCase
+
+from mlcube_gcp.gcp_client.operation import OperationTracker
+from mlcube_gcp.gcp_client.service import Service
+from mlcube_gcp.tests.test_gcp_run import _Namespace, _Request
+
+
+class FakeOperations(object):
+    """Fake Compute API where every operation completes after its duration (seconds) has elapsed."""
+
+    def __init__(self) -> None:
+        self.durations: t.Dict[str, float] = {}
+        self.started: t.Dict[str, float] = {}
+        self.polls: t.Dict[str, t.List[float]] = {}
+        self.errors: t.Set[str] = set()
+
+    def submit(self, name: str, duration: float) -> t.Dict:
+        self.durations[name], self.started[name], self.polls[name] = duration, time.monotonic(), []
+        return {'name': name, 'status': 'RUNNING', 'zone': 'zones/z'}
+
+    def _get(self, operation: str) -> t.Dict:
+        now = time.monotonic()
+        self.polls[operation].append(now)
+        if now - self.started[operation] < self.durations[operation]:
+            return {'name': operation, 'status': 'RUNNING'}
+        result = {'name': operation, 'status': 'DONE'}
+        if operation in self.errors:
+            result['error'] = {'errors': [{'code': 'QUOTA_EXCEEDED'}]}
+        return result
+
+    def zoneOperations(self) -> _Namespace:
+        return _Namespace(get=lambda operation, **kwargs: _Request(lambda: self._get(operation)))
+
+    def instances(self) -> _Namespace:
+        return _Namespace(
+            start=lambda instance, **kwargs: _Request(lambda: self.submit(f'start-{instance}', 0.2))
+        )
+
+
+class TestOperationTracker(TestCase):
+    def setUp(self) -> None:
+        self.compute = FakeOperations()
+        self.service = Service(project_id='mlcube', zone='us-west1-b', service=self.compute)
+
+    def test_concurrent_operations(self) -> None:
+        start_time = time.monotonic()
+        operations = [self.compute.submit(f'op-{idx}', 0.1 * (idx + 1)) for idx in range(3)]
+        tracker = OperationTracker(self.service, initial_delay=0.01, max_delay=0.05, backoff=2.0)
+        results = tracker.wait(operations)
+        elapsed = time.monotonic() - start_time
+
+        self.assertListEqual([result['name'] for result in results], ['op-0', 'op-1', 'op-2'])
+        self.assertLess(elapsed, 0.5)  # Slowest operation is 0.3 seconds, sum of all operations is 0.6 seconds.
+        # Adaptive backoff: delays between polls grow up to max delay.
+        polls = self.compute.polls['op-2']
+        delays = [later - earlier for earlier, later in zip(polls, polls[1:])]
+        self.assertLess(delays[0], delays[-1])
+        self.assertLess(max(delays), 0.1)
+
+    def test_errors(self) -> None:
+        self.compute.errors.add('op-1')
+        operations = [self.compute.submit(f'op-{idx}', 0.05) for idx in range(2)]
+        with self.assertRaises(Exception) as ctx:
+            OperationTracker(self.service, initial_delay=0.01).wait(operations)
+        self.assertIn('QUOTA_EXCEEDED', str(ctx.exception))
+        # Other operations are waited for before the error is raised.
+        self.assertGreaterEqual(self.compute.polls['op-0'][-1], self.compute.started['op-0'] + 0.05)
+
+    def test_timeout(self) -> None:
+        with self.assertRaises(Exception):
+            OperationTracker(self.service, initial_delay=0.01, timeout=0.05).wait([self.compute.submit('op', 10.0)])
+
+    def test_batch_start(self) -> None:
+        start_time = time.monotonic()
+        results = self.service.start_instances(['node-0', 'node-1', 'node-2'])
+        self.assertEqual(len(results), 3)
+        self.assertLess(time.monotonic() - start_time, 1.0)  # Waiting for one operation takes at least 0.5 seconds.
@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_gcp=mlcube_gcp.__main__:cli
+        [mlcube.runners]
+        gcp=mlcube_gcp:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',
@@ -0,0 +1,267 @@
+"""Tracking completion of Kubernetes jobs.
+
+- `JobStatus`: Final status of a Kubernetes job.
+- `JobTracker`: Track completion of many jobs with one watch, and stream logs of their pods found with another one.
+"""
+import logging
+import threading
+import time
+import typing as t
+
+import kubernetes
+import urllib3
+
+__all__ = ["JobStatus", "JobTracker"]
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(object):
+    """Final status of a Kubernetes job."""
+
+    SUCCEEDED = "succeeded"
+    """Job has completed successfully (`Complete` condition)."""
+
+    FAILED = "failed"
+    """Job has failed (`Failed` condition, e.g., backoff limit or deadline has been exceeded)."""
+
+    @staticmethod
+    def from_job(job: kubernetes.client.V1Job) -> t.Optional[str]:
+        """Return final status of a job, or None if it has not finished yet.
+
+        All conditions are checked, since conditions such as `Suspended` or `SuccessCriteriaMet` may precede terminal
+        ones (`Complete`, `Failed`).
+        """
+        conditions = (job.status.conditions if job.status else None) or []
+        for condition in conditions:
+            if condition.status != "True":
+                continue
+            if condition.type == "Complete":
+                return JobStatus.SUCCEEDED
+            if condition.type == "Failed":
+                return JobStatus.FAILED
+        return None
+
+
+class JobTracker(object):
+    """Track completion of many jobs in one namespace.
+
+    One watch (`list_namespaced_job` with `watch=true`) delivers status updates of all tracked jobs, so that a job is
+    reported as soon as the API server marks it complete. The watch is resumed from the last seen resource version when
+    it times out. When the resource version is too old (410 Gone), or a watch ends without events, jobs are listed
+    again to get a fresh one. When the watch fails (e.g., connection errors), jobs are polled with `list_namespaced_job`
+    every `poll_interval` seconds until the watch can be established again.
+
+    When logs are streamed, one more watch (`list_namespaced_pod` with `watch=true`, pods with the `job-name` label)
+    shared by all tracked jobs finds pods to follow, so the number of API requests does not grow with the number of
+    jobs (except for one log stream per pod).
+
+    Args:
+        namespace: Kubernetes namespace.
+        api_client: Kubernetes API client. If None, default client is used (see `kubernetes.config.load_kube_config`).
+        label_selector: If not None, only jobs matching this selector are watched.
+        watch_timeout: Server-side timeout in seconds of one watch request.
+        poll_interval: Number of seconds between polls when the watch fails.
+        stream_logs: If true, logs of job pods are streamed while they run.
+        on_log: Function to call for every log line (job name, pod name, line). By default, lines are printed.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        api_client: t.Optional[kubernetes.client.ApiClient] = None,
+        label_selector: t.Optional[str] = None,
+        watch_timeout: int = 60,
+        poll_interval: float = 10.0,
+        stream_logs: bool = True,
+        on_log: t.Optional[t.Callable[[str, str, str], None]] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.api_client = api_client
+        self.batch_api = kubernetes.client.BatchV1Api(api_client)
+        self.core_api = kubernetes.client.CoreV1Api(api_client)
+        self.label_selector = label_selector
+        self.watch_timeout = watch_timeout
+        self.poll_interval = poll_interval
+        self.stream_logs = stream_logs
+        self.on_log = on_log or JobTracker._print_log
+
+        self.statuses: t.Dict[str, t.Optional[str]] = {}
+        """Mapping from job name to its final status (None while job is running)."""
+        self._lock = threading.Lock()
+        self._log_threads: t.List[threading.Thread] = []
+        self._followed: t.Set[str] = set()
+        """Names of pods whose logs are streamed."""
+        self._pod_watch_stop: t.Optional[threading.Event] = None
+        """Stop event of the running pod watch thread (None if the thread is not running)."""
+
+    @staticmethod
+    def _print_log(job: str, pod: str, line: str) -> None:
+        print(f"[{pod}] {line}", flush=True)
+
+    def add(self, name: str) -> None:
+        """Start tracking a job (and streaming its logs)."""
+        if name in self.statuses:
+            return
+        self.statuses[name] = None
+        if self.stream_logs and self._pod_watch_stop is None:
+            self._pod_watch_stop = threading.Event()
+            threading.Thread(
+                target=self._watch_pods, args=(self._pod_watch_stop,), name="job-tracker-pods", daemon=True
+            ).start()
+
+    def pending(self) -> t.List[str]:
+        """Return names of jobs that have not finished yet."""
+        return [name for name, status in self.statuses.items() if status is None]
+
+    def wait(self, on_done: t.Optional[t.Callable[[str, str], None]] = None) -> t.Dict[str, str]:
+        """Wait until all tracked jobs finish.
+
+        Args:
+            on_done: Function to call when a job finishes (job name, job status). It may add new jobs to this tracker
+                (e.g., jobs that depend on the finished one), and this method waits for them too.
+        Returns:
+            Mapping from job name to its final status.
+        """
+        resource_version = self._poll(on_done)
+        while self.pending():
+            if resource_version is None:
+                time.sleep(self.poll_interval)
+                resource_version = self._poll(on_done)
+                continue
+            watch, num_events = kubernetes.watch.Watch(), 0
+            try:
+                for event in watch.stream(
+                    self.batch_api.list_namespaced_job,
+                    self.namespace,
+                    label_selector=self.label_selector,
+                    resource_version=resource_version,
+                    timeout_seconds=self.watch_timeout,
+                ):
+                    job: kubernetes.client.V1Job = event["object"]
+                    resource_version, num_events = job.metadata.resource_version, num_events + 1
+                    self._update(job, on_done)
+                    if not self.pending():
+                        watch.stop()
+                        break
+                if num_events == 0:
+                    # Some client versions end the watch silently when the resource version has expired (410 Gone).
+                    resource_version = self._poll(on_done)
+            except kubernetes.client.rest.ApiException as err:
+                if err.status != 410:
+                    logger.warning("JobTracker.wait watch failed, polling jobs (error=%s).", str(err))
+                    time.sleep(self.poll_interval)
+                resource_version = self._poll(on_done)
+            except (urllib3.exceptions.HTTPError, OSError) as err:
+                logger.warning("JobTracker.wait watch failed, polling jobs (error=%s).", str(err))
+                time.sleep(self.poll_interval)
+                resource_version = self._poll(on_done)
+
+        if self._pod_watch_stop is not None:
+            # The pod watch thread exits after its current watch request. Pods of jobs that have finished before the
+            # watch has reported them are found with one more list request.
+            self._pod_watch_stop.set()
+            self._pod_watch_stop = None
+            self._list_pods()
+        with self._lock:
+            threads = list(self._log_threads)
+        for thread in threads:
+            thread.join()
+        with self._lock:
+            self._log_threads = [thread for thread in self._log_threads if thread.is_alive()]
+        return dict(self.statuses)
+
+    def _poll(self, on_done: t.Optional[t.Callable[[str, str], None]]) -> t.Optional[str]:
+        """List jobs and update their statuses.
+
+        Returns:
+            Resource version of the list to start a watch from, or None if jobs could not be listed.
+        """
+        try:
+            jobs = self.batch_api.list_namespaced_job(self.namespace, label_selector=self.label_selector)
+        except (kubernetes.client.rest.ApiException, urllib3.exceptions.HTTPError, OSError) as err:
+            logger.warning("JobTracker.poll failed to list jobs (error=%s).", str(err))
+            return None
+        for job in jobs.items:
+            self._update(job, on_done)
+        return jobs.metadata.resource_version
+
+    def _update(self, job: kubernetes.client.V1Job, on_done: t.Optional[t.Callable[[str, str], None]]) -> None:
+        name = job.metadata.name
+        if name not in self.statuses or self.statuses[name] is not None:
+            return
+        status = JobStatus.from_job(job)
+        if status is not None:
+            self.statuses[name] = status
+            logger.info("JobTracker.update job has finished (name=%s, status=%s).", name, status)
+            if on_done is not None:
+                on_done(name, status)
+
+    def _watch_pods(self, stop: threading.Event) -> None:
+        """Follow logs of pods of tracked jobs as they start running until `stop` is set."""
+        resource_version: t.Optional[str] = None
+        while not stop.is_set():
+            if resource_version is None:
+                resource_version = self._list_pods()
+                if resource_version is None:
+                    stop.wait(self.poll_interval)
+                    continue
+            watch, num_events = kubernetes.watch.Watch(), 0
+            try:
+                for event in watch.stream(
+                    self.core_api.list_namespaced_pod,
+                    self.namespace,
+                    label_selector="job-name",
+                    resource_version=resource_version,
+                    timeout_seconds=self.watch_timeout,
+                ):
+                    pod: kubernetes.client.V1Pod = event["object"]
+                    resource_version, num_events = pod.metadata.resource_version, num_events + 1
+                    self._on_pod(pod)
+                    if stop.is_set():
+                        watch.stop()
+                        break
+                if num_events == 0:
+                    resource_version = None
+            except (kubernetes.client.rest.ApiException, urllib3.exceptions.HTTPError, OSError) as err:
+                if not isinstance(err, kubernetes.client.rest.ApiException) or err.status != 410:
+                    logger.debug("JobTracker.watch_pods watch failed (error=%s).", str(err))
+                    stop.wait(self.poll_interval)
+                resource_version = None
+
+    def _list_pods(self) -> t.Optional[str]:
+        """List pods of jobs and follow logs of pods of tracked jobs.
+
+        Returns:
+            Resource version of the list to start a watch from, or None if pods could not be listed.
+        """
+        try:
+            pods = self.core_api.list_namespaced_pod(self.namespace, label_selector="job-name")
+        except (kubernetes.client.rest.ApiException, urllib3.exceptions.HTTPError, OSError) as err:
+            logger.debug("JobTracker.list_pods failed to list pods (error=%s).", str(err))
+            return None
+        for pod in pods.items:
+            self._on_pod(pod)
+        return pods.metadata.resource_version
+
+    def _on_pod(self, pod: kubernetes.client.V1Pod) -> None:
+        """Start following logs of a pod if it belongs to a tracked job and has started."""
+        name = (pod.metadata.labels or {}).get("job-name", None)
+        if name not in self.statuses or (pod.status and pod.status.phase == "Pending"):
+            return
+        with self._lock:
+            if pod.metadata.name in self._followed:
+                return
+            self._followed.add(pod.metadata.name)
+            thread = threading.Thread(target=self._follow, args=(name, pod.metadata.name), daemon=True)
+            thread.start()
+            self._log_threads.append(thread)
+
+    def _follow(self, name: str, pod: str) -> None:
+        try:
+            for line in kubernetes.watch.Watch().stream(
+                self.core_api.read_namespaced_pod_log, pod, self.namespace, follow=True
+            ):
+                self.on_log(name, pod, line)
+        except (kubernetes.client.rest.ApiException, urllib3.exceptions.HTTPError, OSError) as err:
+            logger.debug("JobTracker.follow failed to stream logs (pod=%s, error=%s).", pod, str(err))
@@ -1,12 +1,17 @@
 import logging
+import os
+import time
 import urllib3
 import kubernetes
-import time
 import typing as t
 from omegaconf import (DictConfig, OmegaConf)
-from mlcube.errors import ExecutionError
+from mlcube.errors import (ConfigurationError, ExecutionError)
+from mlcube.profiler import Profiler
 from mlcube.runner import (RunnerConfig, Runner)
+from mlcube.scheduler import (TaskGraph, TaskResult, TaskScheduler, TaskStatus)
+from mlcube.sweep import Sweep
 from mlcube.validate import Validate
+from mlcube_k8s.job_tracker import (JobStatus, JobTracker)
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +24,19 @@ class Config(RunnerConfig):
 
         'pvc': '${name}',             # By default, PVC name equals to the name of this MLCube (mnist, matmul, ...).
         'image': '${docker.image}',   # Use image name from docker configuration section.
-        'namespace': 'default'        # ...
+        'namespace': 'default',       # ...
+        'parallelism': 0              # Maximal number of pods of a sweep (Indexed Job) that run concurrently. If 0,
+                                      # `mlcube sweep --jobs` is used if greater than 1, else all pods run concurrently.
     })
 
     @staticmethod
     def validate(mlcube: DictConfig) -> None:
         Validate(mlcube.runner, 'runner')\
             .check_unknown_keys(Config.DEFAULT.keys())\
-            .check_values(['pvc', 'image', 'namespace'], str, blanks=False)
+            .check_values(['pvc', 'image', 'namespace'], str, blanks=False)\
+            .check_values(['parallelism'], int)
+        if mlcube.runner.parallelism < 0:
+            raise ConfigurationError(f"Parallelism must not be negative (parallelism={mlcube.runner.parallelism}).")
 
 
 class KubernetesRun(Runner):
@@ -37,7 +47,8 @@ class KubernetesRun(Runner):
         super().__init__(mlcube, task)
 
     def binding_to_volumes(self, params: DictConfig,                                        # inputs
-                           args: t.List[t.Text], volume_mounts: t.Dict, volumes: t.Dict):   # outputs
+                           args: t.List[t.Text], volume_mounts: t.Dict, volumes: t.Dict,    # outputs
+                           prefix: t.Text = ''):                                            # inputs
         logger.warning(
             "You are running Kubernetes MLCube runner. In current implementation, the following must be true:"
             "  - Default workspace must be used."
@@ -50,7 +61,8 @@ class KubernetesRun(Runner):
         for param_name, param_def in params.items():
             # We assume all paths are RELATIVE! So, just adding parameter value is fine.
             # Workspace in a host OS ({runtime.workspace}) will be mounted as $vol_mount_prefix/$pvc_name.
-            args.append(f"--{param_name}=" + vol_mount_prefix + pvc_name + "/" + param_def.default)
+            # Paths may have a PVC-relative prefix (e.g., workspaces of sweep jobs).
+            args.append(f"--{param_name}=" + vol_mount_prefix + pvc_name + "/" + prefix + param_def.default)
             volume_mounts[pvc_name] = kubernetes.client.V1VolumeMount(
                 name=pvc_name,
                 mount_path=vol_mount_prefix + pvc_name
@@ -60,7 +72,19 @@ class KubernetesRun(Runner):
                 persistent_volume_claim=kubernetes.client.V1PersistentVolumeClaimVolumeSource(claim_name=pvc_name)
             )
 
-    def create_job_manifest(self) -> kubernetes.client.V1Job:
+    def create_job_manifest(self, mlcube: t.Optional[DictConfig] = None, task: t.Optional[t.Text] = None,
+                            output_prefix: t.Text = '') -> kubernetes.client.V1Job:
+        """Return job manifest for a task.
+
+        Args:
+            mlcube: MLCube configuration (e.g., configuration of a sweep job). If None, configuration of this runner is
+                used.
+            task: Task name. If None, task of this runner is used.
+            output_prefix: PVC-relative directory of task outputs (e.g., `sweeps/train/0/` for a sweep job), by default
+                outputs are relative to PVC root.
+        """
+        mlcube = mlcube if mlcube is not None else self.mlcube
+        task = task if task is not None else self.task
         image: t.Text = self.mlcube.runner.image
         logging.info(f"Using image: {image}")
 
@@ -68,11 +92,13 @@ class KubernetesRun(Runner):
         container_volume_mounts: t.Dict = dict()
         container_volumes: t.Dict = dict()
 
-        params = self.mlcube.tasks[self.task].parameters
+        params = mlcube.tasks[task].parameters
 
-        container_args.append(self.task)
+        container_args.append(task)
         self.binding_to_volumes(params.inputs, container_args, container_volume_mounts, container_volumes)
-        self.binding_to_volumes(params.outputs, container_args, container_volume_mounts, container_volumes)
+        self.binding_to_volumes(
+            params.outputs, container_args, container_volume_mounts, container_volumes, prefix=output_prefix
+        )
 
         logging.info("Using Container arguments: %s" % container_args)
 
@@ -96,40 +122,174 @@ class KubernetesRun(Runner):
         mlcube_job_manifest = kubernetes.client.V1Job(
             api_version="batch/v1",
             kind="Job",
-            metadata=kubernetes.client.V1ObjectMeta(generate_name="mlcube-" + self.mlcube.name + "-"),
+            metadata=kubernetes.client.V1ObjectMeta(
+                generate_name="mlcube-" + self.mlcube.name + "-", labels={"app": "mlcube", "app-name": self.mlcube.name}
+            ),
             spec=job_spec,
         )
         logging.info("The MLCube Kubernetes Job manifest %s", mlcube_job_manifest)
         return mlcube_job_manifest
 
-    def create_job(self, job_manifest: kubernetes.client.V1Job) -> t.Any:
+    def create_job(self, job_manifest: t.Union[kubernetes.client.V1Job, t.Dict],
+                   task: t.Optional[t.Text] = None) -> t.Any:
         k8s_job_client = kubernetes.client.BatchV1Api()
         job_creation_response = k8s_job_client.create_namespaced_job(
             body=job_manifest,
             namespace=self.mlcube.runner.namespace
         )
         logging.info("MLCommons Box k8s job created. Status='%s'" % str(job_creation_response.status))
-        print("MLCommons Box k8s job created with name= %s for task= %s" % (str(job_creation_response.metadata.name), str(self.task)))
+        print(
+            "MLCommons Box k8s job created with name= %s for task= %s" % (
+                str(job_creation_response.metadata.name), str(task or self.task)
+            )
+        )
         return job_creation_response
 
-    def wait_for_completion(self, job):
-        k8s_job_client = kubernetes.client.BatchV1Api()
+    def wait_for_completion(self, job: kubernetes.client.V1Job) -> None:
         print("Waiting for Job to complete in the kubernetes cluster")
-        while(1):
-            job = k8s_job_client.read_namespaced_job_status(job.metadata.name, job.metadata.namespace)
-            status = job.status
-            logging.info("Current job status='%s'" % str(status))
-            if  status.conditions:
-                if status.conditions[0].status and status.conditions[0].type == "Complete":
-                    print("Job is successful")
-                else:
-                    print("Job has failed")
-                break
-            time.sleep(10)
+        tracker = JobTracker(job.metadata.namespace, label_selector="app=mlcube")
+        tracker.add(job.metadata.name)
+        status = tracker.wait()[job.metadata.name]
+        if status != JobStatus.SUCCEEDED:
+            print("Job has failed")
+            raise ExecutionError(f"Kubernetes job has failed (name={job.metadata.name}, task={self.task}).")
+        print("Job is successful")
+
+    @staticmethod
+    def get_indexed_args(args: t.List[t.List[t.Text]]) -> t.Optional[t.List[t.Text]]:
+        """Return container arguments of one Indexed Job that runs all given jobs (job index = completion index).
+
+        Kubernetes sets the `JOB_COMPLETION_INDEX` environment variable for pods of Indexed Jobs, and expands
+        `$(JOB_COMPLETION_INDEX)` in container arguments. Arguments of all jobs must be the same except for the job
+        index (e.g., `--data_dir=.../shards/0`, `--data_dir=.../shards/1`, ...).
+
+        Args:
+            args: Container arguments of each job.
+        Returns:
+            Container arguments of the Indexed Job, or None if arguments of jobs differ in some other way.
+        """
+        if not args or any(len(job_args) != len(args[0]) for job_args in args):
+            return None
+        indexed_args: t.List[t.Text] = []
+        for values in zip(*args):
+            if len(set(values)) == 1:
+                indexed_args.append(values[0])
+                continue
+            prefix = os.path.commonprefix(values)
+            suffix = os.path.commonprefix([value[len(prefix):][::-1] for value in values])[::-1]
+            if any(value != f"{prefix}{idx}{suffix}" for idx, value in enumerate(values)):
+                return None
+            indexed_args.append(f"{prefix}$(JOB_COMPLETION_INDEX){suffix}")
+        return indexed_args
+
+    def create_indexed_job_manifest(self, manifests: t.List[kubernetes.client.V1Job],
+                                    parallelism: int) -> t.Optional[t.Dict]:
+        """Return manifest of one Indexed Job that runs all given jobs, or None if this is not possible.
 
+        Args:
+            manifests: Job manifests that differ only in container arguments (see `get_indexed_args`).
+            parallelism: Maximal number of pods that run concurrently.
+        """
+        args = KubernetesRun.get_indexed_args(
+            [manifest.spec.template.spec.containers[0].args for manifest in manifests]
+        )
+        if args is None:
+            return None
+        # The `completionMode` field is not supported by V1JobSpec in older clients, so the manifest is a dictionary.
+        manifest: t.Dict = kubernetes.client.ApiClient().sanitize_for_serialization(manifests[0])
+        manifest["spec"]["template"]["spec"]["containers"][0]["args"] = args
+        manifest["spec"].update(completionMode="Indexed", completions=len(manifests), parallelism=parallelism)
+        logging.info("The MLCube Kubernetes Indexed Job manifest %s", manifest)
+        return manifest
+
+    def get_index_statuses(self, job_name: t.Text) -> t.Dict[int, t.Text]:
+        """Return statuses of completion indices of an Indexed Job that has finished.
+
+        An index has succeeded if at least one of its pods has succeeded (failed pods may have been retried).
+        """
+        pods = kubernetes.client.CoreV1Api().list_namespaced_pod(
+            self.mlcube.runner.namespace, label_selector=f"job-name={job_name}"
+        ).items
+        statuses: t.Dict[int, t.Text] = {}
+        for pod in pods:
+            index = int((pod.metadata.annotations or {}).get("batch.kubernetes.io/job-completion-index", -1))
+            if pod.status and pod.status.phase == "Succeeded":
+                statuses[index] = TaskStatus.SUCCEEDED
+            else:
+                statuses.setdefault(index, TaskStatus.FAILED)
+        return statuses
+
+    def submit_jobs(self, manifests: t.Dict[t.Text, t.Any], dependencies: t.Dict[t.Text, t.Set[t.Text]],
+                    on_done: t.Optional[t.Callable[[t.Text, t.Text, t.Text], None]] = None
+                    ) -> t.Dict[t.Text, TaskResult]:
+        """Submit Kubernetes jobs in dependency order and wait until all of them finish.
+
+        Jobs that do not depend on other jobs are submitted immediately. Other jobs are submitted as soon as all jobs
+        they depend on have succeeded, and are skipped when any of them fails or is skipped (see `TaskScheduler`). One
+        `JobTracker` watches all submitted jobs.
+
+        Args:
+            manifests: Mapping from job names (e.g., task names) to job manifests, in submission order.
+            dependencies: Mapping from job names to names of jobs they depend on.
+            on_done: Function to call when a Kubernetes job finishes (job name, Kubernetes job name, job status).
+        Returns:
+            Mapping from job names to their results.
+        """
+        tracker = JobTracker(self.mlcube.runner.namespace, label_selector="app=mlcube")
+        submitted: t.Dict[t.Text, t.Text] = {}     # Kubernetes job name -> job name.
+        start_times: t.Dict[t.Text, float] = {}
+        results: t.Dict[t.Text, TaskResult] = {}
+
+        def _submit_ready_jobs() -> None:
+            num_results = -1
+            # Skipping a job may unblock (skip) other jobs, so submit until nothing changes.
+            while num_results != len(results):
+                num_results = len(results)
+                for _name in manifests:
+                    if _name in results or _name in start_times:
+                        continue
+                    _failed = [_dep for _dep in dependencies[_name]
+                               if _dep in results and results[_dep].status != TaskStatus.SUCCEEDED]
+                    if _failed:
+                        logger.warning("KubernetesRun.submit_jobs skipping job (%s), failed dependencies: %s.",
+                                       _name, _failed)
+                        results[_name] = TaskResult(
+                            _name, TaskStatus.SKIPPED, exit_code=1, error=f"Dependencies failed or skipped: {_failed}."
+                        )
+                    elif all(_dep in results for _dep in dependencies[_name]):
+                        start_times[_name] = time.perf_counter()
+                        try:
+                            _job = self.create_job(manifests[_name], task=_name)
+                        except (kubernetes.client.rest.ApiException, urllib3.exceptions.HTTPError, OSError) as err:
+                            logger.error("KubernetesRun.submit_jobs failed to create job (%s): %s", _name, str(err))
+                            results[_name] = TaskResult(_name, TaskStatus.FAILED, exit_code=1, error=str(err))
+                            continue
+                        submitted[_job.metadata.name] = _name
+                        tracker.add(_job.metadata.name)
+
+        def _on_done(_job_name: t.Text, _status: t.Text) -> None:
+            _name = submitted[_job_name]
+            _duration = time.perf_counter() - start_times[_name]
+            if _status == JobStatus.SUCCEEDED:
+                results[_name] = TaskResult(_name, TaskStatus.SUCCEEDED, duration=_duration)
+            else:
+                results[_name] = TaskResult(
+                    _name, TaskStatus.FAILED, exit_code=1, duration=_duration,
+                    error=f"Kubernetes job has failed (name={_job_name})."
+                )
+            if on_done is not None:
+                on_done(_name, _job_name, _status)
+            _submit_ready_jobs()
+
+        _submit_ready_jobs()
+        tracker.wait(on_done=_on_done)
+        return results
+
+    @Profiler.profile()
     def configure(self) -> None:
         ...
 
+    @Profiler.profile()
     def run(self) -> None:
         """Run a cube"""
         try:
@@ -145,3 +305,77 @@ class KubernetesRun(Runner):
                 "See context for more details.",
                 error=str(err)
             )
+
+    @Profiler.profile()
+    def run_tasks(self, tasks: t.List[t.Text]) -> None:
+        """Run tasks as a batch of Kubernetes jobs.
+
+        Tasks that do not depend on other tasks (see `TaskGraph`) are submitted immediately, and other tasks are
+        submitted as soon as tasks they depend on succeed.
+        """
+        try:
+            kubernetes.config.load_kube_config()
+            graph = TaskGraph(self.mlcube, tasks)
+            manifests = {task: self.create_job_manifest(task=task) for task in graph.tasks}
+            results = self.submit_jobs(manifests, graph.dependencies)
+        except Exception as err:
+            raise ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                "See context for more details.",
+                error=str(err)
+            )
+        results = [results[task] for task in graph.tasks]
+        print(TaskScheduler.format_results(results))
+        exit_code = TaskScheduler.exit_code(results)
+        if exit_code != 0:
+            raise ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                "One or more Kubernetes jobs have failed or have been skipped.",
+                code=exit_code,
+                failed=[result.task for result in results if result.status != TaskStatus.SUCCEEDED]
+            )
+
+    @Profiler.profile()
+    def run_sweep(self, sweep: Sweep, num_workers: int = 1) -> t.List[TaskResult]:
+        """Run all jobs of a parameter sweep on a Kubernetes cluster.
+
+        Every sweep job writes its outputs to its own directory in the PVC (`sweeps/${task}/${job_index}/`), so that
+        jobs do not overwrite outputs of each other. When job parameters differ only in job index (e.g., shards/0,
+        shards/1, ...), all jobs run as one Indexed Job with `parallelism` pods running concurrently. Else, every sweep
+        job is submitted as a separate Kubernetes job.
+        """
+        try:
+            kubernetes.config.load_kube_config()
+            manifests = [
+                self.create_job_manifest(sweep.job_config(idx), sweep.task, output_prefix=f"sweeps/{sweep.task}/{idx}/")
+                for idx in range(len(sweep.jobs))
+            ]
+            parallelism = self.mlcube.runner.parallelism or (num_workers if num_workers > 1 else len(manifests))
+            indexed_manifest = self.create_indexed_job_manifest(manifests, parallelism)
+            if indexed_manifest is None:
+                logger.info("KubernetesRun.run_sweep sweep jobs can not run as one Indexed Job.")
+                results = self.submit_jobs(
+                    dict(zip(sweep.job_names, manifests)), {name: set() for name in sweep.job_names}
+                )
+                return [results[name] for name in sweep.job_names]
+
+            # Failed pods of some indices do not fail other indices, so every sweep job gets status of its index.
+            statuses: t.Dict[int, t.Text] = {}
+            result = self.submit_jobs(
+                {sweep.task: indexed_manifest}, {sweep.task: set()},
+                on_done=lambda _name, _job_name, _status: statuses.update(self.get_index_statuses(_job_name))
+            )[sweep.task]
+        except Exception as err:
+            raise ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                "See context for more details.",
+                error=str(err)
+            )
+        results: t.List[TaskResult] = []
+        for idx, name in enumerate(sweep.job_names):
+            status = statuses.get(idx, result.status)
+            if status == TaskStatus.SUCCEEDED:
+                results.append(TaskResult(name, status, duration=result.duration))
+            else:
+                results.append(TaskResult(name, status, exit_code=1, duration=result.duration, error=result.error))
+        return results
@@ -0,0 +1,260 @@
+"""Minimal in-process fake of the Kubernetes API server (jobs, pods and pod logs) for tests."""
+import json
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import kubernetes
+
+
+class FakeKubernetes(object):
+    """Fake API server with a trivial job controller.
+
+    Every created job starts one pod per completion index after `start_delay` seconds. The pod prints `logs` and
+    succeeds (or fails, if job name is in `failing`) after `duration` seconds.
+    """
+
+    def __init__(self, duration: float = 0.2, start_delay: float = 0.05) -> None:
+        self.duration = duration
+        self.start_delay = start_delay
+        self.logs: t.List[str] = ["epoch 1", "epoch 2"]
+        self.failing: t.Set[str] = set()
+
+        self.resource_version = 0
+        self.expired_watches = 0
+        """Number of next job watch requests that fail with 410 Gone (resource version is too old)."""
+        self.stopped = False
+        self.jobs: t.Dict[str, t.Dict] = {}
+        self.pods: t.Dict[str, t.Dict] = {}
+        self.pod_logs: t.Dict[str, t.List[str]] = {}
+        self.events: t.List[t.Tuple[int, str, t.Dict]] = []
+        self.requests: t.List[str] = []
+        self.created: t.List[str] = []
+        self.cond = threading.Condition()
+
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                ...
+
+            def do_GET(self) -> None:
+                fake.handle_get(self)
+
+            def do_POST(self) -> None:
+                fake.handle_post(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def configuration(self) -> kubernetes.client.Configuration:
+        configuration = kubernetes.client.Configuration()
+        configuration.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return configuration
+
+    def api_client(self) -> kubernetes.client.ApiClient:
+        return kubernetes.client.ApiClient(self.configuration())
+
+    def shutdown(self) -> None:
+        with self.cond:
+            self.stopped = True  # Stop watches.
+            self.cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Object store.
+    def _emit(self, event_type: str, obj: t.Dict) -> None:
+        with self.cond:
+            self.resource_version += 1
+            obj["metadata"]["resourceVersion"] = str(self.resource_version)
+            self.events.append((self.resource_version, event_type, json.loads(json.dumps(obj))))
+            self.cond.notify_all()
+
+    def add_job(self, job: t.Dict) -> t.Dict:
+        metadata = job.setdefault("metadata", {})
+        if "name" not in metadata:
+            metadata["name"] = f"{metadata.get('generateName', 'job-')}{len(self.jobs):05d}"
+        metadata.setdefault("namespace", "default")
+        job.setdefault("status", {})
+        self.jobs[metadata["name"]] = job
+        self.created.append(metadata["name"])
+        self._emit("ADDED", job)
+        threading.Thread(target=self._run_job, args=(metadata["name"],), daemon=True).start()
+        return job
+
+    def set_job_status(self, name: str, status: t.Dict) -> None:
+        self.jobs[name]["status"] = status
+        self._emit("MODIFIED", self.jobs[name])
+
+    def _run_job(self, name: str) -> None:
+        time.sleep(self.start_delay)
+        job = self.jobs[name]
+        completions = job["spec"].get("completions", None) or 1
+        template = job["spec"]["template"]
+        pods = []
+        for idx in range(completions):
+            pod_name = f"{name}-{idx}"
+            self.pods[pod_name] = {
+                "kind": "Pod",
+                "metadata": {"name": pod_name, "namespace": "default", "labels": {"job-name": name},
+                             "annotations": {"batch.kubernetes.io/job-completion-index": str(idx)}},
+                "spec": template["spec"],
+                "status": {"phase": "Running"},
+            }
+            self.pod_logs[pod_name] = []
+            pods.append(pod_name)
+            self._emit("ADDED", self.pods[pod_name])
+        self.set_job_status(name, {"active": len(pods)})
+        for line in self.logs:
+            time.sleep(self.duration / (len(self.logs) + 1))
+            with self.cond:
+                for pod_name in pods:
+                    self.pod_logs[pod_name].append(line)
+                self.cond.notify_all()
+        time.sleep(self.duration / (len(self.logs) + 1))
+        failed = name in self.failing
+        with self.cond:
+            for pod_name in pods:
+                self.pods[pod_name]["status"]["phase"] = "Failed" if failed else "Succeeded"
+                self._emit("MODIFIED", self.pods[pod_name])
+            self.cond.notify_all()
+        conditions = [{"type": "SuccessCriteriaMet" if not failed else "FailureTarget", "status": "True"},
+                      {"type": "Failed" if failed else "Complete", "status": "True"}]
+        if failed:
+            self.set_job_status(name, {"failed": len(pods), "conditions": conditions})
+        else:
+            self.set_job_status(name, {"succeeded": len(pods), "conditions": conditions})
+
+    # HTTP handlers.
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, body: t.Any) -> None:
+        content = (json.dumps(body) if not isinstance(body, str) else body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json" if not isinstance(body, str) else "text/plain")
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    @staticmethod
+    def _start_stream(handler: BaseHTTPRequestHandler, content_type: str) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+    @staticmethod
+    def _write_chunk(handler: BaseHTTPRequestHandler, data: str) -> None:
+        content = data.encode()
+        handler.wfile.write(f"{len(content):x}\r\n".encode() + content + b"\r\n")
+        handler.wfile.flush()
+
+    @staticmethod
+    def _matches(obj: t.Dict, selector: t.Optional[str]) -> bool:
+        labels = obj["metadata"].get("labels", None) or {}
+        for requirement in (selector or "").split(","):
+            if "=" in requirement:
+                key, value = requirement.split("=")
+                if labels.get(key, None) != value:
+                    return False
+            elif requirement and requirement not in labels:  # Existence requirement (`job-name`).
+                return False
+        return True
+
+    def handle_post(self, handler: BaseHTTPRequestHandler) -> None:
+        path = urlparse(handler.path).path
+        self.requests.append(f"POST {path}")
+        body = json.loads(handler.rfile.read(int(handler.headers["Content-Length"])))
+        self._send(handler, 201, self.add_job(body))
+
+    def handle_get(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        watch = query.get("watch", "").lower() == "true"
+        self.requests.append(f"GET {url.path}{'?watch' if watch else ''}")
+        selector = query.get("labelSelector", None)
+        if url.path.startswith("/apis/batch/v1/namespaces/") and parts[-1] == "jobs":
+            if watch:
+                return self._watch(handler, int(query.get("resourceVersion", 0) or 0),
+                                   float(query.get("timeoutSeconds", 5)), selector, "Job")
+            with self.cond:
+                items = [job for job in self.jobs.values() if self._matches(job, selector)]
+                return self._send(handler, 200, {
+                    "kind": "JobList", "apiVersion": "batch/v1",
+                    "metadata": {"resourceVersion": str(self.resource_version)}, "items": items
+                })
+        if url.path.startswith("/apis/batch/v1/namespaces/") and parts[-1] == "status":
+            return self._send(handler, 200, self.jobs[parts[-2]])
+        if url.path.startswith("/api/v1/namespaces/") and parts[-1] == "pods":
+            if watch:
+                return self._watch(handler, int(query.get("resourceVersion", 0) or 0),
+                                   float(query.get("timeoutSeconds", 5)), selector, "Pod")
+            with self.cond:
+                items = [pod for pod in self.pods.values() if self._matches(pod, selector)]
+                return self._send(handler, 200, {
+                    "kind": "PodList", "metadata": {"resourceVersion": str(self.resource_version)}, "items": items
+                })
+        if url.path.startswith("/api/v1/namespaces/") and parts[-1] == "log":
+            return self._logs(handler, parts[-2], query.get("follow", "").lower() == "true")
+        self._send(handler, 404, {"kind": "Status", "code": 404})
+
+    def _watch(self, handler: BaseHTTPRequestHandler, resource_version: int, timeout: float,
+               selector: t.Optional[str], kind: str) -> None:
+        self._start_stream(handler, "application/json")
+        try:
+            self._stream_events(handler, resource_version, timeout, selector, kind)
+        finally:
+            self._write_chunk(handler, "")
+
+    def _stream_events(self, handler: BaseHTTPRequestHandler, resource_version: int, timeout: float,
+                       selector: t.Optional[str], kind: str) -> None:
+        with self.cond:
+            expired = kind == "Job" and self.expired_watches > 0
+            self.expired_watches = max(0, self.expired_watches - 1) if kind == "Job" else self.expired_watches
+        if expired:
+            self._write_chunk(handler, json.dumps({
+                "type": "ERROR",
+                "object": {"kind": "Status", "code": 410, "reason": "Expired", "message": "too old resource version"}
+            }) + "\n")
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.cond:
+                events = [event for event in self.events if event[0] > resource_version]
+                if not events:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self.stopped:
+                        return
+                    self.cond.wait(remaining)
+                    continue
+            for event_rv, event_type, obj in events:
+                resource_version = event_rv
+                if obj.get("kind", "Job") == kind and self._matches(obj, selector):
+                    self._write_chunk(handler, json.dumps({"type": event_type, "object": obj}) + "\n")
+
+    def _logs(self, handler: BaseHTTPRequestHandler, pod_name: str, follow: bool) -> None:
+        self._start_stream(handler, "text/plain")
+        try:
+            self._stream_logs(handler, pod_name, follow)
+        finally:
+            self._write_chunk(handler, "")
+
+    def _stream_logs(self, handler: BaseHTTPRequestHandler, pod_name: str, follow: bool) -> None:
+        sent = 0
+        while True:
+            with self.cond:
+                lines = self.pod_logs[pod_name][sent:]
+                finished = self.pods[pod_name]["status"]["phase"] in ("Succeeded", "Failed")
+                if not lines and follow and not finished:
+                    self.cond.wait(1.0)
+                    continue
+            for line in lines:
+                self._write_chunk(handler, line + "\n")
+            sent += len(lines)
+            if not follow or (finished and not lines):
+                return
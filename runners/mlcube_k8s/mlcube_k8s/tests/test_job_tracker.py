@@ -0,0 +1,113 @@
+import time
+import typing as t
+from unittest import TestCase
+from unittest.mock import patch
+
+import kubernetes
+
+from mlcube_k8s.job_tracker import JobStatus, JobTracker
+from mlcube_k8s.tests.fake_k8s import FakeKubernetes
+
+
+def _job(name: str) -> t.Dict:
+    return {
+        "metadata": {"name": name, "labels": {"app": "mlcube"}},
+        "spec": {"template": {"spec": {"containers": [{"name": "mlcube-container", "image": "mnist"}]}}},
+    }
+
+
+class TestJobTracker(TestCase):
+    def setUp(self) -> None:
+        self.k8s = FakeKubernetes()
+        self.logs: t.List[t.Tuple[str, str, str]] = []
+
+    def tearDown(self) -> None:
+        self.k8s.shutdown()
+
+    def _tracker(self, **kwargs) -> JobTracker:
+        return JobTracker(
+            "default", api_client=self.k8s.api_client(), label_selector="app=mlcube", watch_timeout=1,
+            poll_interval=0.05, on_log=lambda *args: self.logs.append(args), **kwargs
+        )
+
+    def _pod_requests(self) -> t.List[str]:
+        """Return pod list and watch requests (without log requests)."""
+        return [request for request in self.k8s.requests if request.split("?")[0].endswith("/pods")]
+
+    def test_job_status(self) -> None:
+        job = kubernetes.client.V1Job(status=kubernetes.client.V1JobStatus(conditions=[
+            kubernetes.client.V1JobCondition(type="Suspended", status="False"),
+            kubernetes.client.V1JobCondition(type="Complete", status="True"),
+        ]))
+        self.assertEqual(JobStatus.from_job(job), JobStatus.SUCCEEDED)
+        self.assertIsNone(JobStatus.from_job(kubernetes.client.V1Job(status=kubernetes.client.V1JobStatus())))
+
+    def test_wait(self) -> None:
+        self.k8s.failing.add("train")
+        tracker = self._tracker()
+        start_time = time.monotonic()
+        for name in ("download", "train"):
+            self.k8s.add_job(_job(name))
+            tracker.add(name)
+        statuses = tracker.wait()
+
+        self.assertDictEqual(statuses, {"download": JobStatus.SUCCEEDED, "train": JobStatus.FAILED})
+        self.assertLess(time.monotonic() - start_time, 1.0)  # Jobs run for ~0.25 seconds.
+        # One list request and watch requests, no polling of individual jobs.
+        job_requests = [request for request in self.k8s.requests if "/jobs" in request]
+        self.assertEqual(job_requests[0], "GET /apis/batch/v1/namespaces/default/jobs")
+        self.assertTrue(all(request.endswith("?watch") for request in job_requests[1:]))
+        # Logs of all pods have been streamed.
+        self.assertCountEqual(
+            self.logs, [(job, f"{job}-0", line) for job in ("download", "train") for line in self.k8s.logs]
+        )
+        # Pods to follow are found with one watch shared by all jobs, not by polling pods of every job.
+        pod_requests = self._pod_requests()
+        self.assertIn("GET /api/v1/namespaces/default/pods?watch", pod_requests)
+        self.assertLessEqual(pod_requests.count("GET /api/v1/namespaces/default/pods"), 2)  # First and last lists.
+
+    def test_stream_logs_of_many_jobs(self) -> None:
+        tracker = self._tracker()
+        names = [f"job-{idx}" for idx in range(5)]
+        for name in names:
+            self.k8s.add_job(_job(name))
+            tracker.add(name)
+        self.assertDictEqual(tracker.wait(), {name: JobStatus.SUCCEEDED for name in names})
+        self.assertCountEqual(self.logs, [(job, f"{job}-0", line) for job in names for line in self.k8s.logs])
+        # The number of pod list and watch requests does not depend on the number of jobs.
+        pod_requests = self._pod_requests()
+        self.assertLessEqual(len(pod_requests), 4)
+
+    def test_resume_after_410(self) -> None:
+        tracker = self._tracker(stream_logs=False)
+        self.k8s.add_job(_job("download"))
+        tracker.add("download")
+        self.k8s.expired_watches = 2  # Watch client retries once with the same resource version.
+        self.assertDictEqual(tracker.wait(), {"download": JobStatus.SUCCEEDED})
+        self.assertGreaterEqual(
+            self.k8s.requests.count("GET /apis/batch/v1/namespaces/default/jobs"), 2, "Jobs have not been listed again."
+        )
+
+    def test_fallback_poll(self) -> None:
+        tracker = self._tracker(stream_logs=False)
+        self.k8s.add_job(_job("download"))
+        tracker.add("download")
+        with patch.object(kubernetes.watch.Watch, "stream", side_effect=urllib3_error()):
+            self.assertDictEqual(tracker.wait(), {"download": JobStatus.SUCCEEDED})
+
+    def test_dependent_jobs(self) -> None:
+        tracker = self._tracker(stream_logs=False)
+        self.k8s.add_job(_job("download"))
+        tracker.add("download")
+
+        def _on_done(name: str, status: str) -> None:
+            if name == "download":
+                self.k8s.add_job(_job("train"))
+                tracker.add("train")
+
+        self.assertDictEqual(tracker.wait(_on_done), {"download": JobStatus.SUCCEEDED, "train": JobStatus.SUCCEEDED})
+
+
+def urllib3_error() -> Exception:
+    import urllib3
+    return urllib3.exceptions.ProtocolError("Connection reset by peer")
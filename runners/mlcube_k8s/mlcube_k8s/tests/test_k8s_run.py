@@ -0,0 +1,125 @@
+import typing as t
+from unittest import TestCase
+from unittest.mock import patch
+
+import kubernetes
+from omegaconf import DictConfig, OmegaConf
+
+from mlcube.errors import ExecutionError
+from mlcube.scheduler import TaskStatus
+from mlcube.sweep import Sweep
+from mlcube_k8s.k8s_run import Config, KubernetesRun
+from mlcube_k8s.tests.fake_k8s import FakeKubernetes
+
+
+def _task(inputs: t.Dict[str, str], outputs: t.Dict[str, str]) -> t.Dict:
+    return {'parameters': {
+        'inputs': {name: {'type': 'directory', 'default': path} for name, path in inputs.items()},
+        'outputs': {name: {'type': 'directory', 'default': path} for name, path in outputs.items()}
+    }}
+
+
+class TestKubernetesRun(TestCase):
+    def setUp(self) -> None:
+        self.k8s = FakeKubernetes()
+        kubernetes.client.Configuration.set_default(self.k8s.configuration())
+        self.kube_config = patch.object(kubernetes.config, 'load_kube_config')
+        self.kube_config.start()
+
+        self.mlcube: DictConfig = OmegaConf.create({
+            'name': 'mnist',
+            'runtime': {'root': '/mlcubes/mnist', 'workspace': '/mlcubes/mnist/workspace'},
+            'runner': {'runner': 'k8s', 'pvc': 'mnist', 'image': 'mlcommons/mnist', 'namespace': 'default',
+                       'parallelism': 0},
+            'tasks': {
+                'download': _task({}, {'data_dir': 'data'}),
+                'train': _task({'data_dir': 'data'}, {'model_dir': 'model'}),
+                'lint': _task({}, {'report_dir': 'report'})
+            }
+        })
+        Config.validate(self.mlcube)
+
+    def tearDown(self) -> None:
+        self.kube_config.stop()
+        kubernetes.client.Configuration.set_default(None)
+        self.k8s.shutdown()
+
+    def _tasks(self) -> t.List[str]:
+        """Return task names of created jobs in the order jobs have been created."""
+        return [self.k8s.jobs[name]['spec']['template']['spec']['containers'][0]['args'][0]
+                for name in self.k8s.created]
+
+    def _event_index(self, job: str, event_type: str, condition: t.Optional[str] = None) -> int:
+        for idx, (_, _event_type, obj) in enumerate(self.k8s.events):
+            conditions = [c['type'] for c in obj['status'].get('conditions', [])]
+            if obj['metadata']['name'] != job or _event_type != event_type:
+                continue
+            if condition is None or condition in conditions:
+                return idx
+        raise ValueError(f"Event not found (job={job}, type={event_type}, condition={condition}).")
+
+    def test_run_tasks(self) -> None:
+        KubernetesRun(self.mlcube, task=None).run_tasks(['download', 'train', 'lint'])
+
+        # Independent tasks are submitted immediately, `train` is submitted when `download` completes.
+        self.assertListEqual(self._tasks(), ['download', 'lint', 'train'])
+        download, _, train = self.k8s.created
+        self.assertGreater(self._event_index(train, 'ADDED'), self._event_index(download, 'MODIFIED', 'Complete'))
+        self.assertLess(self._event_index(self.k8s.created[1], 'ADDED'), self._event_index(download, 'MODIFIED'))
+
+    def test_run_tasks_failure(self) -> None:
+        self.k8s.failing.add('mlcube-mnist-00000')  # Name of the first job (download).
+        with self.assertRaises(ExecutionError) as ctx:
+            KubernetesRun(self.mlcube, task=None).run_tasks(['download', 'train', 'lint'])
+        self.assertEqual(ctx.exception.context['code'], 1)
+        self.assertListEqual(ctx.exception.context['failed'], ['download', 'train'])
+        self.assertListEqual(self._tasks(), ['download', 'lint'])  # `train` has been skipped.
+
+    def test_indexed_args(self) -> None:
+        self.assertListEqual(
+            KubernetesRun.get_indexed_args([['train', '--data=shards/0', '--lr=0.1'],
+                                            ['train', '--data=shards/1', '--lr=0.1']]),
+            ['train', '--data=shards/$(JOB_COMPLETION_INDEX)', '--lr=0.1']
+        )
+        self.assertListEqual(
+            KubernetesRun.get_indexed_args([[f'--data=shards/{idx:02d}/train'] for idx in range(3)]),
+            ['--data=shards/0$(JOB_COMPLETION_INDEX)/train']
+        )
+        self.assertIsNone(KubernetesRun.get_indexed_args([['--data=shards/1'], ['--data=shards/2']]))
+        self.assertIsNone(KubernetesRun.get_indexed_args([['--lr=0.1'], ['--lr=0.01']]))
+
+    def test_sweep_indexed_job(self) -> None:
+        self.mlcube.runner.parallelism = 2
+        jobs = [{'data_dir': f'shards/{idx}'} for idx in range(3)]
+        results = Sweep(self.mlcube, 'train', jobs, '/mlcubes/mnist/sweeps').run(KubernetesRun, num_workers=1)
+
+        self.assertEqual(len(self.k8s.created), 1)
+        spec = self.k8s.jobs[self.k8s.created[0]]['spec']
+        self.assertEqual(spec['completionMode'], 'Indexed')
+        self.assertEqual(spec['completions'], 3)
+        self.assertEqual(spec['parallelism'], 2)
+        self.assertIn('--data_dir=/mnt/mlcubemnist/shards/$(JOB_COMPLETION_INDEX)',
+                      spec['template']['spec']['containers'][0]['args'])
+        # Every index writes outputs to its own directory.
+        self.assertIn('--model_dir=/mnt/mlcubemnist/sweeps/train/$(JOB_COMPLETION_INDEX)/model',
+                      spec['template']['spec']['containers'][0]['args'])
+        self.assertListEqual([r.task for r in results], ['train_0', 'train_1', 'train_2'])
+        self.assertTrue(all(r.status == TaskStatus.SUCCEEDED for r in results))
+
+    def test_sweep_jobs(self) -> None:
+        jobs = [{'data_dir': name} for name in ('imagenet', 'coco')]
+        results = Sweep(self.mlcube, 'train', jobs, '/mlcubes/mnist/sweeps').run(KubernetesRun, num_workers=1)
+
+        self.assertEqual(len(self.k8s.created), 2)
+        self.assertTrue(all('completionMode' not in self.k8s.jobs[name]['spec'] for name in self.k8s.created))
+        # Jobs write outputs to different directories.
+        model_dirs = [
+            [arg for arg in self.k8s.jobs[name]['spec']['template']['spec']['containers'][0]['args']
+             if arg.startswith('--model_dir=')]
+            for name in self.k8s.created
+        ]
+        self.assertCountEqual(
+            model_dirs,
+            [[f'--model_dir=/mnt/mlcubemnist/sweeps/train/{idx}/model'] for idx in range(2)]
+        )
+        self.assertListEqual([r.status for r in results], [TaskStatus.SUCCEEDED] * 2)
@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_k8s=mlcube_k8s.main:cli
+        [mlcube.runners]
+        k8s=mlcube_k8s:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',
@@ -6,6 +6,7 @@ import kfp.dsl as dsl
 from datetime import datetime
 from omegaconf import (DictConfig, OmegaConf)
 from mlcube.errors import ExecutionError
+from mlcube.profiler import Profiler
 from mlcube.runner import (RunnerConfig, Runner)
 from mlcube.validate import Validate
 
@@ -86,9 +87,11 @@ class KubeflowRun(Runner):
                                   pipeline_package_path=self.mlcube.name + '.tar.gz', params={})
         return run
 
+    @Profiler.profile()
     def configure(self) -> None:
         ...
 
+    @Profiler.profile()
     def run(self) -> None:
         """Run a cube"""
         try:
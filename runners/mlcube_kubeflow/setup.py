@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_kubeflow=mlcube_kubeflow.main:cli
+        [mlcube.runners]
+        kubeflow=mlcube_kubeflow:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',
@@ -0,0 +1,214 @@
+"""Host-wide store of SIF images shared by MLCube workspaces.
+
+- `SIFStore`: Content-addressed SIF image store with reference counting and LRU garbage collection.
+
+By default, every workspace (`${runtime.workspace}/.image`) contains its own copy of a SIF image. When the store is
+enabled (`sif_store: ~/.mlcube/sif`), images are stored once per build source, and workspace images become links
+(hard links when possible, symbolic links otherwise) to images in the store. Store keys identify build sources:
+    - `docker://` images: image digest reported by the docker registry.
+    - `docker-archive:` files: content hash of the archive.
+    - Singularity recipes: content hash of the recipe file.
+Build arguments are part of keys since they may change images.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from mlcube.cache import Cache
+from mlcube.errors import ConfigurationError, MLCubeError
+from mlcube.lock import FileLock
+
+__all__ = ["SIFStore"]
+
+logger = logging.getLogger(__name__)
+
+
+class SIFStore(object):
+    """Content-addressed SIF image store.
+
+    Layout of the store directory: `images/${key}.sif` are SIF images and `index.json` contains image metadata (size,
+    last access time and list of links pointing to this image). An image is referenced while at least one of its links
+    exists and still points to this image. Unreferenced images are removed in least recently used order when the total
+    size of images exceeds the quota. The index and images are updated under a lock file in the store directory, so
+    that many MLCube processes can share the store.
+
+    Args:
+        root: Store directory.
+        quota: Maximal total size of images in bytes (integer or string with K/M/G/T suffix, e.g. `50G`). If None or
+            empty, the store is not limited.
+    """
+
+    def __init__(self, root: t.Union[str, Path], quota: t.Optional[t.Union[int, str]] = None) -> None:
+        self.root = Path(root).expanduser().resolve()
+        self.quota: t.Optional[int] = SIFStore.parse_size(quota)
+
+    @staticmethod
+    def parse_size(size: t.Optional[t.Union[int, str]]) -> t.Optional[int]:
+        """Parse size (`1073741824`, `1024M`, `1G`) into number of bytes, return None if size is None or empty."""
+        if size is None or size == "":
+            return None
+        if isinstance(size, int):
+            return size
+        value, multiplier = str(size).strip().upper().rstrip("B"), 1
+        for idx, suffix in enumerate("KMGT"):
+            if value.endswith(suffix):
+                value, multiplier = value[:-1], 1024 ** (idx + 1)
+                break
+        try:
+            return int(float(value) * multiplier)
+        except ValueError:
+            raise ConfigurationError(
+                f"Invalid SIF store quota ({size}). Expecting number of bytes, e.g., 1024M or 50G."
+            )
+
+    @staticmethod
+    def source_key(build_dir: str, recipe: str, build_args: str, docker_hub: t.Any = None) -> t.Optional[str]:
+        """Return key identifying a SIF image build source, or None if it can't be identified.
+
+        Args:
+            build_dir: Build directory (MLCube root directory).
+            recipe: Build source (`docker://` image, `docker-archive:` file or singularity recipe file).
+            build_args: Singularity build arguments.
+            docker_hub: Docker registry client (`DockerHubClient`) to resolve docker image digests.
+        """
+        try:
+            if recipe.startswith("docker://"):
+                if docker_hub is None:
+                    return None
+                identity = docker_hub.get_manifest(recipe)["config"]["digest"]
+            elif recipe.startswith("docker-archive:"):
+                identity = Cache.file_digest(Path(build_dir, recipe[15:]))
+            else:
+                identity = Cache.file_digest(Path(build_dir, recipe))
+        except (MLCubeError, OSError, KeyError) as err:
+            logger.warning("SIFStore.source_key can't identify build source (recipe=%s): %s", recipe, str(err))
+            return None
+        return Cache.digest(identity, build_args or "")
+
+    def image_path(self, key: str) -> Path:
+        """Return path to an image in this store."""
+        return self.root / "images" / f"{key}.sif"
+
+    def index_file(self) -> Path:
+        """Return path to the index file of this store."""
+        return self.root / "index.json"
+
+    def _load_index(self) -> t.Dict[str, t.Dict]:
+        try:
+            with open(self.index_file(), "rt") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index: t.Dict[str, t.Dict]) -> None:
+        Cache.write_json(self.index_file(), index)
+
+    def _lock(self) -> FileLock:
+        """Return cross-process lock that protects the index and images of this store."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return FileLock(self.root / "index.lock", poll_interval=0.05)
+
+    def link(self, key: str, target: t.Union[str, Path]) -> bool:
+        """Link an image from this store to the target path.
+
+        Args:
+            key: Image key (see `source_key`).
+            target: Path to a workspace image.
+        Returns:
+            True if image exists in this store and the target path has been created.
+        """
+        with self._lock():
+            return self._link(key, target)
+
+    def _link(self, key: str, target: t.Union[str, Path]) -> bool:
+        """Link an image to the target path (the caller must hold the store lock)."""
+        image, target = self.image_path(key), Path(target).absolute()
+        if not image.is_file():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.is_symlink():
+            target.unlink()  # Dangling link to an image that has been removed.
+        try:
+            os.link(image, target)
+        except OSError:
+            os.symlink(image, target)
+        index = self._load_index()
+        entry = index.setdefault(key, {"size": image.stat().st_size, "links": []})
+        if target.as_posix() not in entry["links"]:
+            entry["links"].append(target.as_posix())
+        entry["last_used"] = time.time()
+        self._save_index(index)
+        logger.info("SIFStore.link image=%s linked to %s.", image, target)
+        return True
+
+    def put(self, key: str, source: t.Union[str, Path]) -> None:
+        """Move a newly built image into this store, and replace it with a link.
+
+        Args:
+            key: Image key (see `source_key`).
+            source: Path to a newly built workspace image.
+        """
+        image, source = self.image_path(key), Path(source).absolute()
+        image.parent.mkdir(parents=True, exist_ok=True)
+        temp_image = image.with_name(f".{image.name}.{os.getpid()}.{threading.get_ident()}")
+        shutil.move(source.as_posix(), temp_image.as_posix())
+        # The new image must be linked before any process collects garbage, else it may be removed as unreferenced.
+        with self._lock():
+            os.replace(temp_image, image)
+            self._link(key, source)
+            self._gc()
+
+    def _is_referenced(self, key: str, entry: t.Dict) -> bool:
+        """Return true if an image has links, removing links that no longer point to this image."""
+        image = self.image_path(key)
+        links = []
+        for link in entry.get("links", []):
+            try:
+                if os.path.samefile(link, image):
+                    links.append(link)
+            except OSError:
+                ...
+        entry["links"] = links
+        return len(links) > 0
+
+    def gc(self) -> t.List[str]:
+        """Remove unreferenced images in least recently used order while the store exceeds its quota.
+
+        Returns:
+            Keys of removed images.
+        """
+        with self._lock():
+            return self._gc()
+
+    def _gc(self) -> t.List[str]:
+        """Remove unreferenced images (the caller must hold the store lock)."""
+        removed: t.List[str] = []
+        index = self._load_index()
+        index = {key: entry for key, entry in index.items() if self.image_path(key).is_file()}
+        total_size = sum(entry.get("size", 0) for entry in index.values())
+        unreferenced = sorted(
+            (key for key, entry in index.items() if not self._is_referenced(key, entry)),
+            key=lambda _key: index[_key].get("last_used", 0),
+        )
+        for key in unreferenced:
+            if self.quota is None or total_size <= self.quota:
+                break
+            total_size -= index[key].get("size", 0)
+            self.image_path(key).unlink()
+            del index[key]
+            removed.append(key)
+        self._save_index(index)
+        if removed:
+            logger.info("SIFStore.gc removed unreferenced images: %s.", removed)
+        if self.quota is not None and total_size > self.quota:
+            logger.warning(
+                "SIFStore.gc total size of images (%d bytes) exceeds quota (%d bytes), but all images are in use.",
+                total_size,
+                self.quota,
+            )
+        return removed
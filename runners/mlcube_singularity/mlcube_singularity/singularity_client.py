@@ -3,18 +3,25 @@ import json
 import logging
 import os
 import platform
+import shlex
+import shutil
+import threading
+import time
 import typing as t
 from enum import Enum
 from pathlib import Path
-from shlex import shlex
 
 import requests
 import semver
 
+from mlcube.cache import Cache
 from mlcube.errors import ExecutionError, MLCubeError
+from mlcube.lock import FileLock
 from mlcube.shell import Shell
 from mlcube.system_settings import SystemSettings
 
+from mlcube_singularity.sif_store import SIFStore
+
 __all__ = [
     "DockerImage",
     "Runtime",
@@ -73,18 +80,24 @@ class DockerImage:
         """
         if not self.host or self.host == "docker.io":
             return "docker.io"
-        host: str = self.host[8:] if self.host.startswith("https://") else self.host
+        host: str = self.host
+        for scheme in ("https://", "http://"):
+            if host.startswith(scheme):
+                host = host[len(scheme):]
+        if self.port:
+            host += f":{self.port}"
         return host
 
     def resolve_registry_url(self) -> str:
         """Return registry URL.
 
-        Return `https://registry-1.docker.io` for docker hub or https for canonical host name.
+        Return `https://registry-1.docker.io` for docker hub or https for canonical host name. Plain HTTP is used only
+        for hosts explicitly specified with `http://` scheme.
         """
         host: str = self.resolve_host()
-        return (
-            "https://registry-1.docker.io" if host == "docker.io" else f"https://{host}"
-        )
+        if host == "docker.io":
+            return "https://registry-1.docker.io"
+        return f"http://{host}" if (self.host or "").startswith("http://") else f"https://{host}"
 
     def resolve_auths_url(self) -> str:
         """Return possible key in `auths` section of docker's JSON config file."""
@@ -125,9 +138,7 @@ class DockerImage:
         host: t.Optional[str] = None
         port: t.Optional[int] = None
         if len(parts) > 1:
-            if parts[0] == "localhost":
-                host = parts[0]
-            elif "." in parts[0]:
+            if "." in parts[0] or parts[0].split(":")[0] == "localhost":
                 host_port: t.List[str] = parts[0].split(":")
                 host = host_port[0]
                 if len(host_port) > 1:
@@ -296,23 +307,74 @@ class Client:
             "Client.__init__ executable=%s, version=%s", self.singularity, self.version
         )
 
+    @staticmethod
+    def runtime_cache_file() -> Path:
+        """Return path to the on-disk cache of runtime probes (executables, versions and SIF header checks)."""
+        return Cache.path("singularity", "runtimes.json")
+
+    def executable_state(self) -> t.List[t.List]:
+        """Return paths and modification times of executables in the singularity command.
+
+        Used as a cache key for results of runtime probes. Results become invalid when executables are updated.
+
+        Returns:
+            List of [path, mtime_ns] pairs for each resolvable command token (e.g., `sudo` and `singularity`).
+        """
+        state: t.List[t.List] = []
+        for idx, token in enumerate(self.singularity):
+            path: t.Optional[str] = shutil.which(token)
+            if path is None:
+                if idx == 0:
+                    raise ExecutionError(
+                        f"Singularity client failed to initialize. Executable not found ({token}). MLCube cannot run "
+                        "singularity images unless this check passes.",
+                        function=f"{self.__class__}.executable_state",
+                        args={"singularity": self.singularity},
+                    )
+                continue
+            path = os.path.realpath(path)
+            state.append([path, os.stat(path).st_mtime_ns])
+        return state
+
+    def _load_runtime_cache(self) -> t.Dict:
+        cache = Cache.read_json(Client.runtime_cache_file())
+        return cache if isinstance(cache, dict) else {}
+
     def init(self, force: bool = False) -> None:
+        """Identify version of singularity runtime.
+
+        Results are cached (see `runtime_cache_file`) and are reused while executables do not change, so that
+        singularity is not executed when MLCube configuration is assembled.
+
+        Args:
+            force: If true, ignore current version and cached results, and run `singularity --version`.
+        """
         if force:
             self.version = None
         if self.version is None:
-            version_cmd = self.singularity + ["--version"]
-            exit_code, version_string = Shell.run_and_capture_output(version_cmd)
-            if exit_code != 0:
-                raise ExecutionError(
-                    f"Singularity client failed to initialize. The following command ({version_cmd}) returned non-zero"
-                    f"exit code ({exit_code}). MLCube cannot run singularity images unless this check passes.",
-                    function=f"{self.__class__}.init",
-                    args={
-                        "force": force,
-                        "singularity": self.singularity,
-                        "version_cmd": version_cmd,
-                    },
-                )
+            key, state = " ".join(self.singularity), self.executable_state()
+            cache = self._load_runtime_cache()
+            entry: t.Dict = cache.get("versions", {}).get(key, {})
+            if not force and entry.get("state", None) == state:
+                version_string = entry["version"]
+                logger.debug("Client.init using cached version (%s) of %s.", version_string, key)
+            else:
+                version_cmd = self.singularity + ["--version"]
+                exit_code, version_string = Shell.run_and_capture_output(version_cmd)
+                if exit_code != 0:
+                    raise ExecutionError(
+                        f"Singularity client failed to initialize. The following command ({version_cmd}) returned "
+                        f"non-zero exit code ({exit_code}). MLCube cannot run singularity images unless this check "
+                        "passes.",
+                        function=f"{self.__class__}.init",
+                        args={
+                            "force": force,
+                            "singularity": self.singularity,
+                            "version_cmd": version_cmd,
+                        },
+                    )
+                cache.setdefault("versions", {})[key] = {"state": state, "version": version_string}
+                Cache.write_json(Client.runtime_cache_file(), cache)
             self.version = Version.from_version_string(version_string)
             logger.debug("Client.init version=%s", self.version)
 
@@ -323,7 +385,19 @@ class Client:
         image_dir: str,
         image_name: str,
         build_args: str,
+        store: t.Optional["SIFStore"] = None,
     ) -> None:
+        """Build SIF image.
+
+        Args:
+            build_dir: Build directory (MLCube root directory).
+            recipe: Build source (`docker://` image, `docker-archive:` file or singularity recipe file).
+            image_dir: Directory where to store SIF image.
+            image_name: Name of SIF image.
+            build_args: Singularity build arguments.
+            store: Optional shared SIF image store. If image for this build source exists in the store, it is linked
+                to `image_dir` instead of being built. New images are moved into the store.
+        """
         # Get full path to a singularity image. By design, we compute it relative to {mlcube.root}/workspace.
         image_file = Path(image_dir, image_name)
         if image_file.exists():
@@ -333,12 +407,36 @@ class Client:
             )
             return
 
+        store_key: t.Optional[str] = None
+        if store is not None:
+            store_key = SIFStore.source_key(build_dir, recipe, build_args, DockerHubClient(self))
+
+        # Only one MLCube process builds this image at a time, others wait and reuse the result.
+        lock = FileLock.for_key("singularity", store_key or image_file.resolve().as_posix())
+        with lock:
+            if lock.waited and image_file.exists():
+                logger.info("Client.build won't build SIF image (built by another process: %s).", image_file)
+                return
+            if store_key is not None and store.link(store_key, image_file):
+                logger.info(
+                    "Client.build won't build SIF image (found in SIF store: key=%s, store=%s).",
+                    store_key,
+                    store.root,
+                )
+                return
+            self._build(Path(build_dir), recipe, image_file, build_args)
+            if store_key is not None:
+                store.put(store_key, image_file)
+
+    def _build(self, build_dir: Path, recipe: str, image_file: Path, build_args: str) -> None:
+        """Build SIF image.
+
+        The image is built into a temporary file first, so that other processes never see partially built images.
+        """
         # Make sure a directory to store image exists. If paths are like "/opt/...", the call may fail.
         image_file.parent.mkdir(parents=True, exist_ok=True)
 
-        build_dir = Path(
-            build_dir
-        )  # Let's assume that build context is the root MLCube directory
+        # Let's assume that build context is the root MLCube directory
         if recipe.startswith("docker://") or recipe.startswith("docker-archive:"):
             # https://sylabs.io/guides/3.0/user-guide/build_a_container.html
             # URI beginning with docker:// to build from Docker Hub
@@ -357,18 +455,23 @@ class Client:
                 build_dir,
                 recipe,
             )
+        temp_file = image_file.with_name(f".{image_file.name}.{os.getpid()}.tmp")
         try:
             Shell.run(
                 ["cd", str(build_dir), ";"]
                 + self.singularity
-                + ["build", build_args, str(image_file), recipe]
+                + ["build", build_args, str(temp_file), recipe]
             )
+            os.replace(temp_file, image_file)
         except ExecutionError as err:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
                 "Error occurred while building SIF image. See context for more details.",
                 **err.context,
             )
+        finally:
+            if temp_file.exists():
+                temp_file.unlink()
 
     def run(
         self,
@@ -379,23 +482,14 @@ class Client:
         entrypoint: t.Optional[str] = None,
     ) -> None:
         try:
+            # Arguments are passed to singularity as is (no shell), so task parameters may contain whitespaces and
+            # shell special characters.
             if entrypoint:
-                Shell.run(
-                    self.singularity
-                    + [
-                        "exec",
-                        run_args,
-                        volumes,
-                        image_file,
-                        entrypoint,
-                        " ".join(args),
-                    ]
-                )
+                cmd = self.singularity + ["exec"] + shlex.split(f"{run_args} {volumes}") + [image_file]
+                cmd += shlex.split(entrypoint) + args
             else:
-                Shell.run(
-                    self.singularity
-                    + ["run", run_args, volumes, image_file, " ".join(args)]
-                )
+                cmd = self.singularity + ["run"] + shlex.split(f"{run_args} {volumes}") + [image_file] + args
+            Shell.run(cmd, shell=False)
         except ExecutionError as err:
             raise ExecutionError.mlcube_run_error(
                 self.__class__.__name__,
@@ -403,6 +497,31 @@ class Client:
                 **err.context,
             )
 
+    def start_instance(self, run_args: str, volumes: str, image_file: str, name: str) -> None:
+        """Start singularity instance (`singularity instance start`).
+
+        Args:
+            run_args: Container run arguments (namespace, network and GPU options apply to the whole instance).
+            volumes: Bind mounts (`--bind HOST:CONTAINER ...`).
+            image_file: Path to SIF image.
+            name: Instance name. Tasks run in this instance using `instance://${name}` URI.
+        """
+        try:
+            Shell.run(
+                self.singularity + ["instance", "start"] + shlex.split(f"{run_args} {volumes}") + [image_file, name],
+                shell=False,
+            )
+        except ExecutionError as err:
+            raise ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                f"Error occurred while starting singularity instance ({name}). See context for more details.",
+                **err.context,
+            )
+
+    def stop_instance(self, name: str) -> None:
+        """Stop singularity instance ignoring errors (e.g., instance does not exist)."""
+        Shell.run(self.singularity + ["instance", "stop", name], on_error="ignore", shell=False)
+
     def image_spec(self, uri: str) -> ImageSpec:
         if uri.startswith("docker://"):
             return ImageSpec.DOCKER
@@ -416,54 +535,112 @@ class Client:
             )
             return ImageSpec.OTHER
 
-        exit_code, _ = Shell.run_and_capture_output(
-            self.singularity + ["sif", "header", uri]
-        )
-        if exit_code == 0:
-            return ImageSpec.SINGULARITY
+        # Results of `sif header` are cached while the file and singularity executables do not change.
+        path, stat = os.path.realpath(uri), os.stat(uri)
+        state = [stat.st_size, stat.st_mtime_ns, stat.st_ino, " ".join(self.singularity), self.executable_state()]
+        cache = self._load_runtime_cache()
+        entry: t.Dict = cache.get("sif_headers", {}).get(path, {})
+        if entry.get("state", None) == state:
+            is_sif: bool = entry["is_sif"]
+        else:
+            exit_code, _ = Shell.run_and_capture_output(
+                self.singularity + ["sif", "header", uri]
+            )
+            is_sif = exit_code == 0
+            sif_headers: t.Dict = {
+                _path: _entry for _path, _entry in cache.get("sif_headers", {}).items() if os.path.exists(_path)
+            }
+            sif_headers[path] = {"state": state, "is_sif": is_sif}
+            cache["sif_headers"] = sif_headers
+            Cache.write_json(Client.runtime_cache_file(), cache)
+        return ImageSpec.SINGULARITY if is_sif else ImageSpec.OTHER
 
 
 class DockerHubClient:
-    """Ad-hoc implementation for interacting with remote docker registries."""
+    """Client for remote docker registries with connection pooling and caching.
+
+    All instances share one HTTP session (keep-alive connections are reused across requests), a cache of bearer tokens
+    (tokens are reused until they expire, see `expires_in` in token responses) and a cache of image manifests. Manifests
+    requested by digest never change and are cached forever. Manifests requested by tag are cached for `MANIFEST_TTL`
+    seconds, and then are revalidated with the registry using `ETag` / `If-None-Match` headers. Manifests are also
+    stored in MLCube cache directory, so that they can be reused by other MLCube processes.
+    """
+
+    MANIFEST_TTL: float = 300.0
+    """Number of seconds manifests requested by tag are used without revalidation."""
+
+    _lock = threading.Lock()
+    _session: t.Optional[requests.Session] = None
+    _tokens: t.Dict[str, t.Tuple[str, float]] = {}
+    _manifests: t.Optional[t.Dict[str, t.Dict]] = None
+
+    def __init__(self, singularity_: t.Optional[Client] = None) -> None:
+        ...
+
+    @staticmethod
+    def session() -> requests.Session:
+        """Return HTTP session shared by all registry clients."""
+        with DockerHubClient._lock:
+            if DockerHubClient._session is None:
+                DockerHubClient._session = requests.Session()
+            return DockerHubClient._session
+
+    @staticmethod
+    def cache_file() -> Path:
+        """Return path to the on-disk manifest cache."""
+        return Cache.path("singularity", "manifests.json")
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Remove cached tokens and manifests, and close HTTP session."""
+        with DockerHubClient._lock:
+            if DockerHubClient._session is not None:
+                DockerHubClient._session.close()
+            DockerHubClient._session, DockerHubClient._manifests = None, None
+            DockerHubClient._tokens.clear()
+
+    def _get_cached_manifest(self, url: str) -> t.Optional[t.Dict]:
+        with DockerHubClient._lock:
+            if DockerHubClient._manifests is None:
+                cached = Cache.read_json(DockerHubClient.cache_file())
+                DockerHubClient._manifests = cached if isinstance(cached, dict) else {}
+            return DockerHubClient._manifests.get(url, None)
+
+    def _set_cached_manifest(self, url: str, entry: t.Dict) -> None:
+        with DockerHubClient._lock:
+            DockerHubClient._manifests[url] = entry
+            Cache.write_json(DockerHubClient.cache_file(), DockerHubClient._manifests)
+
+    def _get(self, url: str, headers: t.Dict, token_key: str, auth_key: str) -> requests.Response:
+        """Send GET request authenticating with (cached) bearer token if registry requests authentication.
 
-    def __init__(self, singularity_: Client) -> None:
+        Args:
+            url: Request URL.
+            headers: Request headers.
+            token_key: Token cache key (registry URL and repository name, tokens are issued per repository).
+            auth_key: Docker registry key in `auths` dictionary (see `DockerImage.resolve_auths_url`).
         """
-        self.token: t.Optional[str] = None
+        session = DockerHubClient.session()
+        with DockerHubClient._lock:
+            token, expires_at = DockerHubClient._tokens.get(token_key, (None, 0.0))
+        if token and expires_at > time.time():
+            headers = dict(headers, Authorization=f"Bearer {token}")
 
-        if singularity.version.runtime == Runtime.APPTAINER:
-            config_paths = [
-                Path("~/.apptainer/docker-config.json").expanduser(),
-                Path("~/.singularity/docker-config.json").expanduser(),
-            ]
-        else:
-            config_paths = [
-                Path("~/.singularity/docker-config.json").expanduser(),
-                Path("~/.apptainer/docker-config.json").expanduser(),
-            ]
-        config_paths.append(Path("~/.docker/config.json").expanduser())
-
-        for config_path in config_paths:
-            if not config_path.is_file():
-                logger.debug("DockerHubClient.__init__ no such file: %s", config_path.as_posix())
-                continue
-            with open(config_path, 'rt') as file:
-                config = json.load(file)
-            if not isinstance(config, dict) or \
-                    "auths" not in config or \
-                    "https://index.docker.io/v1/" not in config["auths"] or \
-                    "auth" not in config["auths"]["https://index.docker.io/v1/"]:
-                logger.debug("DockerHubClient.__init__: no docker.io credentials in %s", config_path.as_posix())
-                continue
-            self.token = config["auths"]["https://index.docker.io/v1/"]["auth"]
-            logger.debug("DockerHubClient.__init__: found auth credentials in %s.", config_path.as_posix())
-            break
-        if not self.token:
-            logger.warning(
-                "DockerHubClient.__init__: could not credentials to authenticate in docker registry in %s",
-                [name.as_posix() for name in config_paths]
+        response = session.get(url, headers=headers)
+        if response.status_code == 401:
+            logger.debug(
+                "DockerHubClient._get authentication requested (content=%s, headers=%s",
+                response.text.replace("\n", " "),
+                response.headers,
             )
-        """
-        pass
+            token, expires_in = _get_authentication_token(
+                response.headers.get("www-authenticate", None), auth_key, session
+            )
+            with DockerHubClient._lock:
+                # Renew tokens a bit earlier to account for the request latency.
+                DockerHubClient._tokens[token_key] = (token, time.time() + max(expires_in - 5, 0))
+            response = session.get(url, headers=dict(headers, Authorization=f"Bearer {token}"))
+        return response
 
     def get_manifest(self, image: t.Union[str, DockerImage]) -> t.Dict:
         """Return image manifest pulled from a remote docker registry.
@@ -500,34 +677,45 @@ class DockerHubClient:
         reference: str = (image.digest or image.tag) or "latest"
 
         url = f"{registry_url}/v2/{name}/manifests/{reference}"
-        headers = {
-            "Accept": "application/vnd.docker.distribution.manifest.v2+json,"  # single-arch image
-            "application/vnd.oci.image.index.v1+json,"  # multi-arch image
-            "application/vnd.oci.image.manifest.v1+json"  # single-arch image
-        }
-        response = requests.get(url, headers=headers)
-        if response.status_code == 401:
-            logger.debug(
-                "DockerHubClient.get_manifest authentication requested (content=%s, headers=%s",
-                response.text.replace("\n", " "),
-                response.headers,
-            )
-            token = _get_authentication_token(
-                response.headers.get("www-authenticate", None), auth_key
-            )
-            headers["Authorization"] = f"Bearer {token}"
-            response = requests.get(url, headers=headers)
-
-        if response.status_code != 200:
-            raise MLCubeError(
-                "DockerHubClient.get_manifest failed to retrieve image manifest "
-                "(status_code=%d, content=%s, headers=%s)",
-                response.status_code,
-                response.text.replace("\n", " "),
-                response.headers,
+        cached: t.Optional[t.Dict] = self._get_cached_manifest(url)
+        is_fresh = cached is not None and cached.get("updated_at", 0) + DockerHubClient.MANIFEST_TTL > time.time()
+        if cached is not None and (image.digest or is_fresh):
+            logger.debug("DockerHubClient.get_manifest using cached manifest for %s.", url)
+            response = cached["manifest"]
+        else:
+            headers = {
+                "Accept": "application/vnd.docker.distribution.manifest.v2+json,"  # single-arch image
+                "application/vnd.oci.image.index.v1+json,"  # multi-arch image
+                "application/vnd.oci.image.manifest.v1+json"  # single-arch image
+            }
+            if cached is not None and cached.get("etag", None):
+                headers["If-None-Match"] = cached["etag"]
+            response = self._get(url, headers, f"{registry_url}/{name}", auth_key)
+
+            if response.status_code == 304 and cached is not None:
+                logger.debug("DockerHubClient.get_manifest cached manifest is still valid (%s).", url)
+                manifest = cached["manifest"]
+            elif response.status_code == 200:
+                manifest = response.json()
+            else:
+                raise MLCubeError(
+                    "DockerHubClient.get_manifest failed to retrieve image manifest "
+                    "(status_code=%d, content=%s, headers=%s)",
+                    response.status_code,
+                    response.text.replace("\n", " "),
+                    response.headers,
+                )
+            etag = response.headers.get("ETag", None) or response.headers.get("Docker-Content-Digest", None)
+            self._set_cached_manifest(
+                url,
+                {
+                    "manifest": manifest,
+                    "etag": etag or (cached or {}).get("etag", None),
+                    "updated_at": time.time(),
+                },
             )
+            response = manifest
 
-        response = response.json()
         media_type = response.get("mediaType", None)
         if media_type in (
             "application/vnd.docker.distribution.manifest.v2+json",
@@ -555,16 +743,20 @@ class DockerHubClient:
         return response
 
 
-def _get_authentication_token(www_authenticate: t.Optional[str], auth_key: str) -> str:
+def _get_authentication_token(
+    www_authenticate: t.Optional[str], auth_key: str, session: t.Optional[requests.Session] = None
+) -> t.Tuple[str, int]:
     """Retrieve bearer authentication token.
 
     Args:
         www_authenticate: A string that contains endpoint details where token must be requested. Must start with
             `Bearer`: `Bearer realm="https://nvcr.io/proxy_auth",scope="repository:nvidia/pytorch:pull,push"`.
         auth_key: Docker registry key in `auths` dictionary (for instance, in ~/.docker/config.json).
+        session: HTTP session to use. If None, a new connection is used.
 
     Returns:
-        Authentication token that can be used with docker registry API.
+        Authentication token that can be used with docker registry API, and number of seconds this token is valid
+        for (60 seconds when the token server does not report it).
     """
     if not (www_authenticate and www_authenticate.startswith("Bearer")):
         raise MLCubeError(
@@ -584,11 +776,8 @@ def _get_authentication_token(www_authenticate: t.Optional[str], auth_key: str)
             f"_get_authentication_token unrecognized www_authenticate format (www_authenticate={www_authenticate}, "
             f"parsed={parsed})."
         )
-    loggable_url: str = url
-
-    if url.startswith("https://"):
-        url = url[8:]
 
+    auth: t.Optional[t.Tuple[str, str]] = None
     if os.environ.get("SINGULARITY_DOCKER_USERNAME", None) and os.environ.get(
         "SINGULARITY_DOCKER_PASSWORD", None
     ):
@@ -596,32 +785,30 @@ def _get_authentication_token(www_authenticate: t.Optional[str], auth_key: str)
             "_get_authentication_token found docker username (SINGULARITY_DOCKER_USERNAME) and "
             "password (SINGULARITY_DOCKER_PASSWORD) environment variables."
         )
-        loggable_url = f"https://***:***@{url}"
-        username, password = (
+        auth = (
             os.environ["SINGULARITY_DOCKER_USERNAME"],
             os.environ["SINGULARITY_DOCKER_PASSWORD"],
         )
-        url = f"{username}:{password}@{url}"
     else:
         auth_token: t.Optional[str] = _get_auth_token(auth_key)
         if auth_token:
             logger.info("_get_authentication_token using auth token from config file.")
-            loggable_url = f"https://***:***@{url}"
-            url = base64.b64decode(auth_token).decode() + "@" + url
+            username, password = base64.b64decode(auth_token).decode().split(":", 1)
+            auth = (username, password)
 
-    url = f"https://{url}"
     logger.debug(
-        "_get_authentication_token requesting token at %s for %s.", loggable_url, parsed
+        "_get_authentication_token requesting token at %s (credentials=%r) for %s.", url, auth is not None, parsed
     )
 
-    response = requests.get(url, params=parsed)
+    response = (session or requests).get(url, params=parsed, auth=auth)
     if response.status_code != 200:
         raise MLCubeError(
-            f"_get_authentication_token could not retrieve authentication token (url={loggable_url}, params={parsed}, "
-            f"status_code={response.status_code}, content={response.json()}, headers={response.headers})"
+            f"_get_authentication_token could not retrieve authentication token (url={url}, params={parsed}, "
+            f"status_code={response.status_code}, content={response.text}, headers={response.headers})"
         )
-    token = response.json()["token"]
-    return token
+    content: t.Dict = response.json()
+    token = content.get("token", None) or content["access_token"]
+    return token, int(content.get("expires_in", 60))
 
 
 def _select_manifest(
@@ -743,7 +930,7 @@ def parse_key_value_string(kv_str: str) -> t.Dict:
     Returns:
         Dictionary with parsed KV pairs.
     """
-    lexer = shlex(kv_str, posix=True)
+    lexer = shlex.shlex(kv_str, posix=True)
     lexer.whitespace = ","
     lexer.wordchars += "="
     return dict(word.split(sep="=", maxsplit=1) for word in lexer)
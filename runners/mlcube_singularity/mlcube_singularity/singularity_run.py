@@ -1,16 +1,23 @@
+import atexit
 import logging
+import os
+import signal
+import threading
 import typing as t
 from pathlib import Path
 
+from mlcube_singularity.sif_store import SIFStore
 from mlcube_singularity.singularity_client import Client, DockerHubClient
 from omegaconf import DictConfig, OmegaConf
 
+from mlcube.cache import Cache
 from mlcube.errors import ConfigurationError, ExecutionError, MLCubeError
+from mlcube.profiler import Profiler
 from mlcube.runner import Runner, RunnerConfig
 from mlcube.shell import Shell
 from mlcube.validate import Validate
 
-__all__ = ["Config", "SingularityRun"]
+__all__ = ["Config", "InstancePool", "SingularityRun"]
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +36,9 @@ class Config(RunnerConfig):
             # Sergey: there seems to be a better name for this parameter. Originally, the only source was a singularity
             # recipe (build file). Later, MLCube started to support other sources, such as docker images.
             "build_file": "Singularity.recipe",  # Source for the image build process.
+            "reuse_instance": False,  # Run tasks in one singularity instance per (image, run args, binds).
+            "sif_store": None,  # Shared host-wide SIF image store (e.g., ~/.mlcube/sif), disabled if None or empty.
+            "sif_store_quota": None,  # Max size of SIF store (e.g. 50G), unused images are removed first.
             "--network": None,  # Networking options defined during MLCube container execution.
             "--security": None,  # Security options defined during MLCube container execution.
             "--nv": None,  # usage options defined during MLCube container execution.
@@ -180,6 +190,93 @@ class Config(RunnerConfig):
         )
 
 
+class InstancePool(object):
+    """Singularity instances that run MLCube tasks (`reuse_instance: true`).
+
+    One instance is started (`singularity instance start`) per unique combination of singularity executable, image,
+    run arguments and bind mounts. Tasks are executed in it with `singularity run|exec instance://${name}`, so that
+    image mount and namespace setup costs are paid once. All instances started by the current MLCube process are stopped
+    when this process exits, and when it is terminated with SIGTERM unless the application has its own SIGTERM handler.
+    """
+
+    _lock = threading.Lock()
+    _instances: t.Dict[t.Tuple[str, ...], t.Tuple[Client, str]] = {}
+    """Mapping from instance key to singularity client and instance name."""
+
+    _sigterm_handler: t.Optional[t.Callable[[int, t.Any], None]] = None
+    """SIGTERM handler installed by this class (see `_install_signal_handler`)."""
+
+    @staticmethod
+    def get_instance(client: Client, image_file: str, run_args: str, volumes: str) -> str:
+        """Return name of a running instance for these parameters starting a new one if needed.
+
+        Args:
+            client: Singularity client.
+            image_file: Path to SIF image.
+            run_args: Container run arguments.
+            volumes: Bind mounts (`--bind HOST:CONTAINER ...`).
+        Returns:
+            Instance name.
+        """
+        key = (" ".join(client.singularity), image_file, run_args.strip(), volumes.strip())
+        with InstancePool._lock:
+            if key in InstancePool._instances:
+                name = InstancePool._instances[key][1]
+                logger.debug("InstancePool.get_instance reusing instance (name=%s, image=%s).", name, image_file)
+                return name
+
+            name = f"mlcube_{os.getpid()}_{len(InstancePool._instances)}"
+            client.start_instance(run_args, volumes, image_file, name)
+            if not InstancePool._instances:
+                atexit.register(InstancePool.shutdown)
+                InstancePool._install_signal_handler()
+            InstancePool._instances[key] = (client, name)
+            logger.info("InstancePool.get_instance started instance (name=%s, image=%s).", name, image_file)
+            return name
+
+    @staticmethod
+    def _install_signal_handler() -> None:
+        """Stop instances on SIGTERM (default SIGTERM handler terminates the process without running `atexit` handlers).
+
+        The handler is installed only when SIGTERM has its default disposition, so handlers installed by applications
+        that embed MLCube are never replaced. It stops instances, restores the default handler and re-raises the signal,
+        so that the process terminates the same way it would without this handler. It is removed when instances are
+        stopped.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if signal.getsignal(signal.SIGTERM) is not signal.SIG_DFL:
+            return
+
+        def _on_sigterm(signum: int, _frame: t.Any) -> None:
+            InstancePool.shutdown()
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+        InstancePool._sigterm_handler = _on_sigterm
+        signal.signal(signal.SIGTERM, _on_sigterm)
+
+    @staticmethod
+    def _uninstall_signal_handler() -> None:
+        """Restore default SIGTERM handler if it was installed by this class and has not been replaced since then."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        handler, InstancePool._sigterm_handler = InstancePool._sigterm_handler, None
+        if handler is not None and signal.getsignal(signal.SIGTERM) is handler:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    @staticmethod
+    def shutdown() -> None:
+        """Stop all instances started by this process."""
+        with InstancePool._lock:
+            instances = list(InstancePool._instances.values())
+            InstancePool._instances.clear()
+        for client, name in instances:
+            logger.info("InstancePool.shutdown stopping instance (name=%s).", name)
+            client.stop_instance(name)
+        InstancePool._uninstall_signal_handler()
+
+
 class SingularityRun(Runner):
     CONFIG = Config
 
@@ -215,6 +312,7 @@ class SingularityRun(Runner):
                 self.client.version,
             )
 
+    @Profiler.profile()
     def configure(self) -> None:
         """Build Singularity Image on a current host."""
         s_cfg: DictConfig = self.mlcube.runner
@@ -224,8 +322,10 @@ class SingularityRun(Runner):
             image_dir=s_cfg.image_dir,
             image_name=s_cfg.image,
             build_args=s_cfg.build_args or "",
+            store=SIFStore(s_cfg.sif_store, s_cfg.get("sif_store_quota", None)) if s_cfg.get("sif_store") else None,
         )
 
+    @Profiler.profile()
     def run(self) -> None:
         """ """
         image_file = Path(self.mlcube.runner.image_dir) / self.mlcube.runner.image
@@ -280,6 +380,10 @@ class SingularityRun(Runner):
             )
             # By contract, custom entry points do not accept task name as the first argument.
             task_args = task_args[1:]
+        if self.mlcube.runner.get("reuse_instance", False):
+            instance = InstancePool.get_instance(self.client, str(image_file), run_args, volumes)
+            self.client.run("", "", f"instance://{instance}", task_args, entrypoint)
+            return
         self.client.run(run_args, volumes, str(image_file), task_args, entrypoint)
 
     def inspect(self, force: bool = False) -> t.Dict:
@@ -287,17 +391,14 @@ class SingularityRun(Runner):
         image_file = Path(s_cfg.image_dir, s_cfg.image)
 
         def _local_file_sha256sum(file_path: Path) -> str:
-            """Compute sha256 hash sum of the local file."""
-            _exit_code, _output = Shell.run_and_capture_output(
-                ["sha256sum", file_path.as_posix()]
-            )
-            if _exit_code != 0:
-                _output = _output.replace("\n", " ")
+            """Compute sha256 hash sum of the local file (cached while the file does not change)."""
+            try:
+                return Cache.cached_file_digest(file_path)
+            except OSError as err:
                 raise MLCubeError(
                     f"SingularityRun.inspect failed to compute sha256 sum of the local file. File={file_path}, "
-                    f"sha256sum_exitcode={_exit_code}, sha256sum_output={_output}"
+                    f"error={err}"
                 )
-            return _output.split(" ")[0].strip()
 
         if not s_cfg.build_file:
             # The build specs do not exist. This probably means that the SIF file must exist.
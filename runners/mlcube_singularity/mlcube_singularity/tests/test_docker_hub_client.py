@@ -0,0 +1,129 @@
+import json
+import os
+import platform
+import tempfile
+import threading
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import patch
+
+from mlcube_singularity.singularity_client import DockerHubClient, DockerImage
+
+_MANIFEST = {
+    "mediaType": "application/vnd.oci.image.manifest.v1+json",
+    "config": {"digest": "sha256:0123abcd"},
+}
+_INDEX = {
+    "mediaType": "application/vnd.oci.image.index.v1+json",
+    "manifests": [
+        {"digest": "sha256:4567cdef", "platform": {"os": "linux", "architecture": "amd64"}},
+        {"digest": "sha256:89abcdef", "platform": {"os": "linux", "architecture": "arm64"}},
+    ],
+}
+
+
+class _Registry(BaseHTTPRequestHandler):
+    """Minimal docker registry with bearer token authentication."""
+
+    protocol_version = "HTTP/1.1"
+    requests: t.List[t.Tuple[str, t.Dict]] = []
+    clients: t.Set[int] = set()
+
+    def log_message(self, *args) -> None:
+        ...
+
+    def _send(self, status: int, body: t.Optional[t.Dict] = None, **headers) -> None:
+        content = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self) -> None:
+        _Registry.requests.append((self.path, dict(self.headers)))
+        _Registry.clients.add(self.client_address[1])
+        if self.path.startswith("/token"):
+            return self._send(200, {"token": "secret", "expires_in": 300})
+        if self.headers.get("Authorization", None) != "Bearer secret":
+            realm = f"http://{self.headers['Host']}/token"
+            return self._send(401, {}, **{"WWW-Authenticate": f'Bearer realm="{realm}",service="registry"'})
+
+        reference = self.path.split("/")[-1]
+        manifest = _INDEX if reference == "multiarch" else _MANIFEST
+        etag = f'"{reference}"'
+        if self.headers.get("If-None-Match", None) == etag:
+            return self._send(304, ETag=etag)
+        self._send(200, manifest, ETag=etag)
+
+
+class TestDockerHubClient(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": self.temp_dir.name})
+        self.env.start()
+        DockerHubClient.clear_cache()
+
+        _Registry.requests, _Registry.clients = [], set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Registry)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        # Local registry stand-in does not use TLS, so images refer to it with explicit `http://` scheme.
+        self.port = self.server.server_address[1]
+
+    def tearDown(self) -> None:
+        DockerHubClient.clear_cache()
+        self.server.shutdown()
+        self.server.server_close()
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def _image(self, tag: str) -> DockerImage:
+        return DockerImage(host="http://127.0.0.1", port=self.port, path="mlcommons/mnist", tag=tag)
+
+    def _manifest_requests(self) -> t.List[t.Tuple[str, t.Dict]]:
+        return [request for request in _Registry.requests if "/manifests/" in request[0]]
+
+    def test_resolve_registry_url(self) -> None:
+        image = DockerImage.from_string("localhost:5000/mlcommons/mnist:0.0.1")
+        self.assertEqual((image.host, image.port), ("localhost", 5000))
+        self.assertEqual(image.resolve_host(), "localhost:5000")
+        self.assertEqual(image.resolve_registry_url(), "https://localhost:5000")
+        self.assertEqual(DockerImage.from_string("nvcr.io/nvidia/pytorch").resolve_registry_url(), "https://nvcr.io")
+        image = DockerImage(host="http://registry.local", path="mnist")
+        self.assertEqual(image.resolve_host(), "registry.local")
+        self.assertEqual(image.resolve_registry_url(), "http://registry.local")
+
+    def test_get_manifest(self) -> None:
+        client = DockerHubClient()
+        for tag in ("0.0.1", "0.0.2", "0.0.1"):
+            manifest = client.get_manifest(self._image(tag))
+            self.assertEqual(manifest["config"]["digest"], "sha256:0123abcd")
+
+        # One token request, and cached manifests are not requested again.
+        self.assertEqual(len([request for request in _Registry.requests if request[0].startswith("/token")]), 1)
+        self.assertEqual(len(self._manifest_requests()), 3)  # 401 + 200 (0.0.1), 200 (0.0.2).
+        self.assertEqual(len(_Registry.clients), 1)
+
+    def test_revalidation(self) -> None:
+        client = DockerHubClient()
+        client.get_manifest(self._image("0.0.1"))
+        with patch.object(DockerHubClient, "MANIFEST_TTL", 0):
+            # Manifests are revalidated with registry after TTL expires.
+            DockerHubClient._manifests = None  # New MLCube process, manifests are loaded from disk.
+            manifest = client.get_manifest(self._image("0.0.1"))
+        self.assertEqual(manifest["config"]["digest"], "sha256:0123abcd")
+        self.assertEqual(self._manifest_requests()[-1][1]["If-None-Match"], '"0.0.1"')
+
+    @patch("platform.uname")
+    def test_multi_arch_image(self, uname: t.Any) -> None:
+        uname.return_value = platform.uname_result("Linux", "node", "6.0", "#1", "x86_64")
+        client = DockerHubClient()
+        for _ in range(2):
+            manifest = client.get_manifest(self._image("multiarch"))
+            self.assertEqual(manifest["config"]["digest"], "sha256:0123abcd")
+        self.assertListEqual(
+            [request[0] for request in self._manifest_requests()],
+            ["/v2/mlcommons/mnist/manifests/multiarch"] * 2 + ["/v2/mlcommons/mnist/manifests/sha256:4567cdef"],
+        )
@@ -0,0 +1,107 @@
+import os
+import signal
+import tempfile
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import semver
+from mlcube_singularity.singularity_client import Client, Runtime, Version
+from mlcube_singularity.singularity_run import Config, InstancePool, SingularityRun
+from omegaconf import DictConfig, OmegaConf
+
+from mlcube.shell import Shell
+
+
+def _init(client: Client, force: bool = False) -> None:
+    client.version = Version(Runtime.SINGULARITY, semver.VersionInfo(3, 10, 0))
+
+
+class TestInstancePool(TestCase):
+    def setUp(self) -> None:
+        InstancePool._instances.clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        (root / "ubuntu.sif").touch()
+        self.mlcube: DictConfig = OmegaConf.create({
+            "runtime": {"root": root.as_posix(), "workspace": root.as_posix()},
+            "runner": OmegaConf.merge(
+                Config.DEFAULT, {"image": "ubuntu.sif", "image_dir": root.as_posix(), "reuse_instance": True}
+            ),
+            "tasks": {
+                "ls": {"parameters": {"inputs": {}, "outputs": {}}},
+                "free": {"entrypoint": "/usr/bin/free -h", "parameters": {"inputs": {}, "outputs": {}}},
+            },
+        })
+        self.image_file = (root / "ubuntu.sif").as_posix()
+
+    def tearDown(self) -> None:
+        InstancePool._instances.clear()
+        self.temp_dir.cleanup()
+
+    @patch.object(Client, "init", _init)
+    @patch.object(Shell, "sync_workspace")
+    @patch.object(Shell, "run", return_value=0)
+    def test_reuse_instance(self, run: t.Any, *_: t.Any) -> None:
+        with patch("atexit.register") as atexit_register, patch("signal.signal"):
+            SingularityRun(self.mlcube, task="ls").run()
+            SingularityRun(self.mlcube, task="free").run()
+        atexit_register.assert_called_once_with(InstancePool.shutdown)
+
+        cmds = [" ".join(c.args[0]) for c in run.call_args_list]
+        self.assertTrue(all(c.kwargs["shell"] is False for c in run.call_args_list))
+        name = cmds[0].split(" ")[-1]
+        self.assertListEqual(
+            cmds,
+            [
+                f"singularity instance start {self.image_file} {name}",
+                f"singularity run instance://{name} ls",
+                f"singularity exec instance://{name} /usr/bin/free -h",
+            ],
+        )
+
+        InstancePool.shutdown()
+        self.assertEqual(run.call_args.args[0], ["singularity", "instance", "stop", name])
+        self.assertDictEqual(InstancePool._instances, {})
+
+    @patch.object(Client, "init", _init)
+    @patch.object(Shell, "sync_workspace")
+    @patch.object(Shell, "run", return_value=0)
+    def test_sigterm_handler(self, run: t.Any, *_: t.Any) -> None:
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.getsignal(signal.SIGTERM))
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        with patch("atexit.register"):
+            SingularityRun(self.mlcube, task="ls").run()
+        handler = signal.getsignal(signal.SIGTERM)
+        self.assertTrue(callable(handler))
+
+        # Handler stops instances, restores default handler and re-raises the signal.
+        with patch("os.kill") as kill:
+            handler(signal.SIGTERM, None)
+        kill.assert_called_once_with(os.getpid(), signal.SIGTERM)
+        self.assertEqual(run.call_args.args[0][1:3], ["instance", "stop"])
+        self.assertIs(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+        self.assertDictEqual(InstancePool._instances, {})
+
+        # Default handler is restored when instances are stopped.
+        with patch("atexit.register"):
+            SingularityRun(self.mlcube, task="ls").run()
+        self.assertIsNot(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+        InstancePool.shutdown()
+        self.assertIs(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+
+    @patch.object(Client, "init", _init)
+    @patch.object(Shell, "sync_workspace")
+    @patch.object(Shell, "run", return_value=0)
+    def test_application_sigterm_handler(self, *_: t.Any) -> None:
+        def _handler(_signum: int, _frame: t.Any) -> None:
+            ...
+
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.getsignal(signal.SIGTERM))
+        signal.signal(signal.SIGTERM, _handler)
+        with patch("atexit.register"):
+            SingularityRun(self.mlcube, task="ls").run()
+        self.assertIs(signal.getsignal(signal.SIGTERM), _handler)
+        InstancePool.shutdown()
+        self.assertIs(signal.getsignal(signal.SIGTERM), _handler)
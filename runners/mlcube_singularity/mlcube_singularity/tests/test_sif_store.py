@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import tempfile
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import semver
+from mlcube_singularity.sif_store import SIFStore
+from mlcube_singularity.singularity_client import Client, Runtime, Version
+
+from mlcube.errors import ConfigurationError
+from mlcube.shell import Shell
+
+
+class TestSIFStore(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.env = patch.dict(os.environ, {"MLCUBE_CACHE_DIR": str(self.root / "cache")})
+        self.env.start()
+        self.store = SIFStore(self.root / "store")
+        (self.root / "Singularity.recipe").write_text("Bootstrap: docker\nFrom: ubuntu:18.04\n")
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def _build(self, path: Path, size: int = 16) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"0" * size)
+        return path
+
+    def test_parse_size(self) -> None:
+        self.assertIsNone(SIFStore.parse_size(None))
+        self.assertIsNone(SIFStore.parse_size(""))
+        self.assertEqual(SIFStore.parse_size(100), 100)
+        self.assertEqual(SIFStore.parse_size("2K"), 2048)
+        self.assertEqual(SIFStore.parse_size("1.5G"), int(1.5 * 1024 ** 3))
+        self.assertEqual(SIFStore.parse_size("10MB"), 10 * 1024 ** 2)
+        with self.assertRaises(ConfigurationError):
+            SIFStore.parse_size("lots")
+
+    def test_source_key(self) -> None:
+        key = SIFStore.source_key(str(self.root), "Singularity.recipe", "--fakeroot")
+        self.assertEqual(key, SIFStore.source_key(str(self.root), "Singularity.recipe", "--fakeroot"))
+        self.assertNotEqual(key, SIFStore.source_key(str(self.root), "Singularity.recipe", ""))
+
+        (self.root / "Singularity.recipe").write_text("Bootstrap: docker\nFrom: ubuntu:20.04\n")
+        self.assertNotEqual(key, SIFStore.source_key(str(self.root), "Singularity.recipe", "--fakeroot"))
+
+        class _DockerHub(object):
+            def get_manifest(self, image: str) -> t.Dict:
+                return {"config": {"digest": "sha256:0123abcd"}}
+
+        key = SIFStore.source_key(str(self.root), "docker://mlcommons/mnist:0.0.1", "", _DockerHub())
+        self.assertEqual(key, SIFStore.source_key(str(self.root), "docker://mlcommons/mnist:0.0.2", "", _DockerHub()))
+        self.assertIsNone(SIFStore.source_key(str(self.root), "missing.recipe", ""))
+
+    def test_put_and_link(self) -> None:
+        workspace_image = self._build(self.root / "ws1" / ".image" / "mnist.sif")
+        self.store.put("key", workspace_image)
+        self.assertTrue(os.path.samefile(workspace_image, self.store.image_path("key")))
+
+        self.assertFalse(self.store.link("other_key", self.root / "ws2" / ".image" / "mnist.sif"))
+        self.assertTrue(self.store.link("key", self.root / "ws2" / ".image" / "mnist.sif"))
+        self.assertEqual((self.root / "ws2" / ".image" / "mnist.sif").read_bytes(), b"0" * 16)
+
+    def test_gc(self) -> None:
+        store = SIFStore(self.root / "store", quota=56)
+        for idx in range(3):
+            store.put(f"key{idx}", self._build(self.root / f"ws{idx}" / "image.sif"))
+        self.assertListEqual(store.gc(), [])
+
+        # Images in use are never removed. Unused images are removed in LRU order.
+        for idx in range(3):
+            (self.root / f"ws{idx}" / "image.sif").unlink()
+        store.link("key0", self.root / "ws3" / "image.sif")
+        store.put("key3", self._build(self.root / "ws4" / "image.sif"))
+        self.assertListEqual([store.image_path(f"key{idx}").exists() for idx in range(4)], [True, False, True, True])
+        self.assertListEqual(store.gc(), [])
+
+    def test_other_processes(self) -> None:
+        for key in ("key0", "key1"):
+            self.store.put(key, self._build(self.root / key / "image.sif"))
+        script = (
+            "import sys; from mlcube_singularity.sif_store import SIFStore\n"
+            "store, key = SIFStore(sys.argv[1]), sys.argv[2]\n"
+            "for idx in range(20):\n    store.link(key, f'{sys.argv[3]}/{key}_{idx}.sif')\n"
+        )
+        procs = [
+            subprocess.Popen([sys.executable, "-c", script, str(self.store.root), key, str(self.root / "links")])
+            for key in ("key0", "key1")
+        ]
+        for proc in procs:
+            self.assertEqual(proc.wait(), 0)
+
+        # Links of both processes have been recorded, none of them has been lost by concurrent index updates.
+        index = self.store._load_index()
+        for key in ("key0", "key1"):
+            self.assertEqual(len(index[key]["links"]), 21)
+
+    @patch.object(Shell, "run")
+    def test_client_build(self, run: t.Any) -> None:
+        def _singularity_build(cmd: t.List[str]) -> int:
+            self._build(Path(cmd[-2]))
+            return 0
+
+        run.side_effect = _singularity_build
+        client = Client("singularity", Version(Runtime.SINGULARITY, semver.VersionInfo(3, 7, 5)))
+        for idx in range(2):
+            client.build(str(self.root), "Singularity.recipe", str(self.root / f"ws{idx}" / ".image"), "mnist.sif",
+                         "--fakeroot", store=self.store)
+            self.assertTrue((self.root / f"ws{idx}" / ".image" / "mnist.sif").is_file())
+        self.assertEqual(run.call_count, 1)
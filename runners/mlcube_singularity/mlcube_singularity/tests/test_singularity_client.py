@@ -1,15 +1,23 @@
+import os
+import tempfile
 import typing as t
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
 import semver
 from mlcube_singularity.singularity_client import (
     Client,
     DockerImage,
+    ImageSpec,
     Runtime,
     Version,
     parse_key_value_string,
 )
 
+from mlcube.errors import ExecutionError
+from mlcube.shell import Shell
+
 
 class TestSingularityRunner(TestCase):
     def test___init__(self) -> None:
@@ -215,3 +223,59 @@ class TestSingularityRunner(TestCase):
                 "scope": "repository:mlcommons/mnist:pull",
             },
         )
+
+
+class TestRuntimeCache(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.executable = self.root / "bin" / "singularity"
+        self.executable.parent.mkdir()
+        self.executable.write_text("#!/bin/sh\necho 'singularity-ce version 3.10.0'\n")
+        self.executable.chmod(0o755)
+        self.env = patch.dict(
+            os.environ,
+            {"MLCUBE_CACHE_DIR": str(self.root / "cache"), "PATH": f"{self.executable.parent}:{os.environ['PATH']}"},
+        )
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, "singularity-ce version 3.10.0"))
+    def test_version(self, run_and_capture_output: t.Any) -> None:
+        for _ in range(2):
+            client = Client("singularity")
+            self.assertEqual(client.version.version, semver.VersionInfo(3, 10, 0))
+            self.assertTrue(client.supports_fakeroot())
+        self.assertEqual(run_and_capture_output.call_count, 1)
+
+        # Cached version is not used when executable changes.
+        stat = self.executable.stat()
+        os.utime(self.executable, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        Client("singularity")
+        self.assertEqual(run_and_capture_output.call_count, 2)
+
+        Client("singularity").init(force=True)
+        self.assertEqual(run_and_capture_output.call_count, 3)
+
+    @patch.object(Shell, "run_and_capture_output")
+    def test_missing_executable(self, run_and_capture_output: t.Any) -> None:
+        with self.assertRaises(ExecutionError):
+            Client("8389dfb48c6f4a1aaa16bdda76c1fb11")
+        run_and_capture_output.assert_not_called()
+
+    @patch.object(Shell, "run_and_capture_output", return_value=(0, ""))
+    def test_image_spec(self, run_and_capture_output: t.Any) -> None:
+        client = Client("singularity", Version(Runtime.SINGULARITY, semver.VersionInfo(3, 10, 0)))
+        image = self.root / "mnist.sif"
+        image.write_bytes(b"SIF")
+        for _ in range(2):
+            self.assertEqual(client.image_spec(image.as_posix()), ImageSpec.SINGULARITY)
+        self.assertEqual(run_and_capture_output.call_count, 1)
+
+        image.write_bytes(b"NOT A SIF")
+        run_and_capture_output.return_value = (255, "")
+        self.assertEqual(client.image_spec(image.as_posix()), ImageSpec.OTHER)
+        self.assertEqual(run_and_capture_output.call_count, 2)
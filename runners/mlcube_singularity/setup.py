@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_singularity=mlcube_singularity.__main__:cli
+        [mlcube.runners]
+        singularity=mlcube_singularity:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',
@@ -1,8 +1,16 @@
+import copy
+import json
 import os
 import logging
+import threading
 import typing as t
-from omegaconf import DictConfig, OmegaConf
-from mlcube.errors import ExecutionError
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from stat import (S_IMODE, S_ISDIR)
+from omegaconf import DictConfig, ListConfig, OmegaConf
+from mlcube.cache import Cache
+from mlcube.errors import (ConfigurationError, ExecutionError)
+from mlcube.profiler import Profiler
 from mlcube.runner import (RunnerConfig, Runner)
 from mlcube.shell import Shell
 from mlcube.validate import Validate
@@ -19,13 +27,24 @@ class Config(RunnerConfig):
         'runner': 'ssh',
 
         'host': '',                 # Remote host
+        'hosts': [],                # Pool of remote hosts, used instead of `host` when not empty
+                                    #   - host: ..., slots: ... (maximal number of concurrent tasks, default is 1)
         'platform': '',             # Platform (runner) to use on remote host
         'remote_root': '',          # Root path for MLCubes on remote host
         'interpreter': {},          # Remote python interpreter# Remote python interpreter
                                     #   1. type: system, python: ..., requirements: ...
                                     #   2. type: virtualenv, python: ..., requirements: ..., location: ..., name: ...
-        'authentication': {}        # Authentication on remote host
+        'authentication': {},       # Authentication on remote host
                                     #   1. identity_file, user
+        'connection_sharing': True,  # Share one multiplexed SSH connection (ControlMaster) for all ssh/rsync calls
+        'control_persist': '10m',   # How long the shared connection stays open after the last command
+        'sync_mode': 'task',        # What is transferred between local and remote hosts
+                                    #   1. task: MLCube root without workspace, task inputs before and task outputs
+                                    #      after each run
+                                    #   2. workspace: entire MLCube root in configure, entire workspace after each run
+        'rsync_args': '--archive --compress --partial',  # Options for all rsync calls (e.g., add `--checksum`)
+        'transfer_streams': 4,      # Maximal number of parallel rsync processes
+        'env_fingerprint': True     # Skip remote environment provisioning and configuration when nothing has changed
     })
 
     @staticmethod
@@ -34,11 +53,100 @@ class Config(RunnerConfig):
 
         Validate(mlcube.runner, 'runner')\
             .check_unknown_keys(Config.DEFAULT.keys())\
-            .check_values(['host', 'platform', 'remote_root'], str, blanks=False)\
-            .check_values(['interpreter', 'authentication'], DictConfig)
+            .check_values(['platform', 'remote_root'], str, blanks=False)\
+            .check_values(['host'], str, blanks=len(mlcube.runner.hosts) > 0)\
+            .check_values(['hosts'], ListConfig)\
+            .check_values(['interpreter', 'authentication'], DictConfig)\
+            .check_values(['connection_sharing', 'env_fingerprint'], bool)\
+            .check_values(['transfer_streams'], int)
+        if mlcube.runner.sync_mode not in ('task', 'workspace'):
+            raise ConfigurationError(
+                f"Unknown sync mode (sync_mode={mlcube.runner.sync_mode}). Expecting one of ['task', 'workspace']."
+            )
+        for host in mlcube.runner.hosts:
+            if isinstance(host, str):
+                host = OmegaConf.create({'host': host})
+            Validate(host, 'runner.hosts').check_unknown_keys(['host', 'slots'])\
+                .check_values(['host'], str, blanks=False)
+            if not isinstance(host.get('slots', 1), int) or host.get('slots', 1) < 1:
+                raise ConfigurationError(f"Number of host slots must be a positive integer (host={host.host}).")
         PythonInterpreter.get(mlcube.runner.interpreter).validate(mlcube.runner.interpreter)
 
 
+class HostPool(object):
+    """ Pool of remote hosts that run MLCube tasks (`runner.hosts`).
+
+        Every host runs at most `slots` tasks concurrently. Tasks are placed on the least-loaded healthy host (ratio of
+        running tasks to slots), and wait when all hosts are busy. Hosts that fail to accept SSH connections are marked
+        unhealthy and are not used anymore by the current MLCube process. Pools are shared by all runners in this
+        process, so that concurrent tasks (`mlcube run --parallel`) and sweep jobs are spread across hosts.
+    """
+
+    CONNECTION_ERROR = 255
+    """Exit code of `ssh` (and of `rsync` with ssh remote shell) when it fails to connect to a remote host."""
+
+    _lock = threading.Lock()
+    _pools: t.Dict[t.Tuple[t.Tuple[str, int], ...], 'HostPool'] = {}
+
+    def __init__(self, hosts: t.List[t.Tuple[str, int]]) -> None:
+        self.hosts: t.List[t.Tuple[str, int]] = hosts
+        self.running: t.Dict[str, int] = {host: 0 for host, _ in hosts}
+        self.unhealthy: t.Set[str] = set()
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def get(hosts: ListConfig) -> 'HostPool':
+        """ Return pool for these hosts (`runner.hosts` configuration parameter) creating a new one if needed."""
+        key = tuple(
+            (host, 1) if isinstance(host, str) else (host.host, host.get('slots', 1)) for host in hosts
+        )
+        with HostPool._lock:
+            if key not in HostPool._pools:
+                HostPool._pools[key] = HostPool(list(key))
+            return HostPool._pools[key]
+
+    @staticmethod
+    def is_connection_error(err: ExecutionError) -> bool:
+        """ Return true if an error may have been caused by a failed SSH connection (see `SSHRun.is_host_unreachable`).
+        """
+        return err.context.get('code', None) == HostPool.CONNECTION_ERROR
+
+    def healthy_hosts(self) -> t.List[str]:
+        return [host for host, _ in self.hosts if host not in self.unhealthy]
+
+    def acquire(self) -> str:
+        """ Reserve one slot on the least-loaded healthy host waiting for a free slot if needed."""
+        with self._cond:
+            while True:
+                candidates = [
+                    (self.running[host] / slots, idx, host) for idx, (host, slots) in enumerate(self.hosts)
+                    if host not in self.unhealthy and self.running[host] < slots
+                ]
+                if candidates:
+                    host = min(candidates)[2]
+                    self.running[host] += 1
+                    logger.debug("HostPool.acquire host=%s, running=%s", host, self.running)
+                    return host
+                if not self.healthy_hosts():
+                    raise ExecutionError(
+                        "No healthy hosts in SSH host pool.", hosts=[host for host, _ in self.hosts]
+                    )
+                self._cond.wait()
+
+    def release(self, host: str) -> None:
+        """ Release a slot on a host."""
+        with self._cond:
+            self.running[host] -= 1
+            self._cond.notify_all()
+
+    def mark_unhealthy(self, host: str, reason: t.Any = None) -> None:
+        """ Exclude a host from this pool."""
+        with self._cond:
+            self.unhealthy.add(host)
+            self._cond.notify_all()
+        logger.warning("HostPool.mark_unhealthy host=%s, reason=%s", host, reason)
+
+
 class SSHRun(Runner):
     """
     Reference implementation of the remote runner based on SSH.
@@ -50,6 +158,10 @@ class SSHRun(Runner):
 
     CONFIG = Config
 
+    FINGERPRINT_FILE = '.{name}.mlcube-ssh-env'
+    """Name of a file next to MLCube directory on a remote host (`remote_root`) that contains fingerprint of remote
+    environment. It is outside MLCube directory, so that writing it does not change synchronized files."""
+
     def __init__(self, mlcube: t.Union[DictConfig, t.Dict], task: t.Text) -> None:
         super().__init__(mlcube, task)
 
@@ -67,47 +179,205 @@ class SSHRun(Runner):
             auth_str += f'{user}@'
         return auth_str + self.mlcube.runner.host
 
+    def for_host(self, host: str) -> 'SSHRun':
+        """ Return runner for the same MLCube and task that uses this remote host."""
+        mlcube: DictConfig = copy.deepcopy(self.mlcube)
+        mlcube.runner.host = host
+        mlcube.runner.hosts = []
+        return SSHRun(mlcube, self.task)
+
+    @staticmethod
+    def get_control_dir() -> t.Optional[Path]:
+        """ Return directory for control sockets of shared SSH connections (`${MLCUBE_CACHE_DIR}/ssh`).
+
+            Anyone who can access control sockets can use or replace shared connections, so the directory must be a
+            real directory (not a symbolic link) owned by the current user and accessible only by this user (0700).
+        Returns:
+            Path to the directory, or None if it does not satisfy these requirements.
+        """
+        control_dir = Cache.path('ssh')
+        try:
+            control_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            stat = os.lstat(control_dir)
+        except OSError as err:
+            logger.warning("SSHRun.get_control_dir can't create directory, connection sharing is disabled: %s", err)
+            return None
+        if not S_ISDIR(stat.st_mode) or stat.st_uid != os.getuid() or S_IMODE(stat.st_mode) != 0o700:
+            logger.warning(
+                "SSHRun.get_control_dir directory must be owned by the current user with mode 0700, connection "
+                "sharing is disabled (path=%s, uid=%d, mode=%o).", control_dir, stat.st_uid, S_IMODE(stat.st_mode)
+            )
+            return None
+        if len(control_dir.as_posix()) + 41 > 104:
+            # Control socket name (%C) is 40 characters long, and many systems limit unix socket paths to 104 bytes.
+            logger.warning("SSHRun.get_control_dir path is too long, connection sharing is disabled (path=%s).",
+                           control_dir)
+            return None
+        return control_dir
+
+    def get_ssh_options(self) -> str:
+        """ Return ssh options that make all `ssh` and `rsync` calls for a remote host share one connection.
+
+            The first call starts a master connection (ControlMaster=auto) listening on a control socket, subsequent
+            calls reuse it, so that only the first call pays for TCP and SSH handshakes and authentication. The master
+            connection stays open for `control_persist` time after the last call, so it is reused across MLCube
+            commands too (e.g., `configure` and `run`). Connection sharing is disabled when the control socket directory
+            can't be used safely (see `get_control_dir`).
+        """
+        if not self.mlcube.runner.get('connection_sharing', True):
+            return ''
+        control_dir: t.Optional[Path] = SSHRun.get_control_dir()
+        if control_dir is None:
+            return ''
+        persist = self.mlcube.runner.get('control_persist', None) or 'no'
+        return f"-o ControlMaster=auto -o ControlPath={control_dir}/%C -o ControlPersist={persist}"
+
+    @Profiler.profile()
     def configure(self) -> None:
-        """Run 'configure' phase for SHH runner."""
+        """Run 'configure' phase for SHH runner (on all hosts in parallel when `hosts` is not empty)."""
+        if not self.mlcube.runner.hosts:
+            self._configure()
+            return
+
+        pool = HostPool.get(self.mlcube.runner.hosts)
+        hosts: t.List[str] = pool.healthy_hosts()
+
+        def _configure(_host: str) -> t.Optional[ExecutionError]:
+            _runner = self.for_host(_host)
+            try:
+                _runner._configure()
+            except ExecutionError as _err:
+                if _runner.is_host_unreachable(_err):
+                    logger.warning(
+                        "SSHRun.configure host is not reachable, it will not be used (host=%s, error=%s).",
+                        _host, str(_err)
+                    )
+                    pool.mark_unhealthy(_host, _err)
+                return _err
+            return None
+
+        with ThreadPoolExecutor(max_workers=max(1, len(hosts)), thread_name_prefix='mlcube-ssh') as executor:
+            errors = [(host, err) for host, err in zip(hosts, executor.map(_configure, hosts)) if err is not None]
+        for host, err in errors:
+            # Only hosts that are not reachable are tolerated.
+            if host not in pool.unhealthy or not pool.healthy_hosts():
+                raise err
+
+    def is_host_unreachable(self, err: ExecutionError) -> bool:
+        """ Return true if an error has been caused by a failed SSH connection to the remote host.
+
+            `ssh` exits with 255 when it fails to connect, but it also passes through exit status 255 of remote commands
+            (e.g., a task that calls `sys.exit(-1)`). So, after this exit code, the connection is checked again with
+            `ssh host true`, and the host is unreachable only if this check fails too.
+        """
+        if not HostPool.is_connection_error(err):
+            return False
+        ssh_options: t.Text = f"-o ConnectTimeout=10 {self.get_ssh_options()}".strip()
+        try:
+            exit_code = Shell.ssh(self.get_connection_string(), 'true', on_error='ignore', ssh_options=ssh_options)
+        except ExecutionError as check_err:
+            exit_code = check_err.context.get('code', 1)
+        logger.info("SSHRun.is_host_unreachable connection check exit_code=%s (host=%s)", exit_code,
+                    self.mlcube.runner.host)
+        return exit_code != 0
+
+    def get_env_fingerprint(self) -> str:
+        """ Return fingerprint of remote environment configuration.
+
+            It covers python interpreter configuration (including requirements), local MLCube version and remote
+            platform. When it matches the fingerprint stored on a remote host, remote python environment is up to date.
+        """
+        try:
+            from importlib.metadata import version
+            mlcube_version = version('mlcube')
+        except Exception:
+            mlcube_version = 'unknown'
+        interpreter = json.dumps(OmegaConf.to_container(self.mlcube.runner.interpreter, resolve=True), sort_keys=True)
+        return Cache.digest(interpreter, mlcube_version, self.mlcube.runner.platform)
+
+    def _configure(self) -> None:
         conn: t.Text = self.get_connection_string()
+        ssh_options: t.Text = self.get_ssh_options()
         remote_env: PythonInterpreter = PythonInterpreter.create(self.mlcube.runner.interpreter)
 
-        # If required, create and configure python environment on remote host
+        # The 'local_path' and 'remote_path' must both be directories.
+        local_path: str = self.mlcube.runtime.root
+        remote_path: str = os.path.join(self.mlcube.runner.remote_root, os.path.basename(local_path))
+        fingerprint_file: str = os.path.join(
+            self.mlcube.runner.remote_root, SSHRun.FINGERPRINT_FILE.format(name=os.path.basename(local_path))
+        )
+
+        # Read fingerprint of remote environment (in the same round-trip that creates remote MLCube directory).
+        fingerprint: t.Optional[str] = None
+        if self.mlcube.runner.env_fingerprint:
+            fingerprint = self.get_env_fingerprint()
+        remote_fingerprint: t.List[str] = []
         try:
-            Shell.ssh(conn, remote_env.create_cmd())
-        except ExecutionError as err:
-            raise ExecutionError.mlcube_configure_error(
-                self.__class__.__name__,
-                f"Error occurred while creating remote python environment (env={remote_env}).",
-                **err.context
+            Shell.ssh(
+                conn, f'mkdir -p {remote_path} && (cat {fingerprint_file} 2>/dev/null || true)',
+                ssh_options=ssh_options, on_output=lambda line: remote_fingerprint.append(line.strip())
             )
-        try:
-            Shell.ssh(conn, remote_env.configure_cmd())
         except ExecutionError as err:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
-                f"Error occurred while configuring remote python environment (env={remote_env}).",
+                "Error occurred while creating MLCube directory on a remote host.",
                 **err.context
             )
+        env_changed = fingerprint is None or fingerprint not in remote_fingerprint
 
-        # The 'local_path' and 'remote_path' must both be directories.
+        # If required, create and configure python environment on remote host
+        if env_changed:
+            try:
+                Shell.ssh(conn, remote_env.create_cmd(), ssh_options=ssh_options)
+            except ExecutionError as err:
+                raise ExecutionError.mlcube_configure_error(
+                    self.__class__.__name__,
+                    f"Error occurred while creating remote python environment (env={remote_env}).",
+                    **err.context
+                )
+            try:
+                Shell.ssh(conn, remote_env.configure_cmd(), ssh_options=ssh_options)
+            except ExecutionError as err:
+                raise ExecutionError.mlcube_configure_error(
+                    self.__class__.__name__,
+                    f"Error occurred while configuring remote python environment (env={remote_env}).",
+                    **err.context
+                )
+        else:
+            logger.info("SSHRun.configure remote environment is up to date (host=%s).", self.mlcube.runner.host)
+
+        # Itemized rsync output lists files that have changed on a remote host. Lines of directories with changed
+        # attributes only (e.g., `.d..t...... ./` when remote tasks have created new files) are not changes.
+        changes: t.List[str] = []
         try:
-            local_path: str = self.mlcube.runtime.root
-            remote_path: str = os.path.join(self.mlcube.runner.remote_root, os.path.basename(local_path))
-            Shell.ssh(conn, f'mkdir -p {remote_path}')
-            Shell.rsync_dirs(source=f'{local_path}/', dest=f'{conn}:{remote_path}/')
+            rsync_args: str = f'{self.mlcube.runner.rsync_args} --itemize-changes'
+            if self.mlcube.runner.sync_mode == 'task':
+                # Task inputs are pushed, and task outputs are pulled back, by the `run` method.
+                rsync_args = f'{rsync_args} --exclude=/workspace/'
+            Shell.rsync_dirs(
+                source=f'{local_path}/', dest=f'{conn}:{remote_path}/', ssh_options=ssh_options, rsync_args=rsync_args,
+                on_output=lambda line: changes.append(line.rstrip()) if line.strip() and line[:2] != '.d' else None
+            )
         except ExecutionError as err:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
                 "Error occurred while syncing local and remote folders.",
                 **err.context
             )
+        if not env_changed and not changes:
+            logger.info("SSHRun.configure remote MLCube is up to date (host=%s).", self.mlcube.runner.host)
+            return
 
         # Configure remote MLCube runner. Idea is that we use chain of runners, for instance, SHH Runner -> Docker
-        # runner. So, the runner to be used on a remote host must configure itself.
+        # runner. So, the runner to be used on a remote host must configure itself. The fingerprint is removed before,
+        # and is written only after successful configuration, so that a failed attempt is always retried.
         try:
-            cmd = f"mlcube configure --mlcube=. --platform={self.mlcube.runner.platform}"
-            Shell.ssh(conn, f'{remote_env.activate_cmd(noop=":")} && cd {remote_path} && {cmd}')
+            cmd = f"rm -f {fingerprint_file} && mlcube configure --mlcube=. --platform={self.mlcube.runner.platform}"
+            if fingerprint is not None:
+                cmd += f" && echo {fingerprint} > {fingerprint_file}"
+            Shell.ssh(
+                conn, f'{remote_env.activate_cmd(noop=":")} && cd {remote_path} && {cmd}', ssh_options=ssh_options
+            )
         except ExecutionError as err:
             raise ExecutionError.mlcube_configure_error(
                 self.__class__.__name__,
@@ -115,30 +385,260 @@ class SSHRun(Runner):
                 **err.context
             )
 
+    def get_task_paths(self, io: str, task: t.Optional[str] = None) -> t.List[str]:
+        """ Return workspace-relative paths of task inputs or outputs.
+
+            Parameters with paths outside the MLCube workspace are not transferred (these paths may not exist on a
+            remote host) and are skipped with a warning.
+
+        Args:
+            io: One of `inputs` or `outputs`.
+            task: Task name, if None, this runner's task is used.
+        """
+        task = task or self.task
+        workspace: str = self.mlcube.runtime.workspace
+        parameters = self.mlcube.tasks[task].parameters.get(io, None) or {}
+        paths: t.List[str] = []
+        for name, spec in parameters.items():
+            host_path = Shell.get_host_path(workspace, spec.default if isinstance(spec, DictConfig) else spec)
+            rel_path = os.path.relpath(host_path, workspace)
+            if rel_path == os.curdir or rel_path.startswith(os.pardir):
+                logger.warning(
+                    "SSHRun.get_task_paths parameter is not in workspace and will not be transferred "
+                    "(task=%s, io=%s, name=%s, path=%s).", task, io, name, host_path
+                )
+                continue
+            paths.append(rel_path)
+        return paths
+
+    def get_task_args(self, tasks: t.List[str]) -> t.List[str]:
+        """ Return task parameters (`name=value`) for a remote `mlcube run` command.
+
+            Local parameter values may differ from values in remote MLCube configuration (e.g., in sweep jobs, or when
+            users override them on a command line), so they are always passed explicitly. Paths inside workspace are
+            relative to workspace, other paths are passed as is. Parameters that tasks define with different values are
+            not passed, and remote MLCube configuration provides their values.
+        """
+        workspace: str = self.mlcube.runtime.workspace
+        values: t.Dict[str, t.Set[str]] = {}
+        for task in tasks:
+            parameters = self.mlcube.tasks[task].parameters
+            for io in ('inputs', 'outputs'):
+                for name, spec in (parameters.get(io, None) or {}).items():
+                    value: str = spec.default if isinstance(spec, DictConfig) else spec
+                    rel_path = os.path.relpath(Shell.get_host_path(workspace, value), workspace)
+                    if rel_path != os.curdir and not rel_path.startswith(os.pardir):
+                        value = rel_path
+                    values.setdefault(name, set()).add(value)
+        return [f'{name}={next(iter(value))}' for name, value in values.items() if len(value) == 1]
+
+    def has_custom_workspace(self) -> bool:
+        """ Return true if this MLCube does not use default workspace (e.g., a sweep job has its own workspace)."""
+        default_workspace = os.path.join(self.mlcube.runtime.root, 'workspace')
+        return os.path.abspath(self.mlcube.runtime.workspace) != os.path.abspath(default_workspace)
+
+    def get_remote_workspace(self, remote_path: str) -> str:
+        """ Return workspace path on a remote host.
+
+            Custom workspaces inside MLCube directory (e.g., `sweeps/train/train_0`) have the same relative paths on
+            remote hosts. Other custom workspaces are in `{remote_path}/workspaces/`.
+        Args:
+            remote_path: MLCube directory on a remote host.
+        """
+        if not self.has_custom_workspace():
+            return f'{remote_path}/workspace'
+        workspace: str = os.path.abspath(self.mlcube.runtime.workspace)
+        rel_path = os.path.relpath(workspace, os.path.abspath(self.mlcube.runtime.root))
+        if rel_path.startswith(os.pardir):
+            rel_path = f'workspaces/{os.path.basename(workspace)}-{Cache.digest(workspace)[:8]}'
+        return f'{remote_path}/{Path(rel_path).as_posix()}'
+
+    def transfer(self, transfers: t.List[t.Tuple[str, str]], rsync_args: t.Text = '') -> None:
+        """ Run rsync for every (source, dest) pair using up to `transfer_streams` parallel processes.
+
+            Many small transfers are latency-bound (each rsync call is one SSH session), and one large transfer is
+            often bandwidth-bound by one TCP stream, so parallel streams help in both cases.
+        Args:
+            transfers: List of (source, dest) pairs.
+            rsync_args: Additional rsync options for these transfers (in addition to `runner.rsync_args`).
+        """
+        ssh_options: t.Text = self.get_ssh_options()
+        rsync_args = f"{self.mlcube.runner.rsync_args} {rsync_args}".strip()
+
+        def _rsync(_transfer: t.Tuple[str, str]) -> int:
+            return Shell.rsync_dirs(_transfer[0], _transfer[1], ssh_options=ssh_options, rsync_args=rsync_args)
+
+        num_streams = min(max(1, self.mlcube.runner.transfer_streams), len(transfers))
+        if num_streams > 1:
+            with ThreadPoolExecutor(max_workers=num_streams, thread_name_prefix='mlcube-rsync') as executor:
+                list(executor.map(_rsync, transfers))
+        else:
+            for transfer in transfers:
+                _rsync(transfer)
+
+    def push_inputs(self, conn: str, remote_workspace: str, tasks: t.List[str]) -> None:
+        """ Push inputs of tasks that exist locally to remote workspace.
+
+            Inputs that do not exist locally may be outputs of other tasks that already exist on a remote host. Inputs
+            that are outputs of preceding tasks in `tasks` are not pushed. Large input directories are split into their
+            top-level entries to be transferred in parallel.
+        """
+        workspace: str = self.mlcube.runtime.workspace
+        transfers: t.List[t.Tuple[str, str]] = []
+        remote_dirs: t.Set[str] = set()
+        inputs: t.List[str] = []
+        produced: t.Set[str] = set()
+        for task in tasks:
+            inputs.extend(path for path in self.get_task_paths('inputs', task) if path not in produced)
+            produced.update(self.get_task_paths('outputs', task))
+        for rel_path in sorted(set(inputs), key=inputs.index):
+            local_path = os.path.join(workspace, rel_path)
+            if not os.path.exists(local_path):
+                logger.debug("SSHRun.push_inputs input does not exist locally (path=%s).", local_path)
+                continue
+            if os.path.isdir(local_path) and self.mlcube.runner.transfer_streams > 1:
+                remote_dir = os.path.join(remote_workspace, rel_path)
+                remote_dirs.add(remote_dir)
+                with os.scandir(local_path) as entries:
+                    transfers.extend(
+                        (entry.path, f'{conn}:{remote_dir}/') for entry in sorted(entries, key=lambda e: e.name)
+                    )
+            else:
+                remote_dir = os.path.dirname(os.path.join(remote_workspace, rel_path))
+                remote_dirs.add(remote_dir)
+                transfers.append((local_path, f'{conn}:{remote_dir}/'))
+        if transfers:
+            Shell.ssh(conn, f"mkdir -p {' '.join(sorted(remote_dirs))}", ssh_options=self.get_ssh_options())
+            self.transfer(transfers)
+
+    def pull_outputs(self, conn: str, remote_workspace: str, tasks: t.List[str]) -> None:
+        """ Pull outputs of tasks from remote workspace.
+
+            Tasks may not create some of their outputs (e.g., optional log directories), so missing remote paths are
+            skipped (`--ignore-missing-args`) instead of failing the transfer.
+        """
+        workspace: str = self.mlcube.runtime.workspace
+        transfers: t.List[t.Tuple[str, str]] = []
+        outputs: t.List[str] = [path for task in tasks for path in self.get_task_paths('outputs', task)]
+        for rel_path in sorted(set(outputs), key=outputs.index):
+            local_dir = os.path.dirname(os.path.join(workspace, rel_path))
+            os.makedirs(local_dir, exist_ok=True)
+            transfers.append((f'{conn}:{os.path.join(remote_workspace, rel_path)}', f'{local_dir}/'))
+        self.transfer(transfers, rsync_args='--ignore-missing-args')
+
+    @Profiler.profile()
     def run(self) -> None:
+        self._dispatch([self.task])
+
+    @Profiler.profile()
+    def run_tasks(self, tasks: t.List[str]) -> None:
+        """ Run all tasks with one remote `mlcube run` command.
+
+            Task inputs are pushed before, and task outputs are pulled back after all tasks have completed, so that
+            remote python interpreter and remote MLCube configuration are initialized once.
+        """
+        self._dispatch(tasks)
+
+    def _dispatch(self, tasks: t.List[str]) -> None:
+        """ Run tasks on a remote host (on the least-loaded healthy host when `hosts` is not empty).
+
+            If a host fails to accept SSH connections, it's marked unhealthy and tasks are retried on another host.
+            Tasks that fail on a reachable host (including exit code 255) are not retried.
+        """
+        if self.has_custom_workspace():
+            # Custom workspaces (e.g., of sweep jobs) get input artifacts from default workspace.
+            try:
+                for task in tasks:
+                    Shell.sync_workspace(self.mlcube, task)
+            except Exception as err:
+                raise ExecutionError.mlcube_run_error(
+                    self.__class__.__name__,
+                    f"Error occurred while syncing MLCube workspace (tasks={tasks}).",
+                    error=str(err),
+                    workspace=self.mlcube.runtime.workspace
+                )
+
+        if not self.mlcube.runner.hosts:
+            self._run(tasks)
+            return
+
+        pool = HostPool.get(self.mlcube.runner.hosts)
+        while True:
+            host: str = pool.acquire()
+            logger.info("SSHRun.run tasks=%s, host=%s", tasks, host)
+            runner = self.for_host(host)
+            try:
+                runner._run(tasks)
+                return
+            except ExecutionError as err:
+                if not runner.is_host_unreachable(err):
+                    raise
+                pool.mark_unhealthy(host, err)
+            finally:
+                pool.release(host)
+
+    def _run(self, tasks: t.List[str]) -> None:
         conn: t.Text = self.get_connection_string()
+        ssh_options: t.Text = self.get_ssh_options()
         remote_env: PythonInterpreter = PythonInterpreter.create(self.mlcube.runner.interpreter)
 
         # The 'remote_path' variable points to the MLCube root directory on remote host.
         remote_path: t.Text = os.path.join(self.mlcube.runner.remote_root, os.path.basename(self.mlcube.runtime.root))
+        remote_workspace: t.Text = self.get_remote_workspace(remote_path)
+        task_sync: bool = self.mlcube.runner.sync_mode == 'task'
 
         try:
-            cmd = f"mlcube run --mlcube=. --platform={self.mlcube.runner.platform} --task={self.task}"
-            Shell.ssh(conn, f'{remote_env.activate_cmd(noop=":")} && cd {remote_path} && {cmd}')
+            if task_sync:
+                self.push_inputs(conn, remote_workspace, tasks)
+            elif self.has_custom_workspace():
+                # Default workspace is pushed in configure phase, custom workspaces are pushed before every run.
+                Shell.ssh(conn, f'mkdir -p {remote_workspace}', ssh_options=ssh_options)
+                Shell.rsync_dirs(
+                    source=f'{self.mlcube.runtime.workspace}/', dest=f'{conn}:{remote_workspace}/',
+                    ssh_options=ssh_options, rsync_args=self.mlcube.runner.rsync_args
+                )
         except ExecutionError as err:
             raise ExecutionError.mlcube_run_error(
                 self.__class__.__name__,
-                f"Error occurred while running MLCube task (name={self.task}).",
+                f"Error occurred while pushing task inputs (names={tasks}).",
+                **err.context
+            )
+
+        run_error: t.Optional[ExecutionError] = None
+        try:
+            cmd = f"mlcube run --mlcube=. --platform={self.mlcube.runner.platform} --task={','.join(tasks)}"
+            if self.has_custom_workspace():
+                cmd += f" --workspace={remote_workspace}"
+            task_args = self.get_task_args(tasks)
+            if task_args:
+                cmd += f" {' '.join(task_args)}"
+            Shell.ssh(
+                conn, f'{remote_env.activate_cmd(noop=":")} && cd {remote_path} && {cmd}', ssh_options=ssh_options
+            )
+        except ExecutionError as err:
+            run_error = ExecutionError.mlcube_run_error(
+                self.__class__.__name__,
+                f"Error occurred while running MLCube tasks (names={tasks}).",
                 **err.context
             )
 
-        # Sync back results
+        # Sync back results (also when some task has failed, so that outputs of preceding tasks are not lost).
         try:
-            # TODO: Only workspace/ directory is synced. Better solution?
-            Shell.rsync_dirs(source=f'{conn}:{remote_path}/workspace/', dest=f'{self.mlcube.runtime.root}/workspace/')
+            if task_sync:
+                self.pull_outputs(conn, remote_workspace, tasks)
+            else:
+                Shell.rsync_dirs(
+                    source=f'{conn}:{remote_workspace}/', dest=f'{self.mlcube.runtime.workspace}/',
+                    ssh_options=ssh_options, rsync_args=self.mlcube.runner.rsync_args
+                )
         except ExecutionError as err:
+            if run_error is not None:
+                logger.warning("SSHRun.run failed to sync back outputs of failed run: %s", str(err))
+                raise run_error
             raise ExecutionError.mlcube_run_error(
                 self.__class__.__name__,
                 "Error occurred while syncing workspace.",
                 **err.context
             )
+        if run_error is not None:
+            raise run_error
@@ -0,0 +1,373 @@
+import os
+import tempfile
+import threading
+import typing as t
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from omegaconf import DictConfig, OmegaConf
+from mlcube.errors import ExecutionError
+from mlcube.scheduler import TaskStatus
+from mlcube.shell import Shell
+from mlcube.sweep import Sweep
+from mlcube_ssh.ssh_run import Config, HostPool, SSHRun
+
+
+class TestSSHRun(TestCase):
+    def setUp(self) -> None:
+        self.mlcube: DictConfig = OmegaConf.create({
+            'runtime': {'root': '/home/user/mlcubes/mnist', 'workspace': '/home/user/mlcubes/mnist/workspace'},
+            'runner': {
+                'host': 'node01', 'platform': 'docker', 'remote_root': '/opt/mlcubes',
+                'interpreter': {'type': 'system', 'python': 'python3', 'requirements': 'mlcube'},
+                'authentication': {'user': 'mlcube'}
+            },
+            'tasks': {'train': {'parameters': {'inputs': {}, 'outputs': {}}}}
+        })
+        Config.validate(self.mlcube)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {'MLCUBE_CACHE_DIR': self.cache_dir.name})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self.cache_dir.cleanup()
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_connection_sharing(self, run: t.Any) -> None:
+        SSHRun(self.mlcube, task=None).configure()
+        SSHRun(self.mlcube, task='train').run()
+
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        ssh_options = SSHRun(self.mlcube, task=None).get_ssh_options()
+        self.assertIn('-o ControlMaster=auto', ssh_options)
+        self.assertIn('-o ControlPersist=10m', ssh_options)
+        self.assertTrue(all(cmd.startswith(('ssh', 'rsync')) for cmd in cmds))
+        self.assertTrue(all(ssh_options in cmd for cmd in cmds), f"Not all commands share connection: {cmds}")
+
+    def test_control_dir(self) -> None:
+        control_dir = Path(self.cache_dir.name).resolve() / 'ssh'
+        self.assertIn(f'-o ControlPath={control_dir}/%C', SSHRun(self.mlcube, task=None).get_ssh_options())
+        self.assertEqual(control_dir.stat().st_mode & 0o777, 0o700)
+
+        # Directory that other users can access (or a symbolic link to some other directory) is never used.
+        control_dir.chmod(0o755)
+        self.assertEqual(SSHRun(self.mlcube, task=None).get_ssh_options(), '')
+        control_dir.rmdir()
+        (Path(self.cache_dir.name) / 'other').mkdir(mode=0o700)
+        control_dir.symlink_to(Path(self.cache_dir.name) / 'other')
+        self.assertEqual(SSHRun(self.mlcube, task=None).get_ssh_options(), '')
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_no_connection_sharing(self, run: t.Any) -> None:
+        self.mlcube.runner.connection_sharing = False
+        self.mlcube.runner.sync_mode = 'workspace'
+        SSHRun(self.mlcube, task='train').run()
+        self.assertListEqual(
+            [c.args[0] for c in run.call_args_list],
+            [
+                "ssh -o StrictHostKeyChecking=no mlcube@node01 ': && cd /opt/mlcubes/mnist && "
+                "mlcube run --mlcube=. --platform=docker --task=train'",
+                "rsync -e 'ssh' --archive --compress --partial "
+                "'mlcube@node01:/opt/mlcubes/mnist/workspace/' '/home/user/mlcubes/mnist/workspace/'"
+            ]
+        )
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_task_sync(self, run: t.Any) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            workspace = Path(root) / 'workspace'
+            (workspace / 'data').mkdir(parents=True)
+            for name in ('train.csv', 'test.csv'):
+                (workspace / 'data' / name).touch()
+            (workspace / 'parameters.yaml').touch()
+
+            self.mlcube.runtime = {'root': root, 'workspace': workspace.as_posix()}
+            self.mlcube.runner.connection_sharing = False
+            self.mlcube.tasks.train.parameters = {
+                'inputs': {
+                    'data': {'type': 'directory', 'default': 'data'},
+                    'parameters': {'type': 'file', 'default': 'parameters.yaml'},
+                    'checkpoint': {'type': 'file', 'default': 'checkpoints/last.pt'},  # Produced on remote host.
+                    'cache': {'type': 'directory', 'default': '/tmp/cache'}                 # Not in workspace.
+                },
+                'outputs': {'model': {'type': 'directory', 'default': 'models/best'}}
+            }
+            SSHRun(self.mlcube, task='train').run()
+            self.assertTrue((workspace / 'models').is_dir())
+
+        remote_workspace = f"/opt/mlcubes/{os.path.basename(root)}/workspace"
+        remote = f"mlcube@node01:{remote_workspace}"
+        rsync = "rsync -e 'ssh' --archive --compress --partial"
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        mkdir = f"mkdir -p {remote_workspace} {remote_workspace}/data"
+        self.assertEqual(cmds[0], f"ssh -o StrictHostKeyChecking=no mlcube@node01 '{mkdir}'")
+        self.assertCountEqual(
+            cmds[1:4],
+            [
+                f"{rsync} '{workspace}/data/test.csv' '{remote}/data/'",
+                f"{rsync} '{workspace}/data/train.csv' '{remote}/data/'",
+                f"{rsync} '{workspace}/parameters.yaml' '{remote}/'"
+            ]
+        )
+        self.assertIn('mlcube run', cmds[4])
+        # Outputs that a task has not created are skipped.
+        self.assertEqual(cmds[5], f"{rsync} --ignore-missing-args '{remote}/models/best' '{workspace}/models/'")
+        self.assertEqual(len(cmds), 6)
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_run_tasks(self, run: t.Any) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            workspace = Path(root) / 'workspace'
+            (workspace / 'data').mkdir(parents=True)
+            (workspace / 'data' / 'raw.csv').touch()
+            (workspace / 'features').mkdir()  # Stale output of a previous run.
+
+            self.mlcube.runtime = {'root': root, 'workspace': workspace.as_posix()}
+            self.mlcube.runner.connection_sharing = False
+            self.mlcube.tasks = {
+                'process': {'parameters': {
+                    'inputs': {'data': {'type': 'directory', 'default': 'data'}},
+                    'outputs': {'features': {'type': 'directory', 'default': 'features'}}
+                }},
+                'train': {'parameters': {
+                    'inputs': {'features': {'type': 'directory', 'default': 'features'}},
+                    'outputs': {'model': {'type': 'directory', 'default': 'model'}}
+                }}
+            }
+            SSHRun(self.mlcube, task=None).run_tasks(['process', 'train'])
+
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        self.assertTrue(cmds[0].startswith('ssh') and 'mkdir -p' in cmds[0])
+        self.assertIn('/data/raw.csv', cmds[1])
+        self.assertIn('mlcube run --mlcube=. --platform=docker --task=process,train', cmds[2])
+        self.assertCountEqual([cmd.split(' ')[-2].split('/')[-1] for cmd in cmds[3:]], ["features'", "model'"])
+        self.assertEqual(len(cmds), 5)
+
+    def test_run_tasks_failure(self) -> None:
+        def _run(cmd: str, **_kwargs) -> int:
+            if 'mlcube run' in cmd:
+                # The first task has succeeded, the second one has failed.
+                raise ExecutionError("Failed to execute shell command.", code=2, cmd=cmd)
+            return 0
+
+        self.mlcube.runner.connection_sharing = False
+        self.mlcube.tasks = {
+            'process': {'parameters': {'inputs': {}, 'outputs': {'features': {'type': 'directory', 'default': 'f'}}}},
+            'train': {'parameters': {'inputs': {}, 'outputs': {'model': {'type': 'directory', 'default': 'model'}}}}
+        }
+        with tempfile.TemporaryDirectory() as root:
+            self.mlcube.runtime = {'root': root, 'workspace': os.path.join(root, 'workspace')}
+            with patch.object(Shell, 'run', side_effect=_run) as run:
+                with self.assertRaises(ExecutionError) as ctx:
+                    SSHRun(self.mlcube, task=None).run_tasks(['process', 'train'])
+        self.assertEqual(ctx.exception.context['code'], 2)
+        # Outputs are pulled back after the failed run.
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        self.assertIn('mlcube run', cmds[-3])
+        self.assertTrue(all(cmd.startswith('rsync') and '--ignore-missing-args' in cmd for cmd in cmds[-2:]))
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_configure_excludes_workspace(self, run: t.Any) -> None:
+        SSHRun(self.mlcube, task=None).configure()
+        rsync_cmds = [c.args[0] for c in run.call_args_list if c.args[0].startswith('rsync')]
+        self.assertEqual(len(rsync_cmds), 1)
+        self.assertIn('--archive --compress --partial', rsync_cmds[0])
+        self.assertIn('--exclude=/workspace/', rsync_cmds[0])
+
+    def test_env_fingerprint(self) -> None:
+        self.mlcube.runner.interpreter = {
+            'type': 'virtualenv', 'python': 'python3', 'requirements': 'mlcube-docker', 'location': '/opt/envs',
+            'name': 'mlcube'
+        }
+        remote: t.Dict[str, t.Any] = {'fingerprint': None, 'changes': ['>f+++++++++ mlcube.yaml']}
+
+        def _run(cmd: str, on_output: t.Optional[t.Callable] = None, **_kwargs) -> int:
+            if 'cat ' in cmd and remote['fingerprint']:
+                on_output(remote['fingerprint'] + '\n')
+            elif cmd.startswith('rsync'):
+                self.assertIn('--itemize-changes', cmd)
+                for line in remote['changes']:
+                    on_output(line + '\n')
+            elif 'mlcube configure' in cmd:
+                if 'rm -f /opt/mlcubes/.mnist.mlcube-ssh-env' in cmd:
+                    remote['fingerprint'] = None
+                if remote.get('fail', False):
+                    raise ExecutionError("Failed to configure MLCube.", code=1, cmd=cmd)
+                if 'echo ' in cmd:
+                    fingerprint, fingerprint_file = cmd.split('echo ')[1].rstrip("'").split(' > ')
+                    self.assertEqual(fingerprint_file, '/opt/mlcubes/.mnist.mlcube-ssh-env')
+                    remote['fingerprint'] = fingerprint
+            return 0
+
+        def _configure() -> t.List[str]:
+            with patch.object(Shell, 'run', side_effect=_run) as run:
+                SSHRun(self.mlcube, task=None).configure()
+            return [c.args[0] for c in run.call_args_list]
+
+        # Cold configure: create environment, install requirements and configure MLCube on a remote host.
+        cmds = _configure()
+        self.assertEqual(len(cmds), 5)
+        self.assertTrue(any('virtualenv' in cmd for cmd in cmds))
+        self.assertTrue(any('pip install mlcube-docker' in cmd for cmd in cmds))
+        self.assertEqual(remote['fingerprint'], SSHRun(self.mlcube, task=None).get_env_fingerprint())
+
+        # Warm configure: nothing has changed (remote MLCube directory has new files created by remote tasks).
+        remote['changes'] = ['.d..t...... ./', '.d..t...... workspace/']
+        cmds = _configure()
+        self.assertEqual(len(cmds), 2)
+        self.assertFalse(any('mlcube configure' in cmd for cmd in cmds))
+
+        # MLCube files have changed: remote environment is up to date, but MLCube must be configured.
+        remote['changes'] = ['<f.st...... Dockerfile']
+        cmds = _configure()
+        self.assertEqual(len(cmds), 3)
+        self.assertIn('mlcube configure', cmds[-1])
+
+        # Requirements have changed.
+        remote['changes'] = []
+        self.mlcube.runner.interpreter.requirements = 'mlcube-docker==0.0.10'
+        cmds = _configure()
+        self.assertEqual(len(cmds), 5)
+
+        # Remote MLCube configuration fails after changed files have been synced: next configure must retry.
+        remote.update(changes=['<f.st...... Dockerfile'], fail=True)
+        with self.assertRaises(ExecutionError):
+            _configure()
+        remote.update(changes=[], fail=False)
+        cmds = _configure()
+        self.assertIn('mlcube configure', cmds[-1])
+        self.assertEqual(remote['fingerprint'], SSHRun(self.mlcube, task=None).get_env_fingerprint())
+
+
+class TestHostPool(TestCase):
+    def setUp(self) -> None:
+        HostPool._pools.clear()
+        self.mlcube: DictConfig = OmegaConf.create({
+            'runtime': {'root': '/home/user/mlcubes/mnist', 'workspace': '/home/user/mlcubes/mnist/workspace'},
+            'runner': {
+                'hosts': [{'host': 'node01', 'slots': 2}, {'host': 'node02', 'slots': 1}],
+                'platform': 'docker', 'remote_root': '/opt/mlcubes', 'sync_mode': 'workspace',
+                'interpreter': {'type': 'system', 'python': 'python3', 'requirements': 'mlcube'},
+                'authentication': {'user': 'mlcube'}, 'connection_sharing': False
+            },
+            'tasks': {'train': {'parameters': {'inputs': {}, 'outputs': {}}}}
+        })
+        Config.validate(self.mlcube)
+
+    def tearDown(self) -> None:
+        HostPool._pools.clear()
+
+    def test_least_loaded(self) -> None:
+        pool = HostPool.get(self.mlcube.runner.hosts)
+        self.assertIs(pool, HostPool.get(self.mlcube.runner.hosts))
+        self.assertListEqual([pool.acquire() for _ in range(3)], ['node01', 'node02', 'node01'])
+
+        acquired: t.List[str] = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        waiter.join(0.1)
+        self.assertListEqual(acquired, [])  # All slots are busy.
+        pool.release('node02')
+        waiter.join()
+        self.assertListEqual(acquired, ['node02'])
+
+    def test_unhealthy_hosts(self) -> None:
+        pool = HostPool.get(self.mlcube.runner.hosts)
+        pool.mark_unhealthy('node01')
+        self.assertEqual(pool.acquire(), 'node02')
+        pool.mark_unhealthy('node02')
+        with self.assertRaises(ExecutionError):
+            pool.acquire()
+
+    def test_run_on_another_host(self) -> None:
+        def _run(cmd: str, **_kwargs) -> int:
+            if 'node01' in cmd:
+                raise ExecutionError("Failed to execute shell command.", code=255, cmd=cmd)
+            return 0
+
+        with patch.object(Shell, 'run', side_effect=_run) as run:
+            SSHRun(self.mlcube, task='train').run()
+        self.assertIn('mlcube@node02', run.call_args_list[-2].args[0])
+        self.assertIn('mlcube run', run.call_args_list[-2].args[0])
+        pool = HostPool.get(self.mlcube.runner.hosts)
+        self.assertSetEqual(pool.unhealthy, {'node01'})
+        self.assertDictEqual(pool.running, {'node01': 0, 'node02': 0})
+
+    def test_task_exit_code_255(self) -> None:
+        def _run(cmd: str, **_kwargs) -> int:
+            if 'mlcube run' in cmd:
+                raise ExecutionError("Failed to execute shell command.", code=255, cmd=cmd)
+            return 0
+
+        with patch.object(Shell, 'run', side_effect=_run) as run:
+            with self.assertRaises(ExecutionError):
+                SSHRun(self.mlcube, task='train').run()
+        # Host is reachable, so the task has failed by itself: it is not retried on another host.
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        self.assertEqual(len([cmd for cmd in cmds if 'mlcube run' in cmd]), 1)
+        self.assertTrue(cmds[-1].endswith("mlcube@node01 'true'"))
+        self.assertSetEqual(HostPool.get(self.mlcube.runner.hosts).unhealthy, set())
+
+    def test_configure_unreachable_host(self) -> None:
+        def _run(cmd: str, **_kwargs) -> int:
+            if 'node02' in cmd:
+                raise ExecutionError("Failed to execute shell command.", code=255, cmd=cmd)
+            return 0
+
+        with patch.object(Shell, 'run', side_effect=_run), self.assertLogs('mlcube_ssh.ssh_run', 'WARNING') as logs:
+            SSHRun(self.mlcube, task=None).configure()
+        self.assertTrue(any('host is not reachable' in line and 'node02' in line for line in logs.output))
+        self.assertSetEqual(HostPool.get(self.mlcube.runner.hosts).unhealthy, {'node02'})
+
+    @patch.object(Shell, 'run', return_value=0)
+    def test_configure_all_hosts(self, run: t.Any) -> None:
+        SSHRun(self.mlcube, task=None).configure()
+        cmds: t.List[str] = [c.args[0] for c in run.call_args_list]
+        for host in ('node01', 'node02'):
+            self.assertEqual(len([cmd for cmd in cmds if f'mlcube@{host}' in cmd]), 4)
+
+    def test_sweep(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            for shard in ('00', '01'):
+                (Path(root) / 'workspace' / 'shards' / shard).mkdir(parents=True)
+            self.mlcube.runtime = {'root': root, 'workspace': os.path.join(root, 'workspace')}
+            self.mlcube.runner.sync_mode = 'task'
+            self.mlcube.tasks.train.parameters = {
+                'inputs': {'data_dir': {'type': 'directory', 'default': 'shards/00'}},
+                'outputs': {'model_dir': {'type': 'directory', 'default': 'model'}}
+            }
+            jobs = [{'data_dir': 'shards/00'}, {'data_dir': 'shards/01', 'model_dir': 'model_01'}]
+            sweep = Sweep(self.mlcube, 'train', jobs, os.path.join(root, 'sweeps', 'train'))
+            with patch.object(Shell, 'run', return_value=0) as run:
+                results = sweep.run(SSHRun, num_workers=2)
+            self.assertListEqual([r.status for r in results], [TaskStatus.SUCCEEDED] * 2)
+            # Job inputs are synced from default workspace into job workspaces.
+            self.assertTrue((Path(root) / 'sweeps' / 'train' / 'train_1' / 'shards' / '01').is_dir())
+
+        # Each job runs in its own remote workspace and with its own parameters (on any host in the pool).
+        remote_path = f"/opt/mlcubes/{os.path.basename(root)}"
+        expected = [('train_0', 'shards/00', 'model'), ('train_1', 'shards/01', 'model_01')]
+        cmds: t.List[str] = sorted(
+            c.args[0].split(' && ')[-1] for c in run.call_args_list if 'mlcube run' in c.args[0]
+        )
+        self.assertListEqual(
+            cmds,
+            [
+                f"mlcube run --mlcube=. --platform=docker --task=train --workspace={remote_path}/sweeps/train/{job} "
+                f"data_dir={data_dir} model_dir={model_dir}'"
+                for job, data_dir, model_dir in expected
+            ]
+        )
+        # Outputs are pulled from remote job workspaces into local job workspaces.
+        pulls: t.List[str] = sorted(
+            c.args[0].split(':', 1)[-1] for c in run.call_args_list if '--ignore-missing-args' in c.args[0]
+        )
+        self.assertListEqual(
+            pulls,
+            [
+                f"{remote_path}/sweeps/train/{job}/{model_dir}' '{root}/sweeps/train/{job}/'"
+                for job, _, model_dir in expected
+            ]
+        )
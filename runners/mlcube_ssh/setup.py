@@ -44,6 +44,8 @@ setup(
     entry_points='''
         [console_scripts]
         mlcube_ssh=mlcube_ssh.__main__:cli
+        [mlcube.runners]
+        ssh=mlcube_ssh:get_runner_class
     ''',
     install_requires=requires,
     python_requires='>=3.6',